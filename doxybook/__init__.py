@@ -2,4 +2,25 @@
 Convert Doxygen XML output into a single-file API reference in Markdown format.
 """
 
+import typing as t
+
 __version__ = '0.3.0'
+
+__all__ = ['Model', 'load']
+
+if t.TYPE_CHECKING:
+    from doxybook.model import (
+        Model,
+        load,
+    )
+
+
+def __getattr__(name: str) -> t.Any:
+    # the model is imported on first use, importing doxybook or any of its modules does not load it
+    if name in __all__:
+        from doxybook import (  # noqa: PLC0415
+            model,
+        )
+
+        return getattr(model, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -1,23 +1,101 @@
 import argparse
 import os
-import shlex
-import shutil
 import subprocess
 import sys
+import typing as t
 from shutil import (
     copytree,
 )
 
+from doxybook.batch import (
+    run_batch,
+)
+from doxybook.benchmark import (
+    DEFAULT_XML_DIRS,
+    compare_results,
+    run_benchmarks,
+)
 from doxybook.constants import (
     DEFAULT_TEMPLATES_DIR,
     SUPPORTED_LANGS,
+    Kind,
+)
+from doxybook.doxygen import (
+    CompoundFilter,
 )
 from doxybook.runner import (
-    run,
+    OutputSpec,
+    run_many,
+)
+from doxybook.serve import (
+    serve,
+)
+from doxybook.trace import (
+    disable,
+    enable,
 )
 from doxybook.utils import (
     error,
+    get_doxygen_cmd,
 )
+from doxybook.watch import (
+    watch,
+)
+
+COMPOUND_KINDS = [
+    Kind.FILE,
+    Kind.DIR,
+    Kind.GROUP,
+    Kind.PAGE,
+    Kind.NAMESPACE,
+    Kind.CLASS,
+    Kind.STRUCT,
+    Kind.UNION,
+    Kind.INTERFACE,
+    Kind.EXAMPLE,
+]
+
+# options of the rendering of the outputs by the main action, not supported by the watch and serve actions
+RENDER_ONLY_OPTIONS = {
+    'output_spec': '--output-spec',
+    'search_index': '--search-index',
+    'section_manifest': '--section-manifest',
+    'source_dir': '--source-dir',
+    'source_jobs': '--source-jobs',
+    'split_size': '--split-size',
+    'precompute_jobs': '--precompute-jobs',
+    'low_memory': '--low-memory',
+    'trace': '--trace',
+}
+
+
+def check_render_only_options(args: argparse.Namespace) -> None:
+    unsupported = [option for dest, option in RENDER_ONLY_OPTIONS.items() if getattr(args, dest)]
+    if unsupported:
+        raise ValueError(f'{", ".join(unsupported)} not supported by the {args.action} action')
+
+
+def output_spec(value: str) -> t.Dict[str, t.Any]:
+    spec = {}
+    for item in value.split(','):
+        key, sep, val = item.partition('=')
+        key = key.strip().replace('-', '_')
+        if not sep or key not in OutputSpec._fields:
+            raise argparse.ArgumentTypeError(
+                f'invalid output spec item "{item}", expected KEY=VALUE with KEY in {", ".join(OutputSpec._fields)}'
+            )
+        spec[key] = val.strip()
+
+    if 'output' not in spec:
+        raise argparse.ArgumentTypeError(f'output spec "{value}" has no "output=" item')
+    if spec.get('template_lang', 'c') not in SUPPORTED_LANGS:
+        raise argparse.ArgumentTypeError(f'template_lang should be one of {", ".join(SUPPORTED_LANGS)}')
+    if 'split_size' in spec:
+        try:
+            spec['split_size'] = int(spec['split_size']) * 1024
+        except ValueError:
+            raise argparse.ArgumentTypeError(f'split_size should be a size in KiB, got "{spec["split_size"]}"')
+    return spec
 
 
 def parse_options():
@@ -29,7 +107,13 @@ def parse_options():
         help='markdown type',
         default='single-markdown',
     )
-    parser.add_argument('-i', '--input', help='Path to doxygen generated xml folder')
+    parser.add_argument(
+        '-i',
+        '--input',
+        help='Path to doxygen generated xml folder, or to a .zip, .tar, .tar.gz or .tar.zst archive of it, or to the '
+        'single XML file combining it, generated by "xsltproc combine.xslt index.xml". '
+        'Reading .tar.zst archives requires the zstandard package.',
+    )
     parser.add_argument('-o', '--output', help='Path to the destination folder')
     parser.add_argument(
         '-l',
@@ -62,12 +146,190 @@ def parse_options():
     parser.add_argument(
         '--doxygen-extra-args', default='', help='extra argument passed into doxygen. should be doublequoted'
     )
+    parser.add_argument(
+        '--search-index',
+        help='also write a JSON symbol search index of the output to this path. '
+        'It contains the symbols sorted by name, and a prefix trie over their names.',
+    )
+    parser.add_argument(
+        '--section-manifest',
+        help='also write a JSON manifest of the content hash of each header section of the output to this path, and '
+        'report the sections added, removed or changed since the previous manifest.',
+    )
+    parser.add_argument(
+        '--source-dir',
+        help='also write the source listing page <refid>_source.md of each header file to this folder. '
+        'Requires XML_PROGRAMLISTING in the doxygen configuration.',
+    )
+    parser.add_argument(
+        '--split-size',
+        type=int,
+        default=None,
+        help='split the output into parts of at most this size in KiB at the header section boundaries, e.g. '
+        'api-1.md, api-2.md, with an index page at the output path. The links between the parts are rewritten.',
+    )
+    parser.add_argument(
+        '--source-jobs',
+        type=int,
+        default=None,
+        help='number of processes writing the source listing pages. (default: number of CPUs)',
+    )
+    parser.add_argument(
+        '--output-spec',
+        type=output_spec,
+        action='append',
+        default=[],
+        help='render one more output from the same parsed XML. '
+        'Format: "output=PATH[,target=TARGET][,link_prefix=PREFIX][,template_dir=DIR][,template_lang=LANG]'
+        '[,search_index=PATH][,section_manifest=PATH][,source_dir=DIR][,split_size=KIB]", '
+        'unset items default to the values of the global options. Could be passed multiple times.',
+    )
+    parser.add_argument(
+        '--prefetch-workers',
+        type=int,
+        default=0,
+        help='number of threads reading the compound XML files ahead of the parser, e.g. 4 on network file systems '
+        'with a high latency per file. 0 to read them on the parsing thread. (default: 0)',
+    )
+    parser.add_argument(
+        '--prefetch-budget',
+        type=int,
+        default=64,
+        help='maximum size in MiB of the XML files read ahead but not parsed yet. (default: 64)',
+    )
+    parser.add_argument(
+        '--parse-threads',
+        type=int,
+        default=0,
+        help='number of threads reading and parsing the compound files ahead of the model construction, replacing the '
+        'prefetch threads. The model is still built in order on one thread, the output is the same. Faster on the '
+        'free-threaded builds of Python (3.13t and later), which run the parsing in parallel. (default: 0)',
+    )
+    parser.add_argument(
+        '--precompute-jobs',
+        type=int,
+        default=0,
+        help='number of processes converting the descriptions of the header sections into a view model before the '
+        'templates render it. Custom templates could only use the attributes listed in doxybook/view_model.py. '
+        '0 to render the parsed XML directly. (default: 0)',
+    )
+    parser.add_argument(
+        '--trace',
+        help='write the spans of the compound loads, model passes, header sections and template renders to this '
+        'path, in the Chrome trace event format. Open it with chrome://tracing or https://ui.perfetto.dev.',
+    )
+    parser.add_argument(
+        '--include',
+        action='append',
+        default=[],
+        help='only load the file compounds with a name matching this glob, e.g. "esp_*.h". '
+        'Matched against the file names listed in index.xml, without directories. Could be passed multiple times.',
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        default=[],
+        help='do not load the compounds with a name matching this glob. Could be passed multiple times.',
+    )
+    parser.add_argument(
+        '--kind',
+        dest='kinds',
+        action='append',
+        default=[],
+        choices=[kind.value for kind in COMPOUND_KINDS],
+        help='only load the compounds of this kind from index.xml. Compounds declared in a loaded one are loaded '
+        'anyway. Could be passed multiple times. (default: all kinds)',
+    )
+    parser.add_argument(
+        '--lazy',
+        action='store_true',
+        help='build the model from index.xml and parse a compound file only when the output needs it. '
+        'Faster when most compounds are not rendered, e.g. with many source files or classes not declared in a header.',
+    )
+    parser.add_argument(
+        '--low-memory',
+        action='store_true',
+        help='bound the memory usage: load the XML lazily, then write the output one header section at a time and '
+        'release the parsed XML after each of them. Slower. The peak RSS is reported. Implies --lazy.',
+    )
 
     action = parser.add_subparsers(dest='action')
     generate_templates = action.add_parser('generate-templates')
     generate_templates.add_argument(
         'output_dir', nargs='?', default=os.getcwd(), help=f'generate default template files. (Default: {os.getcwd()})'
     )
+    watch_parser = action.add_parser(
+        'watch',
+        help='keep the parsed XML in memory and re-render the output whenever the XML files or the templates change. '
+        'doxygen is not run by this command.',
+    )
+    watch_parser.add_argument(
+        '--interval', type=float, default=1.0, help='seconds between two checks for changes. (default: 1.0)'
+    )
+    serve_parser = action.add_parser(
+        'serve',
+        help='serve the API reference on a local port. Each header section is rendered on its first request, '
+        'and rendered again after its XML files change. doxygen is not run by this command.',
+    )
+    serve_parser.add_argument('--host', default='127.0.0.1', help='address to listen on. (default: 127.0.0.1)')
+    serve_parser.add_argument('--port', type=int, default=8000, help='port to listen on. (default: 8000)')
+    serve_parser.add_argument(
+        '--interval', type=float, default=1.0, help='minimum seconds between two checks for changes. (default: 1.0)'
+    )
+
+    batch_parser = action.add_parser(
+        'batch',
+        help='run doxygen and render the API reference of all the components listed in a JSON manifest. '
+        'The global --doxygen-bin and --prefetch-* options apply to every component.',
+    )
+    batch_parser.add_argument('manifest', help='path to the JSON manifest of the components')
+    batch_parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        default=None,
+        help='maximum number of concurrent doxygen runs and render processes. (default: number of CPUs)',
+    )
+    batch_parser.add_argument(
+        '--skip-doxygen', action='store_true', help='render from the existing XML files without running doxygen'
+    )
+
+    bench_parser = action.add_parser(
+        'bench',
+        help='run the microbenchmarks of the hot helpers on fixtures extracted from doxygen XML folders, and write '
+        'the results as JSON. doxygen is not run by this command.',
+    )
+    bench_parser.add_argument(
+        'xml_dirs',
+        nargs='*',
+        default=DEFAULT_XML_DIRS,
+        help=f'doxygen generated XML folders. (default: {" ".join(DEFAULT_XML_DIRS)})',
+    )
+    bench_parser.add_argument(
+        '--results', default='benchmark.json', help='path of the JSON results file. (default: benchmark.json)'
+    )
+    bench_parser.add_argument(
+        '--repeat', type=int, default=5, help='number of timings of each benchmark, the best is kept. (default: 5)'
+    )
+    bench_parser.add_argument(
+        '-k',
+        '--select',
+        action='append',
+        default=[],
+        help='only run the benchmarks with a name matching this glob, e.g. "Node.*". Could be passed multiple times.',
+    )
+    bench_compare_parser = action.add_parser(
+        'bench-compare',
+        help='compare two benchmark result files, exits with 1 if any benchmark got slower than the threshold',
+    )
+    bench_compare_parser.add_argument('old', help='results of the reference run')
+    bench_compare_parser.add_argument('new', help='results of the run to check')
+    bench_compare_parser.add_argument(
+        '--threshold',
+        type=float,
+        default=10,
+        help='slowdown in percent of the best time per call above which a benchmark is flagged. (default: 10)',
+    )
 
     args = parser.parse_args()
 
@@ -76,6 +338,74 @@ def parse_options():
 
 def _main() -> bool:
     args = parse_options()
+    compound_filter = None
+    if args.include or args.exclude or args.kinds:
+        compound_filter = CompoundFilter(args.include, args.exclude, [Kind(kind) for kind in args.kinds])
+
+    if args.action == 'watch':
+        if args.input is None or args.output is None:
+            raise ValueError('-i/--input and -o/--output are required')
+        check_render_only_options(args)
+
+        watch(
+            output=args.output,
+            input_dir=args.input,
+            target=args.target or 'single-markdown',
+            link_prefix=args.link_prefix,
+            template_dir=args.template_dir,
+            template_lang=args.template_lang,
+            interval=args.interval,
+            prefetch_workers=args.prefetch_workers,
+            prefetch_budget=args.prefetch_budget * 1024 * 1024,
+            compound_filter=compound_filter,
+            lazy=args.lazy,
+            parse_threads=args.parse_threads,
+        )
+        return
+
+    if args.action == 'serve':
+        if args.input is None:
+            raise ValueError('-i/--input is required')
+        check_render_only_options(args)
+
+        serve(
+            input_dir=args.input,
+            host=args.host,
+            port=args.port,
+            target=args.target or 'single-markdown',
+            link_prefix=args.link_prefix,
+            template_dir=args.template_dir,
+            template_lang=args.template_lang,
+            interval=args.interval,
+            prefetch_workers=args.prefetch_workers,
+            prefetch_budget=args.prefetch_budget * 1024 * 1024,
+            compound_filter=compound_filter,
+            parse_threads=args.parse_threads,
+        )
+        return
+
+    if args.action == 'batch':
+        succeeded, modified = run_batch(
+            args.manifest,
+            jobs=args.jobs,
+            doxygen_bin=args.doxygen_bin,
+            skip_doxygen=args.skip_doxygen,
+            prefetch_workers=args.prefetch_workers,
+            prefetch_budget=args.prefetch_budget * 1024 * 1024,
+        )
+        if not succeeded:
+            sys.exit(1)
+        return modified
+
+    if args.action == 'bench':
+        run_benchmarks(args.xml_dirs, args.results, repeat=args.repeat, select=args.select)
+        return
+
+    if args.action == 'bench-compare':
+        if compare_results(args.old, args.new, threshold=args.threshold / 100):
+            sys.exit(1)
+        return
+
     if args.action:
         if os.path.isfile(args.output_dir):
             raise Exception('The [OUTPUT_DIR] should be a directory')
@@ -88,12 +418,7 @@ def _main() -> bool:
         print(f'Copied the default template files to {output_dir}')
         return
 
-    doxygen_bin = shutil.which(args.doxygen_bin)
-    if not doxygen_bin:
-        raise RuntimeError(f'{args.doxygen_bin} not found in your PATH')
-
-    doxygen_cmd = [doxygen_bin]
-    doxygen_cmd.extend(shlex.split(args.doxygen_extra_args))
+    doxygen_cmd = get_doxygen_cmd(args.doxygen_bin, args.doxygen_extra_args)
 
     proc = subprocess.run(doxygen_cmd, capture_output=True)  # noqa: PLW1510
     if proc.returncode != 0:
@@ -101,18 +426,51 @@ def _main() -> bool:
         error(proc.stderr.decode('utf-8'))
         sys.exit(1)
 
-    if args.input is None or args.output is None:
-        raise ValueError('-i/--input and -o/--output are required')
+    if args.input is None or (args.output is None and not args.output_spec):
+        raise ValueError('-i/--input and -o/--output (or --output-spec) are required')
 
-    return run(
-        input_dir=args.input,
-        output=args.output,
-        target=args.target or 'single-markdown',
-        debug=args.debug,
-        link_prefix=args.link_prefix,
-        template_dir=args.template_dir,
-        template_lang=args.template_lang,
-    )
+    defaults = {
+        'target': args.target or 'single-markdown',
+        'link_prefix': args.link_prefix,
+        'template_dir': args.template_dir,
+        'template_lang': args.template_lang,
+    }
+    outputs = []
+    if args.output is not None:
+        outputs.append(
+            OutputSpec(
+                output=args.output,
+                search_index=args.search_index,
+                section_manifest=args.section_manifest,
+                source_dir=args.source_dir,
+                split_size=args.split_size * 1024 if args.split_size else None,
+                **defaults,
+            )
+        )
+    for spec in args.output_spec:
+        outputs.append(OutputSpec(**{**defaults, **spec}))
+
+    if args.trace:
+        enable()
+    try:
+        return run_many(
+            input_dir=args.input,
+            outputs=outputs,
+            debug=args.debug,
+            prefetch_workers=args.prefetch_workers,
+            prefetch_budget=args.prefetch_budget * 1024 * 1024,
+            compound_filter=compound_filter,
+            lazy=args.lazy,
+            low_memory=args.low_memory,
+            source_jobs=args.source_jobs,
+            precompute_jobs=args.precompute_jobs,
+            parse_threads=args.parse_threads,
+        )
+    finally:
+        trace = disable()
+        if trace is not None:
+            trace.write(args.trace)
+            print(f'Trace events written to {args.trace}')
 
 
 def main_pre_commit():
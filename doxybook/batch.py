@@ -0,0 +1,210 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import typing as t
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+
+from jinja2 import (
+    Environment,
+)
+
+from doxybook.constants import (
+    Kind,
+)
+from doxybook.doxygen import (
+    CompoundFilter,
+)
+from doxybook.runner import (
+    OutputSpec,
+    run_many,
+)
+from doxybook.utils import (
+    error,
+    get_doxygen_cmd,
+    info,
+)
+
+
+class Component(t.NamedTuple):
+    """
+    One entry of the batch manifest. Relative paths are resolved against the directory of the manifest.
+    """
+
+    name: str
+    input: str  # doxygen generated xml folder
+    output: str
+    path: str = '.'  # doxygen working directory
+    target: str = 'single-markdown'
+    link_prefix: str = ''
+    template_dir: t.Optional[str] = None
+    template_lang: str = 'c'
+    search_index: t.Optional[str] = None
+    section_manifest: t.Optional[str] = None
+    source_dir: t.Optional[str] = None
+    split_size: t.Optional[int] = None  # KiB
+    doxygen_extra_args: str = ''
+    include: t.Sequence[str] = ()  # see CompoundFilter
+    exclude: t.Sequence[str] = ()
+    kinds: t.Sequence[str] = ()
+
+
+class ComponentResult(t.NamedTuple):
+    name: str
+    ok: bool
+    modified: bool = False
+    log: str = ''
+
+
+def load_manifest(manifest: str) -> t.List[Component]:
+    """
+    Load the components from a JSON manifest:
+
+    .. code-block:: json
+
+        {
+            "components": [
+                {"name": "foo", "path": "components/foo", "input": "components/foo/xml", "output": "docs/foo.md"}
+            ]
+        }
+    """
+    with open(manifest) as fr:
+        data = json.load(fr)
+
+    base_dir = os.path.dirname(os.path.abspath(manifest))
+
+    def resolve(path: t.Optional[str]) -> t.Optional[str]:
+        if path is None:
+            return None
+        return os.path.normpath(os.path.join(base_dir, path))
+
+    components = []
+    for i, item in enumerate(data.get('components', [])):
+        unknown = set(item) - set(Component._fields)
+        if unknown:
+            raise ValueError(f'Unknown keys in component #{i} of {manifest}: {", ".join(sorted(unknown))}')
+        item.setdefault('name', item.get('path', str(i)))
+        invalid = [kind for kind in item.get('kinds', ()) if kind not in {k.value for k in Kind}]
+        if invalid:
+            raise ValueError(f'Invalid kinds in component {item["name"]} of {manifest}: {", ".join(invalid)}')
+
+        component = Component(**item)
+        components.append(
+            component._replace(
+                path=resolve(component.path),
+                input=resolve(component.input),
+                output=resolve(component.output),
+                template_dir=resolve(component.template_dir),
+                search_index=resolve(component.search_index),
+                section_manifest=resolve(component.section_manifest),
+                source_dir=resolve(component.source_dir),
+            )
+        )
+    return components
+
+
+def _run_doxygen(component: Component, doxygen_bin: str) -> ComponentResult:
+    try:
+        cmd = get_doxygen_cmd(doxygen_bin, component.doxygen_extra_args)
+        proc = subprocess.run(cmd, cwd=component.path, capture_output=True)  # noqa: PLW1510
+    except Exception as e:
+        return ComponentResult(component.name, False, log=repr(e))
+
+    if proc.returncode != 0:
+        log = f'Failed to run command "{" ".join(cmd)}":\n' + proc.stderr.decode('utf-8', errors='replace')
+        return ComponentResult(component.name, False, log=log)
+    return ComponentResult(component.name, True)
+
+
+# jinja environments of the worker process, shared by all the components it renders
+_ENVS: t.Dict[t.Optional[str], Environment] = {}
+
+
+def _render_component(component: Component, prefetch_workers: int, prefetch_budget: int) -> ComponentResult:
+    # the per-node loading logs of parallel components would be interleaved, keep them for failures only
+    log = io.StringIO()
+    compound_filter = None
+    if component.include or component.exclude or component.kinds:
+        compound_filter = CompoundFilter(component.include, component.exclude, [Kind(k) for k in component.kinds])
+    try:
+        with contextlib.redirect_stdout(log):
+            modified = run_many(
+                component.input,
+                [
+                    OutputSpec(
+                        component.output,
+                        target=component.target,
+                        link_prefix=component.link_prefix,
+                        template_dir=component.template_dir,
+                        template_lang=component.template_lang,
+                        search_index=component.search_index,
+                        section_manifest=component.section_manifest,
+                        source_dir=component.source_dir,
+                        split_size=component.split_size * 1024 if component.split_size else None,
+                    )
+                ],
+                prefetch_workers=prefetch_workers,
+                prefetch_budget=prefetch_budget,
+                envs=_ENVS,
+                source_jobs=1,  # components are already rendered in parallel
+                compound_filter=compound_filter,
+            )
+    except Exception as e:
+        return ComponentResult(component.name, False, log=log.getvalue() + repr(e))
+    return ComponentResult(component.name, True, modified=modified)
+
+
+def run_batch(
+    manifest: str,
+    jobs: t.Optional[int] = None,
+    *,
+    doxygen_bin: str = 'doxygen',
+    skip_doxygen: bool = False,
+    prefetch_workers: int = 0,
+    prefetch_budget: int = 64 * 1024 * 1024,
+) -> t.Tuple[bool, bool]:
+    """
+    Run doxygen for all the components of the manifest, ``jobs`` at a time, then parse and render the components on a
+    shared pool of ``jobs`` processes.
+
+    :return: (all components succeeded, any output file was created or modified)
+    """
+    components = load_manifest(manifest)
+    jobs = jobs or os.cpu_count() or 1
+    succeeded = True
+
+    if not skip_doxygen:
+        info(f'Running doxygen for {len(components)} components, {jobs} at a time')
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(lambda c: _run_doxygen(c, doxygen_bin), components))
+
+        failed = {result.name for result in results if not result.ok}
+        for result in results:
+            if not result.ok:
+                error(f'[{result.name}] {result.log}')
+        if failed:
+            succeeded = False
+            components = [c for c in components if c.name not in failed]
+
+    info(f'Rendering {len(components)} components on {jobs} processes')
+    modified = False
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = [
+            pool.submit(_render_component, component, prefetch_workers, prefetch_budget) for component in components
+        ]
+        for component, future in zip(components, futures):
+            result = future.result()
+            if not result.ok:
+                succeeded = False
+                error(f'[{result.name}] failed to render {component.output}:\n{result.log}')
+            elif result.modified:
+                modified = True
+                print(f'[{result.name}] Updated {component.output}')
+            else:
+                print(f'[{result.name}] No changes detected in {component.output}')
+
+    return succeeded, modified
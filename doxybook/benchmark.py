@@ -0,0 +1,311 @@
+import contextlib
+import fnmatch
+import io
+import json
+import os
+import platform
+import statistics
+import time
+import timeit
+import tracemalloc
+import typing as t
+from xml.etree.ElementTree import (
+    Element,
+)
+
+from doxybook import (
+    __version__,
+)
+from doxybook.cache import (
+    Cache,
+)
+from doxybook.doxygen import (
+    Doxygen,
+)
+from doxybook.markdown import (
+    MdCodeBlock,
+    MdRenderer,
+    Text,
+    escape,
+)
+from doxybook.node import (
+    Node,
+)
+from doxybook.utils import (
+    error,
+    split_safe,
+    warning,
+)
+from doxybook.xml_parser import (
+    XmlParser,
+    codeline_text,
+)
+
+BENCHMARK_RESULTS_VERSION = 1
+
+# the XML committed with the tests, generated from sources shaped after the examples, so the benchmarks run without
+# doxygen and on the same inputs on every machine
+DEFAULT_XML_DIRS = [os.path.join('tests', 'fixtures', 'xml')]
+
+# the queries of the header sections, see c/file.jinja and cpp/file.jinja
+QUERIES = [
+    {'kinds': ['namespace']},
+    {'kinds': ['struct', 'class', 'interface']},
+    {'kinds': ['define']},
+    {'kinds': ['struct', 'typedef', 'enum', 'union']},
+    {'kinds': ['typedef', 'enum', 'union']},
+    {'kinds': ['function']},
+    {'kinds': ['variable']},
+]
+
+# minimum number of lines of the code blocks rendered by the MdRenderer benchmark, the listings are repeated up to it
+CODE_BLOCK_LINES = 10000
+
+
+class Fixtures:
+    """
+    Inputs of the benchmarks, extracted from the models of doxygen XML folders.
+    """
+
+    def __init__(self):
+        self.xml_dirs: t.List[str] = []
+        self.models: t.List[Doxygen] = []  # keeps the nodes and their XML alive
+        self.nodes: t.List[Node] = []  # with a valid anchor
+        self.descriptions: t.List[t.Tuple[XmlParser, Element]] = []
+        self.listings: t.List[t.List[str]] = []  # code lines of the program listings and the code blocks
+
+    def counts(self) -> t.Dict[str, int]:
+        return {
+            'nodes': len(self.nodes),
+            'descriptions': len(self.descriptions),
+            'listings': len(self.listings),
+            'code_lines': sum(len(listing) for listing in self.listings),
+        }
+
+
+def load_fixtures(xml_dirs: t.List[str]) -> Fixtures:
+    fixtures = Fixtures()
+    for xml_dir in xml_dirs:
+        if not os.path.isfile(os.path.join(xml_dir, 'index.xml')):
+            raise ValueError(f'{xml_dir} has no index.xml, run doxygen first or use {DEFAULT_XML_DIRS[0]}')
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            cache = Cache()
+            parser = XmlParser(cache=cache, target='single-markdown')
+            options = {'target': 'single-markdown', 'link_prefix': ''}
+            doxygen = Doxygen(xml_dir, parser, cache, options=options)
+        fixtures.xml_dirs.append(xml_dir)
+        fixtures.models.append(doxygen)
+
+        for _, node in sorted(cache.items(), key=lambda item: item[0]):
+            xml = node.__dict__.get('_xml')
+            if xml is None:
+                continue
+            try:
+                node.anchor
+            except Exception:  # incomplete nodes, never rendered
+                continue
+            fixtures.nodes.append(node)
+
+            # the members are nodes on their own, only take the descriptions of this node
+            for tag in ('briefdescription', 'detaileddescription'):
+                description = xml.find(tag)
+                if description is not None and len(description):
+                    fixtures.descriptions.append((parser, description))
+            if xml.tag == 'compounddef':
+                for listing in xml.iter('programlisting'):
+                    lines = [codeline_text(codeline) for codeline in listing.iterfind('codeline')]
+                    if lines:
+                        fixtures.listings.append(lines)
+    return fixtures
+
+
+class Benchmark(t.NamedTuple):
+    name: str
+    func: t.Callable[[], t.Any]
+    ops: int  # number of items processed by one call
+
+
+def create_benchmarks(fixtures: Fixtures) -> t.List[Benchmark]:
+    names = [node._name for node in fixtures.nodes]
+    nodes = fixtures.nodes
+    parents = [node for node in nodes if node._children]
+
+    def split_names():
+        for name in names:
+            split_safe(name, '::')
+
+    def escape_names():
+        for name in names:
+            escape(name)
+
+    def url_safe_names():
+        for node, name in zip(nodes, names):
+            node.url_safe(name)
+
+    def anchors():
+        for node in nodes:
+            node.anchor
+
+    def paras():
+        for parser, description in fixtures.descriptions:
+            parser.paras(description)
+
+    def paras_render():
+        for parser, description in fixtures.descriptions:
+            f = MdRenderer()
+            for m in parser.paras(description):
+                m.render(f, '')
+            f.output
+
+    def emit_paras():
+        for parser, description in fixtures.descriptions:
+            f = MdRenderer()
+            parser.emit_paras(description, f)
+            f.output
+
+    # copies of the listings, repeated up to CODE_BLOCK_LINES lines
+    blocks = []
+    total = sum(len(listing) for listing in fixtures.listings)
+    if total:
+        for _ in range(-(-CODE_BLOCK_LINES // total)):
+            blocks.extend(MdCodeBlock(list(listing)) for listing in fixtures.listings)
+
+    def render_code_blocks():
+        f = MdRenderer()
+        for block in blocks:
+            Text('\n').render(f, '')
+            block.render(f, '')
+        return f.output
+
+    def queries():
+        for node in parents:
+            node._invalidate_queries()  # measure the first queries of a section, the next ones are cached
+            for query in QUERIES:
+                node.query(**query)
+
+    return [
+        Benchmark('utils.split_safe', split_names, len(names)),
+        Benchmark('markdown.escape', escape_names, len(names)),
+        Benchmark('Node.url_safe', url_safe_names, len(nodes)),
+        Benchmark('Node.anchor', anchors, len(nodes)),
+        Benchmark('XmlParser.paras', paras, len(fixtures.descriptions)),
+        # the description rendering from the Md objects of paras, and without them
+        Benchmark('XmlParser.paras+render', paras_render, len(fixtures.descriptions)),
+        Benchmark('XmlParser.emit_paras', emit_paras, len(fixtures.descriptions)),
+        Benchmark('MdRenderer.code_blocks', render_code_blocks, sum(len(block.lines) for block in blocks)),
+        Benchmark('Node.query', queries, len(parents) * len(QUERIES)),
+    ]
+
+
+def measure(benchmark: Benchmark, repeat: int = 5) -> dict:
+    """
+    Time the benchmark ``repeat`` times, each over enough calls to last at least 0.2 seconds, and trace the memory
+    allocated by one more call.
+
+    :return: the best and median seconds per call, per processed item, and the peak of the traced allocations.
+    """
+    timer = timeit.Timer(benchmark.func)
+    number, _ = timer.autorange()
+    times = [total / number for total in timer.repeat(repeat, number)]
+
+    tracemalloc.start()
+    try:
+        benchmark.func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = min(times)
+    return {
+        'best': best,
+        'median': statistics.median(times),
+        'per_op': best / benchmark.ops if benchmark.ops else None,
+        'ops': benchmark.ops,
+        'number': number,
+        'repeat': repeat,
+        'peak_alloc': peak,
+    }
+
+
+def run_benchmarks(
+    xml_dirs: t.List[str],
+    results_filepath: t.Optional[str] = None,
+    repeat: int = 5,
+    select: t.Optional[t.List[str]] = None,
+) -> dict:
+    """
+    Run the benchmarks with a name matching any of the ``select`` globs, all of them if not set, on the fixtures of
+    ``xml_dirs``. The results are written to ``results_filepath`` as JSON, see ``compare_results``.
+    """
+    fixtures = load_fixtures(xml_dirs)
+    results = {}
+    for benchmark in create_benchmarks(fixtures):
+        if select and not any(fnmatch.fnmatch(benchmark.name, pattern) for pattern in select):
+            continue
+        if not benchmark.ops:
+            warning(f'{benchmark.name}: no fixtures in {", ".join(xml_dirs)}, skipped')
+            continue
+
+        result = measure(benchmark, repeat)
+        results[benchmark.name] = result
+        print(
+            f'{benchmark.name:<24} {result["best"] * 1e3:10.3f} ms/call {result["per_op"] * 1e6:10.3f} us/op '
+            f'{result["peak_alloc"] / 1024:10.1f} KiB peak ({benchmark.ops} ops)'
+        )
+
+    data = {
+        'version': BENCHMARK_RESULTS_VERSION,
+        'doxybook': __version__,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'fixtures': {'xml_dirs': fixtures.xml_dirs, **fixtures.counts()},
+        'benchmarks': results,
+    }
+    if results_filepath:
+        with open(results_filepath, 'w', encoding='utf-8') as fw:
+            json.dump(data, fw, indent=2, sort_keys=True)
+        print(f'Benchmark results written to {results_filepath}')
+    return data
+
+
+def compare_results(old_filepath: str, new_filepath: str, threshold: float = 0.1) -> t.List[str]:
+    """
+    Compare the best time per call of the benchmarks of two result files.
+
+    :param threshold: relative slowdown above which a benchmark is flagged, 0.1 for 10%.
+    :return: the names of the flagged benchmarks.
+    """
+    with open(old_filepath, encoding='utf-8') as fr:
+        old = json.load(fr)
+    with open(new_filepath, encoding='utf-8') as fr:
+        new = json.load(fr)
+
+    for key in ('version', 'python', 'implementation', 'platform', 'fixtures'):
+        if old.get(key) != new.get(key):
+            warning(f'The {key} differ: {old.get(key)} vs {new.get(key)}, the results may not be comparable')
+
+    slower = []
+    for name in sorted(set(old['benchmarks']) | set(new['benchmarks'])):
+        before = old['benchmarks'].get(name)
+        after = new['benchmarks'].get(name)
+        if before is None or after is None:
+            print(f'{name:<24} only in {new_filepath if before is None else old_filepath}')
+            continue
+
+        change = after['best'] / before['best'] - 1
+        flag = ''
+        if change > threshold:
+            flag = 'SLOWER'
+            slower.append(name)
+        elif change < -threshold:
+            flag = 'faster'
+        print(
+            f'{name:<24} {before["best"] * 1e3:10.3f} ms -> {after["best"] * 1e3:10.3f} ms {change * 100:+8.1f}% {flag}'
+        )
+
+    if slower:
+        error(f'{len(slower)} benchmarks slower by more than {threshold * 100:g}%: {", ".join(slower)}')
+    return slower
@@ -1,12 +1,122 @@
+import threading
+import typing as t
+from collections import (
+    OrderedDict,
+)
+
+from doxybook.hierarchy import (
+    ClassHierarchy,
+)
+
+
 class Cache:
-    def __init__(self):
-        self.cache = {}
+    """
+    Registry of the nodes by refid, safe to use from several threads.
+
+    The nodes are spread over ``shards`` dictionaries with a lock each, so that the threads adding and looking up
+    different refids seldom wait for each other. The compounds of a lazily loaded model are loaded one at a time,
+    under ``load_lock``.
+    """
+
+    def __init__(self, shards: int = 16):
+        self._shards: t.List[t.Dict[str, t.Any]] = [{} for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+        # key -> key of the compound defining it, for the members of a lazily loaded model that are not loaded yet
+        self.owners: t.Dict[str, str] = {}
+        # compound nodes holding their parsed XML, see Node.release
+        self.loaded: t.List[t.Any] = []
+        self.hierarchy = ClassHierarchy(self)
+        # reentrant, loading a compound loads the compounds it declares
+        self.load_lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
 
     def add(self, key: str, value):
-        self.cache[key] = value
+        i = hash(key) % len(self._shards)
+        with self._locks[i]:
+            self._shards[i][key] = value
+
+    def items(self) -> t.List[t.Tuple[str, t.Any]]:
+        """
+        Snapshot of all the (key, node) pairs.
+        """
+        ret = []
+        for shard, lock in zip(self._shards, self._locks):
+            with lock:
+                ret.extend(shard.items())
+        return ret
 
     def get(self, key: str):
-        if key in self.cache:
-            return self.cache[key]
-        else:
+        ret = self.find(key)
+        if ret is None:
             raise IndexError('Key: ' + key + ' not found in cache!')
+        return ret
+
+    def find(self, key: str, default=None):
+        """
+        Same as ``get``, but returns ``default`` instead of raising when the key is missing.
+
+        A missing member of a compound that is not loaded yet loads the compound first.
+        """
+        ret = self._lookup(key)
+        if ret is None and key in self.owners:
+            with self.load_lock:
+                # the owner is forgotten once loaded only, a concurrent lookup waits for the load above
+                owner_key = self.owners.get(key)
+                if owner_key is not None:
+                    owner = self._lookup(owner_key)
+                    if owner is not None:
+                        owner.materialize()
+                    self.owners.pop(key, None)
+            ret = self._lookup(key)
+        return default if ret is None else ret
+
+    def _lookup(self, key: str):
+        i = hash(key) % len(self._shards)
+        with self._locks[i]:
+            return self._shards[i].get(key)
+
+
+class LruCache:
+    """
+    Bounded least-recently-used cache with hit/miss counters, safe to use from several threads.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: t.Hashable, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def add(self, key: t.Hashable, value):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
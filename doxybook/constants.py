@@ -49,6 +49,12 @@ OVERLOAD_OPERATORS = [
 PACKAGE_DIR = os.path.dirname(__file__)
 DEFAULT_TEMPLATES_DIR = os.path.join(PACKAGE_DIR, 'templates')
 
+# kinds of the children of a header file rendered with an anchor by the <lang>/file.jinja templates
+SECTION_KINDS = {
+    'c': ['define', 'struct', 'typedef', 'enum', 'union', 'function'],
+    'cpp': ['namespace', 'struct', 'class', 'interface', 'define', 'typedef', 'enum', 'union', 'function'],
+}
+
 
 class Kind(Enum):
     NONE = 'none'
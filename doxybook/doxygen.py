@@ -1,7 +1,10 @@
 import os
 import typing as t
-from xml.etree import (
-    ElementTree,
+from fnmatch import (
+    fnmatchcase,
+)
+from xml.etree.ElementTree import (
+    Element,
 )
 
 from doxybook.cache import (
@@ -14,69 +17,227 @@ from doxybook.constants import (
 from doxybook.node import (
     Node,
 )
+from doxybook.reader import (
+    XmlReader,
+)
+from doxybook.trace import (
+    span,
+)
 from doxybook.xml_parser import (
     XmlParser,
 )
 
 
+class CompoundFilter:
+    """
+    Selects the compounds of index.xml to load from their kind and name, before any compound file is opened.
+
+    Patterns are shell globs matched against the compound names of index.xml: the file name for files, the qualified
+    name for classes and namespaces. Skipped compounds are still loaded when a loaded compound refers to them as an
+    inner compound, e.g. the classes and namespaces declared in an included header file.
+    """
+
+    def __init__(
+        self,
+        include: t.Optional[t.Iterable[str]] = None,
+        exclude: t.Optional[t.Iterable[str]] = None,
+        kinds: t.Optional[t.Iterable[Kind]] = None,
+    ):
+        self.include = list(include or [])  # file compounds to load, all of them if empty
+        self.exclude = list(exclude or [])  # compounds of any kind to skip
+        self.kinds = set(kinds) if kinds else None  # compound kinds to load, all of them if not set
+
+    def match(self, kind: Kind, name: str) -> bool:
+        if self.kinds is not None and kind not in self.kinds:
+            return False
+        if any(fnmatchcase(name, pattern) for pattern in self.exclude):
+            return False
+        if kind == Kind.DIR:
+            # a directory loads all the files under it
+            return not self.include and not self.exclude
+        if kind == Kind.FILE and self.include:
+            return any(fnmatchcase(name, pattern) for pattern in self.include)
+        return True
+
+
 class Doxygen:
-    def __init__(self, index_path: str, parser: XmlParser, cache: Cache, options: dict = {}):
+    def __init__(
+        self,
+        index_path: str,
+        parser: XmlParser,
+        cache: Cache,
+        options: t.Optional[dict] = None,
+        *,
+        reader: t.Optional[XmlReader] = None,
+        compound_filter: t.Optional[CompoundFilter] = None,
+        lazy: bool = False,
+    ):
+        """
+        :param options: the target and the link prefix, shared by all the nodes, see ``set_target``.
+        :param lazy: build proxy nodes from index.xml, and parse the compound files on the first access to their data.
+            Only the groups and the files their members are extracted to are parsed up front. ``root``, ``files`` and
+            ``pages`` are completed by ``materialize``.
+        """
+        self.parser = parser
+        self.cache = cache
+        self.reader = reader or XmlReader()
+        # the same dict for all the nodes, even when empty
+        self._options = options if options is not None else {}
+        self._lazy = lazy
+
         path = os.path.join(index_path, 'index.xml')
         print('Loading XML from: ' + path)
-        xml = ElementTree.parse(path).getroot()
+        with span('index.xml', 'compound'):
+            xml = self.reader.parse(path)
+        compounds = xml.findall('compound')
+        if compound_filter is not None:
+            total = len(compounds)
+            compounds = [
+                compound
+                for compound in compounds
+                if compound_filter.match(Kind.from_str(compound.get('kind')), compound.findtext('name', ''))
+            ]
+            print(f'Loading {len(compounds)} of {total} compounds')
 
-        self.parser = parser
-        self.cache = cache
-        self._options = options
         self.root = Node('root', None, self.cache, self.parser, None, options=self._options)
         self.groups = Node('root', None, self.cache, self.parser, None, options=self._options)
         self.files = Node('root', None, self.cache, self.parser, None, options=self._options)
         self.pages = Node('root', None, self.cache, self.parser, None, options=self._options)
         self.header_files = Node('root', None, self.cache, self.parser, None, options=self._options)
 
-        for compound in xml.findall('compound'):
-            kind = Kind.from_str(compound.get('kind'))
-            refid = compound.get('refid')
-            node = Node(
-                os.path.join(index_path, refid + '.xml'),
-                None,
-                self.cache,
-                self.parser,
-                self.root,
-                options=self._options,
-            )
-            node._visibility = Visibility.PUBLIC
-            if kind.is_language():
-                self.root.add_child(node)
-            elif kind == Kind.GROUP:
-                self.groups.add_child(node)
-            elif kind in (Kind.FILE, Kind.DIR):
-                self.files.add_child(node)
-                if node.is_header_file:
-                    self.header_files.add_child(node)
-            elif kind == Kind.PAGE:
-                self.pages.add_child(node)
+        if not lazy:
+            self.reader.prefetch([os.path.join(index_path, compound.get('refid') + '.xml') for compound in compounds])
+        try:
+            for compound in compounds:
+                kind = Kind.from_str(compound.get('kind'))
+                refid = compound.get('refid')
+                if lazy:
+                    node = self._create_proxy(index_path, compound, kind)
+                else:
+                    node = Node(
+                        os.path.join(index_path, refid + '.xml'),
+                        None,
+                        self.cache,
+                        self.parser,
+                        self.root,
+                        options=self._options,
+                        reader=self.reader,
+                    )
+                node._visibility = Visibility.PUBLIC
+                if kind.is_language():
+                    self.root.add_child(node)
+                elif kind == Kind.GROUP:
+                    self.groups.add_child(node)
+                elif kind in (Kind.FILE, Kind.DIR):
+                    self.files.add_child(node)
+                    if node.is_header_file:
+                        self.header_files.add_child(node)
+                elif kind == Kind.PAGE:
+                    self.pages.add_child(node)
+        finally:
+            self.reader.close()
 
         print('Extracting members from groups...')
-        self._extract_group_members()
+        with span('extract group members', 'model'):
+            self._extract_group_members()
+
+        if lazy:
+            for child in self.groups.children.copy():
+                self._fix_duplicates(child, self.groups, [Kind.GROUP])
+            for node in (self.root, self.groups, self.files, self.pages):
+                node.sort_children()
+        else:
+            self._complete_trees()
+
+        self.parser.build_link_table()
 
+    def _create_proxy(self, index_path: str, compound: Element, kind: Kind) -> Node:
+        refid = compound.get('refid')
+        for member in compound.findall('member'):
+            member_refid = member.get('refid')
+            # member ids are prefixed by the id of the compound defining them
+            if member_refid.startswith(refid + '_1'):
+                self.cache.owners[member_refid] = refid
+
+        return Node.proxy(
+            os.path.join(index_path, refid + '.xml'),
+            refid,
+            kind,
+            compound.findtext('name', ''),
+            self.cache,
+            parser=self.parser,
+            parent=self.root,
+            options=self._options,
+            reader=self.reader,
+        )
+
+    def materialize(self) -> None:
+        """
+        Parse all the compound files of a lazily loaded model, and complete its trees. No-op for an eager model.
+        """
+        if not self._lazy:
+            return
+        self._lazy = False
+
+        visited = set()
+        stack = self.root.children + self.groups.children + self.files.children + self.pages.children
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            node.materialize()
+            stack.extend(node.children)
+
+        self._complete_trees()
+        self.parser.build_link_table()
+
+    def release(self) -> None:
+        """
+        Drop the parsed XML of all the loaded compounds and the rendered description fragments. The nodes stay valid,
+        their compound files are parsed again on the next access to their XML data.
+        """
+        loaded = self.cache.loaded
+        self.cache.loaded = []
+        for node in loaded:
+            node.release()
+        self.parser.fragments.clear()
+
+    def _complete_trees(self) -> None:
         print('Deduplicating data... (may take a minute!)')
-        for i, child in enumerate(self.root.children.copy()):
-            self._fix_duplicates(child, self.root, [])
+        with span('deduplicate', 'model'):
+            for i, child in enumerate(self.root.children.copy()):
+                self._fix_duplicates(child, self.root, [])
 
-        for i, child in enumerate(self.groups.children.copy()):
-            self._fix_duplicates(child, self.groups, [Kind.GROUP])
+            for i, child in enumerate(self.groups.children.copy()):
+                self._fix_duplicates(child, self.groups, [Kind.GROUP])
 
-        for i, child in enumerate(self.files.children.copy()):
-            self._fix_duplicates(child, self.files, [Kind.FILE, Kind.DIR])
+            for i, child in enumerate(self.files.children.copy()):
+                self._fix_duplicates(child, self.files, [Kind.FILE, Kind.DIR])
 
-        self._fix_parents(self.files)
+            self._fix_parents(self.files)
 
         print('Sorting...')
-        self._recursive_sort(self.root)
-        self._recursive_sort(self.groups)
-        self._recursive_sort(self.files)
-        self._recursive_sort(self.pages)
+        with span('sort', 'model'):
+            self._recursive_sort(self.root)
+            self._recursive_sort(self.groups)
+            self._recursive_sort(self.files)
+            self._recursive_sort(self.pages)
+
+    def set_target(self, target: str, link_prefix: str = '') -> None:
+        """
+        Switch the target and the link prefix used for the anchors and the links of all the nodes.
+
+        The parsed data is kept, only the link table is computed again.
+        """
+        if self._options.get('target') == target and self._options.get('link_prefix') == link_prefix:
+            return
+
+        # shared by all the nodes
+        self._options['target'] = target
+        self._options['link_prefix'] = link_prefix
+        self.parser.target = target
+        self.parser.build_link_table()
 
     def _extract_group_members(self):
         """
@@ -84,6 +245,7 @@ class Doxygen:
         effectively flattening the group hierarchy and treating group members as regular items.
         """
         extracted_refids = set()  # Track already extracted members to avoid duplicates
+        updated_files: t.Dict[str, Node] = {}  # Files that members were added to
 
         def find_file_for_member(member: Node) -> t.Optional[Node]:
             """Find the appropriate file node for a member based on its location"""
@@ -93,6 +255,8 @@ class Doxygen:
 
             # Search through all files to find the one that matches the member's location
             for file_node in self.files.children:
+                if self._lazy and file_node.name != os.path.basename(member_location):
+                    continue  # do not load all the files to compare their locations
                 if file_node.is_file and file_node.location == member_location:
                     return file_node
             return None
@@ -118,6 +282,7 @@ class Doxygen:
                     member._parent = target_file
                     if member not in target_file.children:
                         target_file.add_child(member)
+                        updated_files[target_file.refid] = target_file
                 else:
                     # If no file found, add to root as fallback
                     member._parent = self.root
@@ -127,6 +292,10 @@ class Doxygen:
         for group in self.groups.children:
             extract_from_group(group)
 
+        if self._lazy:  # sorted with the rest of the tree otherwise
+            for file_node in updated_files.values():
+                file_node.sort_children()
+
     def _fix_parents(self, node: Node):
         if node.is_dir or node.is_root:
             for child in node.children:
@@ -147,9 +316,9 @@ class Doxygen:
         return False
 
     def _remove_from_root(self, refid: str, root: Node):
-        for i, child in enumerate(root.children):
+        for child in root.children:
             if child.refid == refid:
-                root.children.pop(i)
+                root.remove_child(child)
                 return
 
     def _fix_duplicates(self, node: Node, root: Node, filter: t.List[Kind]):
@@ -161,6 +330,7 @@ class Doxygen:
             self._fix_duplicates(child, root, filter)
 
     def print(self):
+        self.materialize()
         for node in self.root.children:
             self.print_node(node, '')
         for node in self.groups.children:
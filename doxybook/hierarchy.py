@@ -0,0 +1,96 @@
+import typing as t
+from collections import (
+    deque,
+)
+from xml.etree.ElementTree import (
+    Element,
+)
+
+# (refid, name) of a base or derived compound, the refid is None for the undocumented ones
+CompoundRef = t.Tuple[t.Optional[str], str]
+
+
+class ClassHierarchy:
+    """
+    Inheritance and reimplementation graph, filled by the nodes while their XML is parsed.
+
+    Direct lookups are dictionary lookups. Transitive closures are computed on their first use, and cached until a
+    compound is added. Compounds of a lazily loaded model are loaded on their first lookup, the refids without an entry
+    once loaded are recorded as such, so that the next lookups do not look for their owner again.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._bases: t.Dict[str, t.List[CompoundRef]] = {}
+        self._derived: t.Dict[str, t.List[CompoundRef]] = {}
+        self._reimplements: t.Dict[str, t.Optional[str]] = {}
+        self._reimplemented_by: t.Dict[str, t.List[str]] = {}
+        # (direction, refid) -> refids of all the documented ancestors or descendants, nearest first
+        self._closures: t.Dict[t.Tuple[str, str], t.List[str]] = {}
+
+    def add_compound(self, refid: str, xml: Element) -> None:
+        self._bases[refid] = [(ref.get('refid'), ref.text) for ref in xml.findall('basecompoundref')]
+        self._derived[refid] = [(ref.get('refid'), ref.text) for ref in xml.findall('derivedcompoundref')]
+        self._closures.clear()
+
+    def add_member(self, refid: str, xml: Element) -> None:
+        reimplements = xml.find('reimplements')
+        if reimplements is not None:
+            self._reimplements[refid] = reimplements.get('refid')
+
+        reimplemented_by = [ref.get('refid') for ref in xml.findall('reimplementedby')]
+        if reimplemented_by:
+            self._reimplemented_by[refid] = reimplemented_by
+
+    def bases(self, refid: str) -> t.List[CompoundRef]:
+        if refid not in self._bases:
+            self._load(refid)
+            self._bases.setdefault(refid, [])
+        return self._bases[refid]
+
+    def derived(self, refid: str) -> t.List[CompoundRef]:
+        if refid not in self._derived:
+            self._load(refid)
+            self._derived.setdefault(refid, [])
+        return self._derived[refid]
+
+    def reimplements(self, refid: str) -> t.Optional[str]:
+        if refid not in self._reimplements:
+            self._load(refid)
+            self._reimplements.setdefault(refid, None)
+        return self._reimplements[refid]
+
+    def reimplemented_by(self, refid: str) -> t.List[str]:
+        if refid not in self._reimplemented_by:
+            self._load(refid)
+            self._reimplemented_by.setdefault(refid, [])
+        return self._reimplemented_by[refid]
+
+    def all_bases(self, refid: str) -> t.List[str]:
+        return self._closure('bases', refid, self.bases)
+
+    def all_derived(self, refid: str) -> t.List[str]:
+        return self._closure('derived', refid, self.derived)
+
+    def _closure(self, direction: str, refid: str, direct: t.Callable[[str], t.List[CompoundRef]]) -> t.List[str]:
+        key = (direction, refid)
+        ret = self._closures.get(key)
+        if ret is not None:
+            return ret
+
+        ret = []
+        seen = {refid}
+        queue = deque([refid])
+        while queue:
+            for ref, _ in direct(queue.popleft()):
+                if ref is not None and ref not in seen:
+                    seen.add(ref)
+                    ret.append(ref)
+                    queue.append(ref)
+        self._closures[key] = ret
+        return ret
+
+    def _load(self, refid: str) -> None:
+        node = self._cache.find(refid)
+        if node is not None:
+            node.materialize()
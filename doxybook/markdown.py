@@ -13,16 +13,27 @@ def escape(s: str) -> str:
 
 class MdRenderer:
     def __init__(self):
-        self.output = ''
+        # written pieces, joined on the first read of output instead of copying the whole output on each write
+        self._parts: List[str] = []
         self.eol_flag = True
 
+    @property
+    def output(self) -> str:
+        if len(self._parts) != 1:
+            self._parts = [''.join(self._parts)]
+        return self._parts[0]
+
+    @output.setter
+    def output(self, value: str):
+        self._parts = [value]
+
     def write(self, s: str):
-        self.output += s
+        self._parts.append(s)
         self.eol_flag = False
 
     def eol(self):
         if not self.eol_flag:
-            self.output += '\n'
+            self._parts.append('\n')
             self.eol_flag = True
 
 
@@ -106,11 +117,7 @@ class MdCodeBlock:
         self.lines.append(line)
 
     def render(self, f: MdRenderer, indent: str):
-        f.write('````' + self.lang + '\n')
-        for line in self.lines:
-            f.write(line)
-            f.write('\n')
-        f.write('````\n\n')
+        f.write('````' + self.lang + '\n' + ''.join(line + '\n' for line in self.lines) + '````\n\n')
 
 
 class MdBlockQuote(Md):
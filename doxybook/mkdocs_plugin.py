@@ -0,0 +1,73 @@
+import os
+
+from mkdocs.config import (
+    config_options,
+)
+from mkdocs.plugins import (
+    BasePlugin,
+)
+
+from doxybook.constants import (
+    SUPPORTED_LANGS,
+)
+from doxybook.model import (
+    Model,
+)
+
+
+class DoxybookPlugin(BasePlugin):
+    """
+    Render the API reference into the docs dir before each build.
+
+    The model is kept alive between the rebuilds of ``mkdocs serve``, and rendered again only when the XML files
+    changed. Enable it in ``mkdocs.yml``:
+
+    .. code-block:: yaml
+
+        plugins:
+          - esp-doxybook:
+              xml_dir: xml
+              output: api.md
+    """
+
+    config_scheme = (
+        ('xml_dir', config_options.Type(str, required=True)),  # relative to mkdocs.yml
+        ('output', config_options.Type(str, default='api.md')),  # relative to the docs dir
+        ('target', config_options.Type(str, default='single-markdown')),
+        ('link_prefix', config_options.Type(str, default='')),
+        ('template_dir', config_options.Type(str, default='')),  # relative to mkdocs.yml
+        ('template_lang', config_options.Choice(SUPPORTED_LANGS, default='c')),
+        ('lazy', config_options.Type(bool, default=False)),
+    )
+
+    def __init__(self):
+        super().__init__()
+        self.model = None
+        self._rendered_fingerprint = None
+
+    def _path(self, config, path: str) -> str:
+        return os.path.join(os.path.dirname(os.path.abspath(config['config_file_path'])), path)
+
+    def on_pre_build(self, config, **kwargs):
+        xml_dir = self._path(config, self.config['xml_dir'])
+        if self.model is None or self.model.xml_dir != xml_dir:
+            self.model = Model(xml_dir, lazy=self.config['lazy'])
+        else:
+            self.model.refresh()
+
+        # writing an unchanged output again would trigger another rebuild of mkdocs serve
+        if self.model.fingerprint == self._rendered_fingerprint:
+            return
+
+        self.model.write(
+            os.path.join(config['docs_dir'], self.config['output']),
+            target=self.config['target'],
+            link_prefix=self.config['link_prefix'],
+            template_dir=self._path(config, self.config['template_dir']) if self.config['template_dir'] else None,
+            template_lang=self.config['template_lang'],
+        )
+        self._rendered_fingerprint = self.model.fingerprint
+
+    def on_serve(self, server, config, builder, **kwargs):
+        server.watch(self._path(config, self.config['xml_dir']))
+        return server
@@ -0,0 +1,141 @@
+import hashlib
+import os
+import typing as t
+
+from jinja2 import (
+    Environment,
+)
+
+from doxybook.cache import (
+    Cache,
+)
+from doxybook.doxygen import (
+    CompoundFilter,
+    Doxygen,
+)
+from doxybook.reader import (
+    CachingReader,
+)
+from doxybook.runner import (
+    create_environment,
+    create_reader,
+    get_output_filepath,
+    render,
+    write_output,
+)
+from doxybook.xml_parser import (
+    XmlParser,
+)
+
+
+def xml_fingerprint(xml_dir: str) -> str:
+    """
+    Hash of the names, sizes and modification times of the XML files of ``xml_dir``. Changes when doxygen runs again
+    and updates any of them. For a file holding the XML files, its size and modification time.
+    """
+    if os.path.isfile(xml_dir):
+        st = os.stat(xml_dir)
+        return hashlib.sha1(f'{st.st_size}:{st.st_mtime_ns}'.encode()).hexdigest()
+
+    entries = []
+    with os.scandir(xml_dir) as it:
+        for entry in it:
+            if entry.name.endswith('.xml') and entry.is_file():
+                st = entry.stat()
+                entries.append(f'{entry.name}:{st.st_size}:{st.st_mtime_ns}')
+    entries.sort()
+    return hashlib.sha1('\n'.join(entries).encode('utf-8')).hexdigest()
+
+
+class Model:
+    """
+    Parsed doxygen XML, kept in memory and rendered as many times as needed.
+
+    The model tree is kept between the renders, the parsed XML of its compounds and the rendered description fragments
+    are released after each of them, as with ``Doxygen.release``, and parsed again by the next render.
+    """
+
+    def __init__(
+        self,
+        xml_dir: str,
+        lazy: bool = False,
+        compound_filter: t.Optional[CompoundFilter] = None,
+        prefetch_workers: int = 0,
+        prefetch_budget: int = 64 * 1024 * 1024,
+    ):
+        self.xml_dir = xml_dir
+        self.lazy = lazy
+        self.compound_filter = compound_filter
+        self.fingerprint: t.Optional[str] = None
+        self.doxygen: t.Optional[Doxygen] = None
+
+        self._reader = CachingReader(create_reader(prefetch_workers, prefetch_budget, xml_dir))
+        self._envs: t.Dict[t.Optional[str], Environment] = {}
+        self.reload()
+
+    @property
+    def is_stale(self) -> bool:
+        return xml_fingerprint(self.xml_dir) != self.fingerprint
+
+    def reload(self) -> None:
+        self.fingerprint = xml_fingerprint(self.xml_dir)
+        cache = Cache()
+        parser = XmlParser(cache=cache)
+        self.doxygen = Doxygen(
+            self.xml_dir,
+            parser,
+            cache,
+            options={'target': 'single-markdown', 'link_prefix': ''},
+            reader=self._reader,
+            compound_filter=self.compound_filter,
+            lazy=self.lazy,
+        )
+
+    def refresh(self) -> bool:
+        """
+        Reload the model if the XML files changed.
+
+        :return: True if the model was reloaded.
+        """
+        if not self.is_stale:
+            return False
+        self.reload()
+        return True
+
+    def render(
+        self,
+        target: str = 'single-markdown',
+        link_prefix: str = '',
+        template_dir: t.Optional[str] = None,
+        template_lang: t.Optional[str] = 'c',
+    ) -> str:
+        self.doxygen.set_target(target, link_prefix)
+        if template_dir not in self._envs:
+            self._envs[template_dir] = create_environment(template_dir)
+        try:
+            return render(self.doxygen, self._envs[template_dir], template_lang)
+        finally:
+            self.doxygen.release()
+            self._reader.release()
+
+    def write(self, output: str, **kwargs) -> bool:
+        """
+        Render the model into ``output``, a markdown file or a folder, see ``render`` for the arguments.
+
+        :return: True if the file was created or modified.
+        """
+        return write_output(get_output_filepath(output), self.render(**kwargs))
+
+
+def load(xml_dir: str, **kwargs) -> Model:
+    """
+    Parse the doxygen XML output in ``xml_dir``, see ``Model`` for the arguments.
+
+    .. code-block:: python
+
+        import doxybook
+
+        model = doxybook.load('docs/xml')
+        markdown = model.render(template_lang='cpp')
+    """
+    return Model(xml_dir, **kwargs)
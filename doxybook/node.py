@@ -1,8 +1,6 @@
 import os
+import threading
 import typing as t
-from xml.etree import (
-    ElementTree,
-)
 from xml.etree.ElementTree import (
     Element,
 )
@@ -19,8 +17,15 @@ from doxybook.markdown import (
     escape,
 )
 from doxybook.property import (
+    Fields,
     Property,
 )
+from doxybook.reader import (
+    XmlReader,
+)
+from doxybook.trace import (
+    span,
+)
 from doxybook.utils import (
     split_safe,
 )
@@ -30,6 +35,26 @@ from doxybook.xml_parser import (
 
 
 class Node:
+    # attributes holding the parsed XML of a node, dropped by release
+    _XML_ATTRS = (
+        '_xml',
+        '_fields',
+        '_details',
+        '_brief',
+        '_includes',
+        '_type',
+        '_location',
+        '_params',
+        '_templateparams',
+        '_specifiers',
+        '_values',
+        '_initializer',
+        '_definition',
+        '_programlisting',
+    )
+    # attributes set by the materialization of a proxy, the only ones loaded on access, see __getattr__
+    _LAZY_ATTRS = frozenset((*_XML_ATTRS, '_children', '_title'))
+
     def __init__(
         self,
         xml_file: str,
@@ -39,29 +64,202 @@ class Node:
         parent: 'Node',
         refid: str = None,
         options: t.Optional[dict] = None,
+        *,
+        reader: t.Optional[XmlReader] = None,
     ):
+        self._init_common(cache, parser, parent, options, reader)
         self._children: [Node] = []
-        self._cache: Cache = cache
-        self._parser: XmlParser = parser
-        self._parent = parent
-        self._options = options or {}
 
         if xml_file == 'root':
+            self._xml_file = None
             self._refid = 'root'
             self._kind = Kind.from_str('root')
             self._name = 'root'
             self._xml = None
 
         elif xml is None:
+            self._load_compound(xml_file)
+
+        else:
+            # members are defined in the compound file of their parent
+            self._xml_file = xml_file if xml_file is not None else getattr(parent, '_xml_file', None)
+            self._xml = xml
+            self._kind = Kind.from_str(self._xml.get('kind'))
+            if refid is not None:
+                self._refid = refid
+            else:
+                self._refid = self._xml.get('id')
+            self._cache.add(self._refid, self)
+            self._cache.hierarchy.add_member(self._refid, self._xml)
+
+            print('Parsing: ' + self._refid)
+            self._check_attrs()
+            self._title = self._name
+
+        self._init_properties()
+
+    @classmethod
+    def proxy(
+        cls,
+        xml_file: str,
+        refid: str,
+        kind: Kind,
+        name: str,
+        cache: Cache,
+        *,
+        parser: XmlParser,
+        parent: 'Node',
+        options: t.Optional[dict] = None,
+        reader: t.Optional[XmlReader] = None,
+    ) -> 'Node':
+        """
+        Compound node built from its index.xml entry only. Its compound file is parsed on the first access to any
+        other data of the node, see ``materialize``.
+        """
+        node = cls.__new__(cls)
+        node._init_common(cache, parser, parent, options, reader)
+        node._lazy = True
+        node._xml_file = xml_file
+        node._dirname = os.path.dirname(xml_file)
+        node._refid = refid
+        node._kind = kind
+        node._name = name
+        node._static = False
+        cache.add(refid, node)
+        return node
+
+    def __getattr__(self, name: str):
+        # only called for the attributes that are not set, i.e. the compound data of a proxy that is not loaded yet,
+        # or the XML data of a released node. Any other missing attribute is a bug, not loaded again.
+        if name not in self._LAZY_ATTRS:
+            raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+        loading = self.__dict__.get('_loading')
+        if self.__dict__.get('_lazy'):
+            self.materialize()
+        elif loading is not None and loading != threading.get_ident():
+            self._wait_loaded()
+        elif self.__dict__.get('_home') is not None:
+            self.__dict__['_home']._reload()
+        else:
+            raise AttributeError(name)
+        return getattr(self, name)
+
+    @property
+    def is_loaded(self) -> bool:
+        """
+        The parsed XML of the node is available: it is not a proxy, and it was not released.
+        """
+        return not self._lazy and self._home is None
+
+    def materialize(self) -> None:
+        """
+        Parse the compound file of a proxy node. No-op for the other nodes.
+        """
+        if not self._lazy:
+            return
+
+        with self._cache.load_lock:
+            if not self._lazy:  # materialized by another thread meanwhile
+                return
+
+            self._loading = threading.get_ident()
+            self._lazy = False
+            try:
+                self._children = []
+                # the node that replaced the proxy in the cache, if the compound declaring it was loaded first
+                cached = self._cache.find(self._refid)
+                self._load_compound(self._xml_file)
+                self._init_properties()
+                if cached is not None and cached is not self:
+                    self._cache.add(self._refid, cached)
+
+                # the eager model sorts the whole tree once it is loaded, sort the nodes created by this compound
+                stack = [self]
+                while stack:
+                    node = stack.pop()
+                    node.sort_children()
+                    stack.extend(child for child in node._children if child._parent is node and not child._lazy)
+            finally:
+                self._loading = None
+
+    def _wait_loaded(self) -> None:
+        """
+        Wait until the node is materialized, if another thread is materializing it.
+        """
+        loading = self._loading
+        if loading is not None and loading != threading.get_ident():
+            with self._cache.load_lock:
+                pass
+
+    def release(self) -> None:
+        """
+        Drop the parsed XML of a loaded compound and of the members defined in its compound file. The tree is kept,
+        the compound file is parsed again on the next access to their XML data.
+        """
+        if self._lazy or self._xml_file is None or self.__dict__.get('_xml') is None:
+            return
+
+        members = []
+        for child in self._children:
+            xml = child.__dict__.get('_xml')
+            if xml is not None and xml.tag == 'memberdef' and child._xml_file == self._xml_file:
+                members.append(child)
+
+        for node in [self, *members]:
+            for attr in self._XML_ATTRS:
+                node.__dict__.pop(attr, None)
+            node._home = self
+        self._released_members = members
+
+    def _reload(self) -> None:
+        print('Loading XML from: ' + self._xml_file)
+        with span(os.path.basename(self._xml_file), 'compound', reload=True):
+            self._xml = self._reader.parse(self._xml_file).find('compounddef')
+        self._home = None
+        self._init_properties()
+        self._cache.loaded.append(self)
+
+        memberdefs = {memberdef.get('id'): memberdef for memberdef in self._xml.iter('memberdef')}
+        for member in self._released_members:
+            member._xml = memberdefs.get(member._refid)
+            member._home = None
+            member._init_properties()
+        self._released_members = []
+
+    def _init_common(
+        self,
+        cache: Cache,
+        parser: XmlParser,
+        parent: 'Node',
+        options: t.Optional[dict],
+        reader: t.Optional[XmlReader],
+    ) -> None:
+        self._lazy = False
+        self._loading: t.Optional[int] = None  # id of the thread materializing the node
+        self._home: t.Optional[Node] = None  # compound to parse again for the XML data of a released node
+        # (kind, visibility, static) -> indices into self._children, built on the first query
+        self._buckets: t.Optional[t.Dict[tuple, t.List[int]]] = None
+        self._queries: t.Dict[tuple, t.List[Node]] = {}
+        self._cache: Cache = cache
+        self._parser: XmlParser = parser
+        self._parent = parent
+        self._options = options if options is not None else {}
+        self._reader = reader or XmlReader()
+
+    def _load_compound(self, xml_file: str) -> None:
+        with span(os.path.basename(xml_file), 'compound'):
             print('Loading XML from: ' + xml_file)
+            self._xml_file = xml_file
             self._dirname = os.path.dirname(xml_file)
-            self._xml = ElementTree.parse(xml_file).getroot().find('compounddef')
+            self._xml = self._reader.parse(xml_file).find('compounddef')
             if self._xml is None:
                 raise Exception('File ' + xml_file + ' has no <compounddef>')
             self._kind = Kind.from_str(self._xml.get('kind'))
             self._refid = self._xml.get('id')
             self._name = self._xml.find('compoundname').text
             self._cache.add(self._refid, self)
+            self._cache.loaded.append(self)
+            self._cache.hierarchy.add_compound(self._refid, self._xml)
             self._static = False
 
             print('Parsing: ' + self._refid)
@@ -73,48 +271,46 @@ class Node:
             else:
                 self._title = self._name
 
-        else:
-            self._xml = xml
-            self._kind = Kind.from_str(self._xml.get('kind'))
-            if refid is not None:
-                self._refid = refid
-            else:
-                self._refid = self._xml.get('id')
-            self._cache.add(self._refid, self)
-
-            print('Parsing: ' + self._refid)
-            self._check_attrs()
-            self._title = self._name
-
-        self._details = Property.Details(self._xml, parser, self._kind)
-        self._brief = Property.Brief(self._xml, parser, self._kind)
-        self._includes = Property.Includes(self._xml, parser, self._kind)
-        self._type = Property.Type(self._xml, parser, self._kind)
-        self._location = Property.Location(self._xml, parser, self._kind)
-        self._params = Property.Params(self._xml, parser, self._kind)
-        self._templateparams = Property.TemplateParams(self._xml, parser, self._kind)
-        self._specifiers = Property.Specifiers(self._xml, parser, self._kind)
-        self._values = Property.Values(self._xml, parser, self._kind)
-        self._initializer = Property.Initializer(self._xml, parser, self._kind)
-        self._definition = Property.Definition(self._xml, parser, self._kind)
-        self._programlisting = Property.Programlisting(self._xml, parser, self._kind)
+    def _init_properties(self) -> None:
+        parser = self._parser
+        self._fields = Fields(self._xml)
+        self._details = Property.Details(self._xml, parser, self._kind, self._fields)
+        self._brief = Property.Brief(self._xml, parser, self._kind, self._fields)
+        self._includes = Property.Includes(self._xml, parser, self._kind, self._fields)
+        self._type = Property.Type(self._xml, parser, self._kind, self._fields)
+        self._location = Property.Location(self._xml, parser, self._kind, self._fields)
+        self._params = Property.Params(self._xml, parser, self._kind, self._fields)
+        self._templateparams = Property.TemplateParams(self._xml, parser, self._kind, self._fields)
+        self._specifiers = Property.Specifiers(self._xml, parser, self._kind, self._fields)
+        self._values = Property.Values(self._xml, parser, self._kind, self._fields)
+        self._initializer = Property.Initializer(self._xml, parser, self._kind, self._fields)
+        self._definition = Property.Definition(self._xml, parser, self._kind, self._fields)
+        self._programlisting = Property.Programlisting(self._xml, parser, self._kind, self._fields)
 
     def add_child(self, child: 'Node'):
         self._children.append(child)
+        self._invalidate_queries()
+
+    def remove_child(self, child: 'Node'):
+        self._children.remove(child)
+        self._invalidate_queries()
 
     def sort_children(self):
         self._children.sort(key=lambda x: x._name, reverse=False)
+        self._invalidate_queries()
+
+    def _invalidate_queries(self):
+        self._buckets = None
+        self._queries = {}
 
     def _check_for_children(self):
         for innergroup in self._xml.findall('innergroup'):
             refid = innergroup.get('refid')
             if self._kind in (Kind.GROUP, Kind.DIR, Kind.FILE):
-                try:
-                    child = self._cache.get(refid)
+                child = self._cache.find(refid)
+                if child is not None:
                     self.add_child(child)
                     continue
-                except Exception:
-                    pass
             child = Node(
                 os.path.join(self._dirname, refid + '.xml'),
                 None,
@@ -122,6 +318,7 @@ class Node:
                 self._parser,
                 self,
                 options=self._options,
+                reader=self._reader,
             )
             child._visibility = Visibility.PUBLIC
             self.add_child(child)
@@ -133,12 +330,10 @@ class Node:
                 continue
 
             if self._kind in (Kind.GROUP, Kind.DIR or self._kind == Kind.FILE):
-                try:
-                    child = self._cache.get(refid)
+                child = self._cache.find(refid)
+                if child is not None:
                     self.add_child(child)
                     continue
-                except Exception:
-                    pass
 
             try:
                 child = Node(
@@ -148,6 +343,7 @@ class Node:
                     self._parser,
                     self,
                     options=self._options,
+                    reader=self._reader,
                 )
             except FileNotFoundError:
                 child = Node(
@@ -158,6 +354,7 @@ class Node:
                     self,
                     refid=refid,
                     options=self._options,
+                    reader=self._reader,
                 )
                 child._name = innerclass.text
             child._visibility = prot
@@ -166,12 +363,10 @@ class Node:
         for innerfile in self._xml.findall('innerfile'):
             refid = innerfile.get('refid')
             if self._kind == Kind.DIR:
-                try:
-                    child = self._cache.get(refid)
+                child = self._cache.find(refid)
+                if child is not None:
                     self.add_child(child)
                     continue
-                except Exception:
-                    pass
 
             child = Node(
                 os.path.join(self._dirname, refid + '.xml'),
@@ -180,6 +375,7 @@ class Node:
                 self._parser,
                 self,
                 options=self._options,
+                reader=self._reader,
             )
             child._visibility = Visibility.PUBLIC
             self.add_child(child)
@@ -187,12 +383,10 @@ class Node:
         for innerdir in self._xml.findall('innerdir'):
             refid = innerdir.get('refid')
             if self._kind == Kind.DIR:
-                try:
-                    child = self._cache.get(refid)
+                child = self._cache.find(refid)
+                if child is not None:
                     self.add_child(child)
                     continue
-                except Exception:
-                    pass
 
             child = Node(
                 os.path.join(self._dirname, refid + '.xml'),
@@ -201,6 +395,7 @@ class Node:
                 self._parser,
                 self,
                 options=self._options,
+                reader=self._reader,
             )
             child._visibility = Visibility.PUBLIC
             self.add_child(child)
@@ -209,12 +404,10 @@ class Node:
             refid = innernamespace.get('refid')
 
             if self._kind in (Kind.GROUP, Kind.DIR or self._kind == Kind.FILE):
-                try:
-                    child = self._cache.get(refid)
+                child = self._cache.find(refid)
+                if child is not None:
                     self.add_child(child)
                     continue
-                except Exception:
-                    pass
 
             child = Node(
                 os.path.join(self._dirname, refid + '.xml'),
@@ -223,6 +416,7 @@ class Node:
                 self._parser,
                 self,
                 options=self._options,
+                reader=self._reader,
             )
             child._visibility = Visibility.PUBLIC
             self.add_child(child)
@@ -233,13 +427,13 @@ class Node:
                 if kind.is_language():
                     if self._kind in (Kind.GROUP, Kind.DIR, Kind.FILE):
                         refid = memberdef.get('id')
-                        try:
-                            child = self._cache.get(refid)
+                        child = self._cache.find(refid)
+                        if child is not None:
                             self.add_child(child)
                             continue
-                        except Exception:
-                            pass
-                    child = Node(None, memberdef, self._cache, self._parser, self, options=self._options)
+                    child = Node(
+                        None, memberdef, self._cache, self._parser, self, options=self._options, reader=self._reader
+                    )
                     self.add_child(child)
 
     def _check_attrs(self):
@@ -276,28 +470,46 @@ class Node:
             self._pure = False
 
     def has(self, visibility: str, kinds: [str], static: bool) -> bool:
-        return len(self.query(visibility, kinds, static)) > 0
+        return len(self._query(visibility, kinds, static)) > 0
 
     def query(
         self, visibility: t.Optional[str] = None, kinds: t.Optional[t.List[str]] = None, static: t.Optional[bool] = None
     ) -> ['Node']:
-        ret = []
-        for child in self._children:
-            bool_stmts = []
-            if visibility is not None:
-                visibility = Visibility(visibility)
-                bool_stmts.append(child._visibility == visibility)
-
-            if static is not None:
-                bool_stmts.append(child._static == static)
-
-            if kinds is not None:
-                kinds = list(map(lambda kind: Kind.from_str(kind), kinds))
-                bool_stmts.append(child._kind in kinds)
-
-            if bool_stmts == [] or all(bool_stmts):
-                ret.append(child)
+        return list(self._query(visibility, kinds, static))
+
+    def _query(self, visibility: t.Optional[str], kinds: t.Optional[t.List[str]], static: t.Optional[bool]) -> ['Node']:
+        self._wait_loaded()
+        key = (visibility, tuple(kinds) if kinds is not None else None, static)
+        ret = self._queries.get(key)
+        if ret is not None:
+            return ret
+
+        if self._buckets is None:
+            children = self._children  # materializes a proxy first, which invalidates the queries
+            buckets = {}
+            for i, child in enumerate(children):
+                bucket = (child._kind, getattr(child, '_visibility', None), getattr(child, '_static', None))
+                buckets.setdefault(bucket, []).append(i)
+            self._buckets = buckets
+
+        if visibility is not None:
+            visibility = Visibility(visibility)
+        if kinds is not None:
+            kinds = set(map(Kind.from_str, kinds))
+
+        indices = []
+        for (child_kind, child_visibility, child_static), bucket in self._buckets.items():
+            if visibility is not None and child_visibility != visibility:
+                continue
+            if static is not None and child_static != static:
+                continue
+            if kinds is not None and child_kind not in kinds:
+                continue
+            indices.extend(bucket)
+        indices.sort()
 
+        ret = [self._children[i] for i in indices]
+        self._queries[key] = ret
         return ret
 
     @property
@@ -334,6 +546,7 @@ class Node:
 
     @property
     def children(self) -> ['Node']:
+        self._wait_loaded()
         return self._children
 
     @property
@@ -424,6 +637,30 @@ class Node:
     def name(self) -> str:
         return self._name
 
+    @property
+    def xml_file(self) -> t.Optional[str]:
+        return self._xml_file
+
+    @property
+    def xml_files(self) -> t.Set[str]:
+        """
+        Compound XML files this node and its descendants were parsed from. The descendants of the proxies that are
+        not materialized yet are not loaded for it, only the compound file of the proxy is included.
+        """
+        ret = set()
+        stack = [self]
+        visited = set()
+        while stack:
+            node = stack.pop()
+            if id(node) in visited:
+                continue
+            visited.add(id(node))
+            if node._xml_file is not None:
+                ret.add(node._xml_file)
+            if not node._lazy:
+                stack.extend(node._children)
+        return ret
+
     @property
     def title(self) -> str:
         return self._title
@@ -684,7 +921,7 @@ class Node:
                 code.append('enum ' + self.name_full_unescaped + ' {')
 
                 values = []
-                for enumvalue in self._xml.findall('enumvalue'):
+                for enumvalue in self._fields.findall('enumvalue'):
                     p = enumvalue.find('name').text
                     initializer = enumvalue.find('initializer')
                     if initializer is not None:
@@ -719,33 +956,39 @@ class Node:
 
     @property
     def has_base_classes(self) -> bool:
-        return len(self._xml.findall('basecompoundref')) > 0
+        return len(self._cache.hierarchy.bases(self._refid)) > 0
 
     @property
     def has_derived_classes(self) -> bool:
-        return len(self._xml.findall('derivedcompoundref')) > 0
+        return len(self._cache.hierarchy.derived(self._refid)) > 0
 
     @property
     def base_classes(self) -> ['Node']:
-        ret = []
-        for basecompoundref in self._xml.findall('basecompoundref'):
-            refid = basecompoundref.get('refid')
-            if refid is None:
-                ret.append(basecompoundref.text)
-            else:
-                ret.append(self._cache.get(refid))
-        return ret
+        return [
+            name if refid is None else self._cache.get(refid)
+            for refid, name in self._cache.hierarchy.bases(self._refid)
+        ]
 
     @property
     def derived_classes(self) -> ['Node']:
-        ret = []
-        for derivedcompoundref in self._xml.findall('derivedcompoundref'):
-            refid = derivedcompoundref.get('refid')
-            if refid is None:
-                ret.append(derivedcompoundref.text)
-            else:
-                ret.append(self._cache.get(refid))
-        return ret
+        return [
+            name if refid is None else self._cache.get(refid)
+            for refid, name in self._cache.hierarchy.derived(self._refid)
+        ]
+
+    @property
+    def all_base_classes(self) -> ['Node']:
+        """
+        Documented base classes, direct and indirect, nearest first.
+        """
+        return [self._cache.get(refid) for refid in self._cache.hierarchy.all_bases(self._refid)]
+
+    @property
+    def all_derived_classes(self) -> ['Node']:
+        """
+        Documented derived classes, direct and indirect, nearest first.
+        """
+        return [self._cache.get(refid) for refid in self._cache.hierarchy.all_derived(self._refid)]
 
     @property
     def has_details(self) -> bool:
@@ -763,6 +1006,10 @@ class Node:
     def brief(self) -> str:
         return self._brief.md()
 
+    @property
+    def brief_plain(self) -> str:
+        return self._brief.plain()
+
     @property
     def has_includes(self) -> bool:
         return self._includes.has()
@@ -854,12 +1101,16 @@ class Node:
 
     @property
     def reimplements(self) -> 'Node':
-        reimp = self._xml.find('reimplements')
-        if reimp is not None:
-            return self._cache.get(reimp.get('refid'))
+        refid = self._cache.hierarchy.reimplements(self._refid)
+        if refid is not None:
+            return self._cache.get(refid)
         else:
             return None
 
+    @property
+    def reimplemented_by(self) -> ['Node']:
+        return [self._cache.get(refid) for refid in self._cache.hierarchy.reimplemented_by(self._refid)]
+
 
 class DummyNode:
     def __init__(self, name_long: str, derived_classes: [Node], kind: Kind):
@@ -0,0 +1,182 @@
+import itertools
+import json
+import os
+import re
+import tempfile
+import typing as t
+
+from jinja2 import (
+    Environment,
+)
+
+from doxybook.search_index import (
+    content_anchors,
+    section_nodes,
+)
+
+# the markdown links to an anchor of the same document, [text](#anchor)
+_LINK_RE = re.compile(r'\]\(#([^)\s]+)\)')
+
+
+class Part(t.NamedTuple):
+    filepath: str
+    content: str
+
+
+class Section(t.NamedTuple):
+    location: str
+    link: str  # relative link of the header file
+    content: str
+    anchors: t.List[str]  # of the nodes rendered with an anchor by this section
+
+
+def part_filepath(output_filepath: str, number: int) -> str:
+    """
+    ``api.md`` -> ``api-<number>.md``
+    """
+    stem, ext = os.path.splitext(output_filepath)
+    return f'{stem}-{number}{ext}'
+
+
+def _section_anchors(file, content: str, template_lang: t.Optional[str]) -> t.List[str]:
+    """
+    Anchors of the nodes of the header section ``content``, see ``section_nodes``. The nodes of the section are linked
+    by its tables, except the file node, linked by the index page.
+    """
+    linked = content_anchors(content)
+    nodes = section_nodes(file, template_lang)
+    return [nodes[0].anchor] + [node.anchor for node in nodes[1:] if node.anchor in linked]
+
+
+def render_sections(args: dict, template_lang: t.Optional[str] = 'c') -> t.Iterator[Section]:
+    """
+    Render the section of each header file with the ``api.jinja`` arguments ``args``, see ``runner._render_args``.
+    """
+    for file in args['files']:
+        content = args['file_template'].render(
+            file=file,
+            table_template=args['table_template'],
+            detail_template=args['detail_template'],
+        )
+        yield Section(file.location, file.relative_link, content, _section_anchors(file, content, template_lang))
+
+
+def rewrite_links(content: str, local: t.Container[str], documents: t.Dict[str, str]) -> str:
+    """
+    Point the links of ``content`` to the anchors that are not ``local`` into the document rendering them,
+    ``[text](#anchor)`` -> ``[text](<documents[anchor]>#anchor)``. The links to unknown anchors are kept.
+    """
+
+    def rewrite(match: t.Match) -> str:
+        anchor = match.group(1)
+        document = documents.get(anchor)
+        if document is None or anchor in local:
+            return match.group(0)
+        return f']({document}#{anchor})'
+
+    return _LINK_RE.sub(rewrite, content)
+
+
+def split_sections(sections: t.Iterable[Section], max_size: int) -> t.Iterator[t.List[Section]]:
+    """
+    Group the consecutive sections into parts of at most ``max_size`` bytes. A larger section is a part on its own.
+    """
+    current = []
+    size = 0
+    for section in sections:
+        section_size = len(section.content.encode('utf-8'))
+        if current and size + section_size > max_size:
+            yield current
+            current = []
+            size = 0
+        current.append(section)
+        size += section_size
+    if current:
+        yield current
+
+
+def render_parts(
+    env: Environment, args: dict, output_filepath: str, max_size: int, template_lang: t.Optional[str] = 'c'
+) -> t.Tuple[t.Iterator[Part], t.Dict[str, str]]:
+    """
+    Render the header sections into parts ``api-1.md``, ``api-2.md``... of at most ``max_size`` bytes, next to the
+    index page ``output_filepath`` listing the header files. The links to the anchors missing from their part are
+    rewritten to point into the first part rendering them.
+
+    The sections are rendered one at a time and spooled to a temporary file part by part, the links are rewritten
+    once all the anchors are known, while iterating over the parts. Only one part is held in memory.
+
+    :return: the index page followed by the parts, and the filepath of the first part of each anchor.
+    """
+    spool = tempfile.TemporaryFile(mode='w+', encoding='utf-8')
+    documents = {}
+    local_anchors = []  # of each part
+    files = []
+    try:
+        for number, sections in enumerate(split_sections(render_sections(args, template_lang), max_size), start=1):
+            filepath = part_filepath(output_filepath, number)
+            local = set()
+            for section in sections:
+                for anchor in section.anchors:
+                    documents.setdefault(anchor, filepath)
+                local.update(section.anchors)
+                files.append((section.location, os.path.basename(filepath) + section.link))
+            local_anchors.append(local)
+            spool.write(json.dumps([section.content for section in sections]) + '\n')
+    except BaseException:
+        spool.close()
+        raise
+
+    index_name = os.path.basename(output_filepath)
+    filepaths = [part_filepath(output_filepath, i) for i in range(1, len(local_anchors) + 1)]
+    index = env.get_template('index.jinja').render(
+        files=files,
+        parts=[os.path.basename(filepath) for filepath in filepaths],
+        commit_sha=args['commit_sha'],
+        asctime=args['asctime'],
+    )
+    names = {anchor: os.path.basename(filepath) for anchor, filepath in documents.items()}
+
+    def parts() -> t.Iterator[Part]:
+        part_template = env.get_template('part.jinja')
+        with spool:
+            spool.seek(0)
+            for number, (filepath, local, line) in enumerate(zip(filepaths, local_anchors, spool), start=1):
+                content = part_template.render(
+                    number=number,
+                    total=len(filepaths),
+                    index=index_name,
+                    sections=[rewrite_links(section, local, names) for section in json.loads(line)],
+                )
+                yield Part(filepath, content)
+
+    return itertools.chain([Part(output_filepath, index)], parts()), documents
+
+
+def listed_parts(output_filepath: str) -> t.Set[str]:
+    """
+    The filepaths of the parts linked by the index page ``output_filepath`` written by a previous run, if any.
+    """
+    if not os.path.isfile(output_filepath):
+        return set()
+    dirname = os.path.dirname(output_filepath)
+    stem, ext = os.path.splitext(os.path.basename(output_filepath))
+    pattern = re.compile(r'\]\((' + re.escape(stem) + r'-\d+' + re.escape(ext) + r')[#)]')
+    with open(output_filepath, encoding='utf-8') as fr:
+        return {os.path.join(dirname, name) for name in pattern.findall(fr.read())}
+
+
+def remove_stale_parts(output_filepath: str, total: int, listed: t.Set[str]) -> t.List[str]:
+    """
+    Remove the parts of ``output_filepath`` numbered above ``total``, among the ``listed`` ones of the index page of a
+    previous run, see ``listed_parts``. The other files are left alone.
+
+    :return: the removed filepaths.
+    """
+    current = {part_filepath(output_filepath, number) for number in range(1, total + 1)}
+    removed = []
+    for filepath in sorted(listed - current):
+        if os.path.isfile(filepath):
+            os.remove(filepath)
+            removed.append(filepath)
+    return removed
@@ -1,4 +1,5 @@
 import re
+import typing as t
 from xml.etree.ElementTree import (
     Element,
 )
@@ -13,16 +14,48 @@ from doxybook.xml_parser import (
     XmlParser,
 )
 
+# `)` followed by `= delete`/`= default`, or `noexcept`/`override` after a `)` on the same line
+SPECIFIERS_RE = re.compile(r'\)\s*=\s*(delete|default)|(noexcept|override)')
+SPECIFIERS = [
+    ('delete', '= delete'),
+    ('default', '= default'),
+    ('noexcept', 'noexcept'),
+    ('override', 'override'),
+]
+
+
+class Fields:
+    """
+    Direct children of a memberdef/compounddef, grouped by tag in a single pass.
+
+    Mirrors ``Element.find``/``Element.findall`` for direct children.
+    """
+
+    def __init__(self, xml: t.Optional[Element]):
+        self.xml = xml
+        self._fields: t.Dict[str, t.List[Element]] = {}
+        if xml is not None:
+            for child in xml:
+                self._fields.setdefault(child.tag, []).append(child)
+
+    def find(self, tag: str) -> t.Optional[Element]:
+        elements = self._fields.get(tag)
+        return elements[0] if elements else None
+
+    def findall(self, tag: str) -> t.List[Element]:
+        return self._fields.get(tag, [])
+
 
 class Property:
     class Details:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
-            detaileddescription = self.xml.find('detaileddescription')
+            detaileddescription = self.fields.find('detaileddescription')
             if len(list(detaileddescription)) > 0:
                 return self.parser.paras_as_str(detaileddescription, plain=plain)
             else:
@@ -32,17 +65,18 @@ class Property:
             return self.md(plain=True)
 
         def has(self) -> bool:
-            detaileddescription = self.xml.find('detaileddescription')
+            detaileddescription = self.fields.find('detaileddescription')
             return len(list(detaileddescription)) > 0
 
     class Brief:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
-            briefdescription = self.xml.find('briefdescription')
+            briefdescription = self.fields.find('briefdescription')
             if not briefdescription:
                 return ''
 
@@ -59,14 +93,15 @@ class Property:
             return self.md(plain=True)
 
         def has(self) -> bool:
-            briefdescription = self.xml.find('briefdescription')
+            briefdescription = self.fields.find('briefdescription')
             return len(list(briefdescription)) > 0
 
     class Includes:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> [str]:
             return self.array(plain=False)
@@ -76,7 +111,7 @@ class Property:
 
         def array(self, plain: bool = False) -> [str]:
             ret = []
-            for includes in self.xml.findall('includes'):
+            for includes in self.fields.findall('includes'):
                 if plain:
                     incl = includes.text
                 else:
@@ -91,16 +126,17 @@ class Property:
             return ret
 
         def has(self) -> bool:
-            return len(self.xml.findall('includes')) > 0
+            return len(self.fields.findall('includes')) > 0
 
     class Type:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
-            para = self.xml.find('type')
+            para = self.fields.find('type')
             if para is not None:
                 return self.parser.paras_as_str(para, plain=plain)
             else:
@@ -110,32 +146,34 @@ class Property:
             return self.md(plain=True)
 
         def has(self) -> bool:
-            return self.xml.find('type') is not None
+            return self.fields.find('type') is not None
 
     class Location:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
             return self.plain()
 
         def plain(self) -> str:
-            loc = self.xml.find('location')
+            loc = self.fields.find('location')
             if loc is not None:
                 return loc.get('file')
             else:
                 return ''
 
         def has(self) -> bool:
-            return self.xml.find('location') is not None
+            return self.fields.find('location') is not None
 
     class Params:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
             return ', '.join(self.array(plain=plain))
@@ -145,7 +183,7 @@ class Property:
 
         def array(self, plain: bool = False) -> [str]:
             ret = []
-            for param in self.xml.findall('param'):
+            for param in self.fields.findall('param'):
                 type = param.find('type')
                 p = self.parser.paras_as_str(type, plain=plain)
 
@@ -169,13 +207,14 @@ class Property:
             return ret
 
         def has(self) -> bool:
-            return len(self.xml.findall('param')) > 0
+            return len(self.fields.findall('param')) > 0
 
     class TemplateParams:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
             return ', '.join(self.array(plain=plain))
@@ -185,7 +224,7 @@ class Property:
 
         def array(self, plain: bool = False, notype: bool = False) -> [str]:
             ret = []
-            templateparamlist = self.xml.find('templateparamlist')
+            templateparamlist = self.fields.find('templateparamlist')
             if templateparamlist is not None:
                 for param in templateparamlist.findall('param'):
                     if notype:
@@ -206,13 +245,14 @@ class Property:
             return ret
 
         def has(self) -> bool:
-            return self.xml.find('templateparamlist') is not None
+            return self.fields.find('templateparamlist') is not None
 
     class CodeBlock:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
             return self.plain()
@@ -224,37 +264,30 @@ class Property:
             return True
 
     class Specifiers:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
             return self.plain()
 
         def plain(self) -> str:
-            argss = self.xml.find('argsstring')
+            argss = self.fields.find('argsstring')
             if argss is None or argss.text is None:
                 return ''
 
             argsstring = argss.text
-            ret = []
-
-            # Is deleted?
-            if re.search('\\)\\s*=\\s*delete', argsstring):
-                ret.append('= delete')
-
-            # Is default?
-            if re.search('\\)\\s*=\\s*default', argsstring):
-                ret.append('= default')
-
-            # Is noexcept
-            if re.search('\\).*noexcept', argsstring):
-                ret.append('noexcept')
-
-            # Is override
-            if re.search('\\).*override', argsstring):
-                ret.append('override')
+            found = set()
+            first_paren = argsstring.find(')')
+            if first_paren >= 0:
+                for m in SPECIFIERS_RE.finditer(argsstring, first_paren):
+                    if m.group(1):
+                        found.add(m.group(1))
+                    elif argsstring.rfind(')', 0, m.start()) > argsstring.rfind('\n', 0, m.start()):
+                        found.add(m.group(2))
+            ret = [specifier for key, specifier in SPECIFIERS if key in found]
 
             # Is const?
             if self.xml.get('const') == 'yes':
@@ -268,13 +301,14 @@ class Property:
             return ' '.join(ret)
 
         def has(self) -> bool:
-            return self.xml.find('argsstring') is not None
+            return self.fields.find('argsstring') is not None
 
     class Values:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
             return ', '.join(self.array(plain=plain))
@@ -285,7 +319,7 @@ class Property:
         def array(self, plain: bool = False) -> [str]:
             ret = []
             if self.kind.is_enum():
-                for enumvalue in self.xml.findall('enumvalue'):
+                for enumvalue in self.fields.findall('enumvalue'):
                     p = '**' + escape(enumvalue.find('name').text) + '**'
                     initializer = enumvalue.find('initializer')
                     if initializer is not None:
@@ -295,18 +329,19 @@ class Property:
 
         def has(self) -> bool:
             if self.kind.is_enum():
-                return self.xml.find('enumvalue') is not None
+                return self.fields.find('enumvalue') is not None
             else:
                 return False
 
     class Initializer:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
-            initializer = self.xml.find('initializer')
+            initializer = self.fields.find('initializer')
             if initializer is not None:
                 return self.parser.paras_as_str(initializer, plain=plain)
             else:
@@ -316,39 +351,44 @@ class Property:
             return self.md(plain=True)
 
         def has(self) -> bool:
-            return self.xml.find('initializer') is not None
+            return self.fields.find('initializer') is not None
 
     class Definition:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
 
         def md(self, plain: bool = False) -> str:
             return self.plain()
 
         def plain(self) -> str:
-            definition = self.xml.find('definition')
+            definition = self.fields.find('definition')
             if definition is not None and definition.text:
                 return definition.text + ';'
             else:
                 return ''
 
         def has(self) -> bool:
-            return self.xml.find('definition') is not None
+            return self.fields.find('definition') is not None
 
     class Programlisting:
-        def __init__(self, xml: Element, parser: XmlParser, kind: Kind):
+        def __init__(self, xml: Element, parser: XmlParser, kind: Kind, fields: t.Optional[Fields] = None):
             self.xml = xml
             self.parser = parser
             self.kind = kind
+            self.fields = fields if fields is not None else Fields(xml)
+            self._md: t.Optional[str] = None
 
         def md(self, plain: bool = False) -> str:
-            programlisting = self.xml.find('programlisting')
-            if programlisting is None:
-                return ''
-
-            return self.parser.programlisting_as_str(programlisting)
+            if self._md is None:
+                programlisting = self.fields.find('programlisting')
+                if programlisting is None:
+                    self._md = ''
+                else:
+                    self._md = self.parser.programlisting_as_str(programlisting)
+            return self._md
 
         def has(self) -> bool:
-            return self.xml.find('programlisting') is not None
+            return self.fields.find('programlisting') is not None
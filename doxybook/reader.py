@@ -0,0 +1,539 @@
+import abc
+import errno
+import hashlib
+import io
+import os
+import shutil
+import tarfile
+import tempfile
+import threading
+import typing as t
+import zipfile
+from collections import (
+    deque,
+)
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor,
+)
+from xml.etree import (
+    ElementTree,
+)
+from xml.etree.ElementTree import (
+    Element,
+)
+from xml.parsers import (
+    expat,
+)
+
+from doxybook.trace import (
+    span,
+)
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.zst', '.tar.zstd')
+
+# bytes of the XML members of a compressed tarball kept in memory, the next ones are spooled to a temporary file
+TAR_SPOOL_MEMORY = 16 * 1024 * 1024
+
+# the root element of a combined document and its children, the compounds
+COMBINED_TAGS = ['doxygen', 'compounddef']
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES) and os.path.isfile(path)
+
+
+def is_combined(path: str) -> bool:
+    """
+    A single XML document combining all the compounds, see ``CombinedReader``: a ``doxygen`` root element with
+    ``compounddef`` children. Only the start of the document is parsed.
+    """
+    if not path.lower().endswith('.xml') or not os.path.isfile(path):
+        return False
+
+    tags = []
+    try:
+        for _, elem in ElementTree.iterparse(path, events=('start',)):
+            tags.append(elem.tag)
+            if len(tags) == len(COMBINED_TAGS):
+                break
+    except ElementTree.ParseError:
+        return False
+    return tags == COMBINED_TAGS
+
+
+def create_container_reader(path: str) -> t.Optional['ContainerReader']:
+    """
+    The reader of the XML files held in the file ``path``, None if ``path`` is not such a file.
+    """
+    if is_archive(path):
+        return ArchiveReader(path)
+    if is_combined(path):
+        return CombinedReader(path)
+    return None
+
+
+class XmlReader:
+    """
+    Reads doxygen XML files from disk, one at a time.
+    """
+
+    def read(self, path: str) -> bytes:
+        with open(path, 'rb') as fr:
+            return fr.read()
+
+    def parse(self, path: str) -> Element:
+        return ElementTree.fromstring(self.read(path))
+
+    def open(self, path: str) -> t.BinaryIO:
+        return open(path, 'rb')
+
+    def stat_key(self, path: str) -> t.Tuple[int, int]:
+        """
+        A key changing when the content of the file changes, its mtime and size.
+        """
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+
+    def prefetch(self, paths: t.List[str]) -> None:
+        """
+        Hint the files that are going to be parsed, in order. No-op by default.
+        """
+
+    def close(self) -> None:
+        pass
+
+
+class PrefetchReader(XmlReader):
+    """
+    Reads the hinted files ahead in a thread pool, while the caller parses the previous ones.
+
+    At most ``workers * 2`` reads are queued at once, and a read is only queued if the size of the files queued or read
+    but not consumed yet stays within ``max_bytes``, except for the first one. Files that were not hinted, or that were
+    already consumed, are read directly.
+
+    With ``parse``, the files are parsed by the threads as well, and ``parse`` returns the parsed trees. This runs the
+    parsing in parallel on the free-threaded builds of Python. ``max_bytes`` still counts the size of the files, not
+    the size of their trees.
+    """
+
+    def __init__(self, workers: int = 4, max_bytes: int = 64 * 1024 * 1024, parse: bool = False):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.parse_ahead = parse
+
+        self._pool: t.Optional[ThreadPoolExecutor] = None
+        self._pending: t.Deque[str] = deque()
+        self._futures: t.Dict[str, t.Tuple[int, Future]] = {}  # path -> (size, read)
+        self._buffered = 0  # bytes of the files queued or read ahead but not consumed yet
+        self._lock = threading.Lock()  # the compounds of a lazy model could be loaded from several threads
+
+    def prefetch(self, paths: t.List[str]) -> None:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='doxybook-prefetch')
+        with self._lock:
+            self._pending.extend(paths)
+        self._fill()
+
+    def read(self, path: str) -> bytes:
+        if self.parse_ahead:  # the files read ahead are parsed already
+            return super().read(path)
+        return self._consume(path, super().read)
+
+    def parse(self, path: str) -> Element:
+        if not self.parse_ahead:
+            return super().parse(path)
+        return self._consume(path, super().parse)
+
+    def _consume(self, path: str, direct: t.Callable[[str], t.Any]) -> t.Any:
+        with self._lock:
+            queued = self._futures.pop(path, None)
+            if queued is not None:
+                self._buffered -= queued[0]
+        try:
+            if queued is None:
+                return direct(path)
+            return queued[1].result()
+        finally:
+            self._fill()
+
+    def close(self) -> None:
+        with self._lock:
+            self._pending.clear()
+            for _, future in self._futures.values():
+                future.cancel()
+            self._futures.clear()
+            self._buffered = 0
+
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def _fill(self) -> None:
+        with self._lock:
+            self._fill_locked()
+
+    def _fill_locked(self) -> None:
+        while self._pending and len(self._futures) < self.workers * 2:
+            path = self._pending[0]
+            if path in self._futures:
+                self._pending.popleft()
+                continue
+
+            try:
+                size = os.path.getsize(path)
+            except OSError:  # raised again by the read
+                size = 0
+            # the reads in flight count as well, their data is buffered once they complete
+            if self._futures and self._buffered + size > self.max_bytes:
+                return
+
+            self._pending.popleft()
+            self._buffered += size
+            self._futures[path] = (size, self._pool.submit(self._read_ahead, path))
+
+    def _read_ahead(self, path: str) -> t.Union[bytes, Element]:
+        with span(os.path.basename(path), 'read ahead', parse=self.parse_ahead):
+            data = XmlReader.read(self, path)
+            return ElementTree.fromstring(data) if self.parse_ahead else data
+
+
+class CachingReader(XmlReader):
+    """
+    Keeps the parsed XML of every file, and parses a file again only when its content changed.
+
+    Files are checked with ``stat_key`` first, and their content hash when the key differs. The absolute paths of the
+    files parsed since the last ``reset_changed`` are collected in ``changed``. ``release`` drops the parsed XML and
+    keeps the hashes, a released file is parsed again on the next access without being reported as changed.
+    """
+
+    def __init__(self, reader: t.Optional[XmlReader] = None):
+        self.reader = reader or XmlReader()
+        self.changed: t.Set[str] = set()
+        # abspath -> (stat key, content digest, parsed root or None once released)
+        self._parsed: t.Dict[str, t.Tuple[t.Tuple[int, int], bytes, t.Optional[Element]]] = {}
+
+    def read(self, path: str) -> bytes:
+        return self.reader.read(path)
+
+    def open(self, path: str) -> t.BinaryIO:
+        return self.reader.open(path)
+
+    def stat_key(self, path: str) -> t.Tuple[int, int]:
+        return self.reader.stat_key(path)
+
+    def parse(self, path: str) -> Element:
+        abspath = os.path.abspath(path)
+        stat_key = self.reader.stat_key(abspath)
+
+        cached = self._parsed.get(abspath)
+        if cached is not None and cached[0] == stat_key and cached[2] is not None:
+            return cached[2]
+
+        data = self.reader.read(path)
+        digest = hashlib.sha1(data).digest()
+        if cached is not None and cached[1] == digest:
+            root = cached[2] if cached[2] is not None else ElementTree.fromstring(data)
+            self._parsed[abspath] = (stat_key, digest, root)
+            return root
+
+        root = ElementTree.fromstring(data)
+        self._parsed[abspath] = (stat_key, digest, root)
+        self.changed.add(abspath)
+        return root
+
+    def prefetch(self, paths: t.List[str]) -> None:
+        self.reader.prefetch([path for path in paths if os.path.abspath(path) not in self._parsed])
+
+    def close(self) -> None:
+        self.reader.close()
+
+    def reset_changed(self) -> None:
+        self.changed = set()
+
+    def forget(self, paths: t.Iterable[str]) -> None:
+        for path in paths:
+            self._parsed.pop(os.path.abspath(path), None)
+
+    def release(self) -> None:
+        for abspath, (stat_key, digest, _) in self._parsed.items():
+            self._parsed[abspath] = (stat_key, digest, None)
+
+
+class ContainerReader(XmlReader, abc.ABC):
+    """
+    Reads the doxygen XML files held in a single file, the ``container``. Paths are resolved relative to it,
+    ``xml.zip/index.xml`` is the ``index.xml`` file of ``xml.zip``.
+    """
+
+    def __init__(self, container: str):
+        self.container = os.path.abspath(container)
+        self._lock = threading.Lock()
+
+    def open(self, path: str) -> t.BinaryIO:
+        return io.BytesIO(self.read(path))
+
+    @abc.abstractmethod
+    def snapshot(self) -> t.Dict[str, t.Tuple[int, int]]:
+        """
+        Map the path of every XML file to its change key, see ``stat_key``.
+        """
+
+    def _name(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.container).replace(os.sep, '/')
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.container, *name.split('/'))
+
+    def _not_found(self, name: str) -> FileNotFoundError:
+        return FileNotFoundError(errno.ENOENT, f'No such file in {self.container}', name)
+
+
+class ArchiveReader(ContainerReader):
+    """
+    Reads the doxygen XML files from a .zip, .tar, .tar.gz or .tar.zst archive, without extracting it.
+
+    ``xml.zip/index.xml`` is the ``index.xml`` member of ``xml.zip``, or of the folder of the archive holding it, e.g.
+    ``xml/index.xml``.
+
+    The members of .zip and .tar archives are read on demand, from an in-memory index of their offsets. Compressed
+    tarballs could not be read randomly, their XML members are decompressed in one streaming pass on the first read
+    into a spool, which keeps up to ``TAR_SPOOL_MEMORY`` bytes in memory and the rest in a temporary file, and are
+    read from it. The archive is indexed again when it changes.
+    """
+
+    def __init__(self, archive: str):
+        super().__init__(archive)
+        self._archive_key: t.Optional[t.Tuple[int, int]] = None
+        # member path relative to the folder of index.xml -> (change key, size, ZipInfo or data offset)
+        self._members: t.Dict[str, t.Tuple[t.Tuple[int, int], int, t.Any]] = {}
+        self._zip: t.Optional[zipfile.ZipFile] = None
+        # the decompressed members of a compressed tarball, the data offsets are in this file
+        self._spool: t.Optional[t.BinaryIO] = None
+
+    def read(self, path: str) -> bytes:
+        with self._lock:
+            _, size, location = self._member(path)
+            if isinstance(location, zipfile.ZipInfo):
+                if self._zip is None:
+                    self._zip = zipfile.ZipFile(self.container)
+                return self._zip.read(location)
+            if self._spool is not None:
+                self._spool.seek(location)
+                return self._spool.read(size)
+
+            with open(self.container, 'rb') as fr:
+                fr.seek(location)
+                return fr.read(size)
+
+    def stat_key(self, path: str) -> t.Tuple[int, int]:
+        """
+        The mtime and size of tar members, the CRC and size of zip members.
+        """
+        with self._lock:
+            return self._member(path)[0]
+
+    def snapshot(self) -> t.Dict[str, t.Tuple[int, int]]:
+        with self._lock:
+            self._update_index()
+            return {self._path(name): member[0] for name, member in self._members.items() if name.endswith('.xml')}
+
+    def close(self) -> None:
+        # the index is kept, the archive is opened again by the next read
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+
+    def _member(self, path: str) -> t.Tuple[t.Tuple[int, int], int, t.Any]:
+        self._update_index()
+        name = self._name(path)
+        member = self._members.get(name)
+        if member is None:
+            raise self._not_found(name)
+        return member
+
+    def _update_index(self) -> None:
+        st = os.stat(self.container)
+        archive_key = (st.st_mtime_ns, st.st_size)
+        if archive_key == self._archive_key:
+            return
+
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+        if self._spool is not None:
+            self._spool.close()
+            self._spool = None
+
+        if self.container.lower().endswith('.zip'):
+            members = self._index_zip()
+        else:
+            members = self._index_tar()
+
+        # the XML folder is the one holding the shallowest index.xml
+        indexes = sorted((name for name in members if os.path.basename(name) == 'index.xml'), key=len)
+        prefix = indexes[0][: -len('index.xml')] if indexes else ''
+        self._members = {name[len(prefix) :]: member for name, member in members.items() if name.startswith(prefix)}
+        self._archive_key = archive_key
+
+    def _index_zip(self) -> t.Dict[str, t.Tuple[t.Tuple[int, int], int, t.Any]]:
+        self._zip = zipfile.ZipFile(self.container)
+        return {
+            info.filename: ((info.CRC, info.file_size), info.file_size, info)
+            for info in self._zip.infolist()
+            if not info.is_dir()
+        }
+
+    def _index_tar(self) -> t.Dict[str, t.Tuple[t.Tuple[int, int], int, t.Any]]:
+        members = {}
+        with open(self.container, 'rb') as fr:
+            if self.container.lower().endswith('.tar'):
+                # only the headers are read, the data is skipped
+                with tarfile.open(fileobj=fr, mode='r:') as tar:
+                    for info in tar:
+                        if info.isfile():
+                            members[info.name] = ((info.mtime, info.size), info.size, info.offset_data)
+                return members
+
+            if self.container.lower().endswith(('.zst', '.zstd')):
+                if zstandard is None:
+                    raise RuntimeError(f'Reading {self.container} requires the zstandard package')
+                stream = zstandard.ZstdDecompressor().stream_reader(fr)
+                tar = tarfile.open(fileobj=stream, mode='r|')
+            else:
+                tar = tarfile.open(fileobj=fr, mode='r|*')
+            spool = tempfile.SpooledTemporaryFile(max_size=TAR_SPOOL_MEMORY)
+            try:
+                with tar:
+                    for info in tar:
+                        if info.isfile() and info.name.endswith('.xml'):
+                            members[info.name] = ((info.mtime, info.size), info.size, spool.tell())
+                            shutil.copyfileobj(tar.extractfile(info), spool)
+            except BaseException:
+                spool.close()
+                raise
+        self._spool = spool
+        return members
+
+
+class CombinedReader(ContainerReader):
+    """
+    Reads the compounds from the single XML document combining them, generated by the ``combine.xslt`` of doxygen:
+    ``xsltproc combine.xslt index.xml > all.xml``. ``all.xml/<refid>.xml`` holds the compound ``<refid>``, and
+    ``all.xml/index.xml`` is an index built from the compounds.
+
+    The document is scanned in one sequential pass on the first read, recording the byte range of each compound and
+    building the index, without keeping any compound. Each read then takes the range of its compound from the
+    document, wrapped in the start tag of the document. The document is scanned again when it changes.
+    """
+
+    def __init__(self, combined: str):
+        super().__init__(combined)
+        self._combined_key: t.Optional[t.Tuple[int, int]] = None
+        self._prefix = b''  # from the start of the document to the end of its start tag
+        self._suffix = b''  # the end tag of the document
+        self._index = b''
+        # <refid>.xml -> offset of the compounddef start tag, offset of its end tag
+        self._ranges: t.Dict[str, t.Tuple[int, int]] = {}
+
+    def read(self, path: str) -> bytes:
+        with self._lock:
+            self._update()
+            name = self._name(path)
+            if name == 'index.xml':
+                return self._index
+            location = self._ranges.get(name)
+            if location is None:
+                raise self._not_found(name)
+            start, end = location
+            with open(self.container, 'rb') as fr:
+                fr.seek(start)
+                body = fr.read(end - start)
+            return self._prefix + body + b'</compounddef>' + self._suffix
+
+    def stat_key(self, path: str) -> t.Tuple[int, int]:
+        """
+        The mtime and size of the combined document.
+        """
+        with self._lock:
+            self._update()
+            name = self._name(path)
+            if name != 'index.xml' and name not in self._ranges:
+                raise self._not_found(name)
+            return self._combined_key
+
+    def snapshot(self) -> t.Dict[str, t.Tuple[int, int]]:
+        with self._lock:
+            self._update()
+            return {self._path(name): self._combined_key for name in ['index.xml', *self._ranges]}
+
+    def _update(self) -> None:
+        st = os.stat(self.container)
+        combined_key = (st.st_mtime_ns, st.st_size)
+        if combined_key == self._combined_key:
+            return
+
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        index = Element('doxygenindex')
+        ranges = {}
+        stack: t.List[str] = []
+        root_tag = 'doxygen'
+        root_end = None  # offset of the first child of the document, after its start tag
+        compound = None  # (refid, start offset) of the current compounddef
+        entries: t.List[Element] = []  # the index entries of the enclosing compound, memberdef and enumvalue
+        text: t.List[str] = []
+
+        def start(tag: str, attrib: t.Dict[str, str]) -> None:
+            nonlocal compound, root_tag, root_end
+            stack.append(tag)
+            text.clear()
+            if len(stack) == 1:
+                index.set('version', attrib.get('version', ''))
+                root_tag = tag
+            elif len(stack) == len(COMBINED_TAGS) and root_end is None:
+                root_end = parser.CurrentByteIndex
+            if len(stack) == len(COMBINED_TAGS) and tag == 'compounddef':
+                compound = (attrib.get('id'), parser.CurrentByteIndex)
+                entry = ElementTree.SubElement(index, 'compound', refid=attrib.get('id'), kind=attrib.get('kind'))
+                entries[:] = [entry]
+            elif compound is not None and tag in ('memberdef', 'enumvalue'):
+                kind = attrib.get('kind') if tag == 'memberdef' else 'enumvalue'
+                entries.append(ElementTree.SubElement(entries[0], 'member', refid=attrib.get('id'), kind=kind))
+
+        def end(tag: str) -> None:
+            nonlocal compound
+            stack.pop()
+            if compound is None:
+                return
+            if len(stack) == 1:
+                refid, offset = compound
+                ranges[refid + '.xml'] = (offset, parser.CurrentByteIndex)
+                compound = None
+            elif tag == 'compoundname' and stack[-1] == 'compounddef':
+                ElementTree.SubElement(entries[0], 'name').text = ''.join(text)
+            elif tag == 'name' and stack[-1] in ('memberdef', 'enumvalue'):
+                ElementTree.SubElement(entries[-1], 'name').text = ''.join(text)
+            elif tag in ('memberdef', 'enumvalue'):
+                entries.pop()
+            text.clear()
+
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+        parser.CharacterDataHandler = text.append
+        with open(self.container, 'rb') as fr:
+            parser.ParseFile(fr)
+            fr.seek(0)
+            prefix = fr.read(root_end or 0)
+
+        self._prefix = prefix
+        self._suffix = f'</{root_tag}>'.encode()
+        self._index = ElementTree.tostring(index, encoding='utf-8')
+        self._ranges = ranges
+        self._combined_key = combined_key
@@ -1,3 +1,4 @@
+import filecmp
 import os
 import shutil
 import tempfile
@@ -8,9 +9,12 @@ from pathlib import (
 )
 
 from jinja2 import (
+    ChoiceLoader,
     Environment,
     FileSystemLoader,
     PackageLoader,
+    Template,
+    TemplateNotFound,
     select_autoescape,
 )
 
@@ -18,63 +22,270 @@ from doxybook.cache import (
     Cache,
 )
 from doxybook.doxygen import (
+    CompoundFilter,
     Doxygen,
 )
+from doxybook.node import (
+    Node,
+)
+from doxybook.parts import (
+    listed_parts,
+    remove_stale_parts,
+    render_parts,
+)
+from doxybook.reader import (
+    PrefetchReader,
+    XmlReader,
+    create_container_reader,
+)
+from doxybook.search_index import (
+    write_search_index,
+)
+from doxybook.section_manifest import (
+    SectionHashes,
+    write_section_manifest,
+)
+from doxybook.source import (
+    write_source_pages,
+)
+from doxybook.trace import (
+    current,
+    span,
+)
 from doxybook.utils import (
     get_git_revision_hash,
+    get_peak_rss,
+    warning,
+)
+from doxybook.view_model import (
+    ViewModelPool,
+    ViewNode,
 )
 from doxybook.xml_parser import (
     XmlParser,
 )
 
 
-def run(
-    output: str,
-    input_dir: str,
-    target: str = 'single-markdown',
-    debug: bool = False,
-    link_prefix: str = '',
-    template_dir: t.Optional[str] = None,
-    template_lang: t.Optional[str] = 'c',
-) -> bool:
+class OutputSpec(t.NamedTuple):
+    """
+    One rendered output of a parsed model.
+    """
+
+    output: str
+    target: str = 'single-markdown'
+    link_prefix: str = ''
+    template_dir: t.Optional[str] = None
+    template_lang: t.Optional[str] = 'c'
+    search_index: t.Optional[str] = None  # path of the symbol search index JSON file, not generated if not set
+    section_manifest: t.Optional[str] = None  # path of the section hash manifest JSON file, not generated if not set
+    source_dir: t.Optional[str] = None  # folder of the <refid>_source.md pages of the header files
+    split_size: t.Optional[int] = None  # maximum size in bytes of the parts of the output, not split if not set
+
+
+class FileSections:
+    """
+    Wraps the ``file_template`` passed into ``api.jinja``, rendering the section of each header file only once.
+
+    Sections are cached by the refid of the file node, ``invalidate`` drops them.
+    """
+
+    def __init__(self, template: Template):
+        self.template = template
+        self._sections: t.Dict[str, str] = {}
+
+    def render(self, file: Node, **kwargs) -> str:
+        section = self._sections.get(file.refid)
+        if section is None:
+            section = self.template.render(file=file, **kwargs)
+            self._sections[file.refid] = section
+        return section
+
+    def invalidate(self, refids: t.Optional[t.Iterable[str]] = None) -> None:
+        if refids is None:
+            self._sections.clear()
+        else:
+            for refid in refids:
+                self._sections.pop(refid, None)
+
+
+class TracedSections:
+    """
+    Wraps the ``file_template`` passed into ``api.jinja``, recording a trace span for each rendered header section.
+    """
+
+    def __init__(self, template: t.Union[Template, FileSections, SectionHashes]):
+        self.template = template
+
+    def render(self, file: Node, **kwargs) -> str:
+        with span(file.location, 'header'):
+            return self.template.render(file=file, **kwargs)
+
+
+def get_output_filepath(output: str) -> str:
     if output.endswith('.md'):
         Path(output).parent.mkdir(parents=True, exist_ok=True)
-        output_filepath = output
-    else:
-        os.makedirs(output, exist_ok=True)
-        output_filepath = os.path.join(output, 'api.md')
+        return output
 
-    options = {'target': target, 'link_prefix': link_prefix}
+    os.makedirs(output, exist_ok=True)
+    return os.path.join(output, 'api.md')
 
-    cache = Cache()
-    parser = XmlParser(cache=cache, target=target)
-    doxygen = Doxygen(input_dir, parser, cache, options=options)
 
-    if debug:
-        doxygen.print()
+def create_reader(
+    prefetch_workers: int = 0,
+    prefetch_budget: int = 64 * 1024 * 1024,
+    input_dir: t.Optional[str] = None,
+    parse_threads: int = 0,
+) -> XmlReader:
+    """
+    :param input_dir: the XML folder, or a file holding the XML files read by a ``ContainerReader``, without
+        prefetching.
+    :param parse_threads: number of threads reading and parsing the files ahead, replacing the prefetch workers.
+    """
+    reader = create_container_reader(input_dir) if input_dir else None
+    if reader is not None:
+        return reader
+    if parse_threads > 0:
+        return PrefetchReader(workers=parse_threads, max_bytes=prefetch_budget, parse=True)
+    if prefetch_workers > 0:
+        return PrefetchReader(workers=prefetch_workers, max_bytes=prefetch_budget)
+    return XmlReader()
+
 
+def create_environment(template_dir: t.Optional[str] = None) -> Environment:
+    # template dirs generated by older versions lack the newer templates, e.g. part.jinja
+    loader = PackageLoader('doxybook')
     if template_dir:
-        loader = FileSystemLoader(template_dir)
-    else:
-        loader = PackageLoader('doxybook')
+        loader = ChoiceLoader([FileSystemLoader(template_dir), loader])
+
+    return Environment(loader=loader, autoescape=select_autoescape())
+
+
+def _has_custom_template(env: Environment, name: str) -> bool:
+    """
+    Whether the template dir of ``env`` overrides the default template ``name`` with a different one.
+    """
+    try:
+        source, _, _ = env.loader.get_source(env, name)
+    except TemplateNotFound:
+        return False
+    return source != PackageLoader('doxybook').get_source(env, name)[0]
+
+
+class ReleasingFiles:
+    """
+    Iterates the header files, releasing the parsed XML of the model after each of them, so only the compounds of one
+    header section are loaded at a time.
+    """
+
+    def __init__(self, doxygen: Doxygen):
+        self.doxygen = doxygen
+
+    def __len__(self) -> int:
+        return len(self.doxygen.header_files.children)
+
+    def __iter__(self) -> t.Iterator[Node]:
+        for file in self.doxygen.header_files.children:
+            yield file
+            self.doxygen.release()
+
+
+def _render_args(
+    doxygen: Doxygen,
+    env: Environment,
+    template_lang: t.Optional[str],
+    file_template: t.Union[FileSections, SectionHashes, None],
+    *,
+    low_memory: bool = False,
+    files: t.Optional[t.List[ViewNode]] = None,
+) -> dict:
     template_lang = template_lang or 'c'
+    if files is None:
+        files = ReleasingFiles(doxygen) if low_memory else doxygen.header_files.children
+    file_template = file_template or env.get_template(f'{template_lang}/file.jinja')
+    if current() is not None:
+        file_template = TracedSections(file_template)
+    return {
+        'files': files,
+        'groups': doxygen.groups.children,
+        'file_template': file_template,
+        'table_template': env.get_template('table.jinja'),
+        'detail_template': env.get_template('detail.jinja'),
+        'commit_sha': get_git_revision_hash(),
+        'asctime': time.asctime(),
+    }
+
+
+def render(
+    doxygen: Doxygen,
+    env: Environment,
+    template_lang: t.Optional[str] = 'c',
+    file_template: t.Union[FileSections, SectionHashes, None] = None,
+    files: t.Optional[t.List[ViewNode]] = None,
+) -> str:
+    """
+    :param files: precomputed views of the header files rendered in place of the nodes, see ``ViewModelPool``.
+    """
+    template = env.get_template('api.jinja')
+    return template.render(**_render_args(doxygen, env, template_lang, file_template, files=files))
+
+
+def render_chunks(
+    doxygen: Doxygen,
+    env: Environment,
+    template_lang: t.Optional[str] = 'c',
+    file_template: t.Union[FileSections, SectionHashes, None] = None,
+    low_memory: bool = False,
+) -> t.Iterator[str]:
+    """
+    Same as ``render``, but yields the output piece by piece.
+
+    :param low_memory: release the parsed XML of the model after each header section, see ``Doxygen.release``.
+    """
+    template = env.get_template('api.jinja')
+    return template.generate(**_render_args(doxygen, env, template_lang, file_template, low_memory=low_memory))
+
 
-    env = Environment(loader=loader, autoescape=select_autoescape())
+def report_references(parser: XmlParser, debug: bool = False, output: t.Optional[str] = None) -> None:
+    """
+    Print the references left unresolved since the counts were last cleared, in ``output`` if set.
+    """
+    if parser.unresolved_refs:
+        print(
+            f'Unresolved references{" in " + output if output else ""}: {sum(parser.unresolved_refs.values())} '
+            f'({len(parser.unresolved_refs)} unique refids), rendered as plain text'
+        )
+
+    if debug:
+        print(f'Description fragments: {parser.fragments.hits} cache hits, {parser.fragments.misses} misses')
+        for refid, count in sorted(parser.unresolved_refs.items()):
+            print(f'Unresolved reference: {refid} ({count}x)')
+
+
+def report_peak_memory() -> None:
+    peak = get_peak_rss()
+    if peak is not None:
+        print(f'Peak RSS: {peak / 1024 / 1024:.1f} MiB')
+
+
+def write_output(output_filepath: str, content: str) -> bool:
+    """
+    Write ``content`` to ``output_filepath`` if it differs from the current file content.
+
+    :return: True if the file was created or modified.
+    """
+    return write_output_chunks(output_filepath, [content])
+
+
+def write_output_chunks(output_filepath: str, chunks: t.Iterable[str]) -> bool:
+    """
+    Same as ``write_output``, without holding the whole content in memory.
+    """
     with tempfile.NamedTemporaryFile(mode='w', delete=False) as fw:
-        template = env.get_template('api.jinja')
-        common_args = {
-            'files': doxygen.header_files.children,
-            'groups': doxygen.groups.children,
-            'file_template': env.get_template(f'{template_lang}/file.jinja'),
-            'table_template': env.get_template('table.jinja'),
-            'detail_template': env.get_template('detail.jinja'),
-            'commit_sha': get_git_revision_hash(),
-            'asctime': time.asctime(),
-        }
-        fw.write(template.render(**common_args))
-
-    if os.path.isfile(output_filepath) and open(output_filepath).read() == open(fw.name).read():
+        fw.writelines(chunks)
+
+    if os.path.isfile(output_filepath) and filecmp.cmp(output_filepath, fw.name, shallow=False):
         print(f'No changes detected in {output_filepath}')
+        os.remove(fw.name)
         return False
 
     if not os.path.isfile(output_filepath):
@@ -84,3 +295,251 @@ def run(
 
     shutil.move(fw.name, output_filepath)
     return True
+
+
+def write_parts(
+    doxygen: Doxygen,
+    env: Environment,
+    output_filepath: str,
+    split_size: int,
+    template_lang: t.Optional[str] = 'c',
+    *,
+    file_template: t.Union[FileSections, SectionHashes, None] = None,
+    low_memory: bool = False,
+    files: t.Optional[t.List[ViewNode]] = None,
+) -> t.Tuple[bool, t.Dict[str, str]]:
+    """
+    Write the output split into parts of at most ``split_size`` bytes at the header section boundaries, with an index
+    page at ``output_filepath``, see ``render_parts``. Each part is only written if it changed, and the parts listed by
+    the index page of a previous run with more parts are removed.
+
+    The parts are rendered with ``index.jinja`` and ``part.jinja``, a custom ``api.jinja`` is not used. The parts are
+    written one at a time, with ``low_memory`` the parsed XML is released after each header section as well.
+
+    :return: True if any file was created, modified or removed, and the filepath of the part of each anchor.
+    """
+    if _has_custom_template(env, 'api.jinja'):
+        warning('The custom api.jinja is not used by the split output, customize index.jinja and part.jinja instead')
+
+    args = _render_args(doxygen, env, template_lang, file_template, low_memory=low_memory, files=files)
+    parts, documents = render_parts(env, args, output_filepath, split_size, template_lang)
+
+    listed = listed_parts(output_filepath)
+    modified = False
+    total = -1  # the index page is not a part
+    for part in parts:
+        if write_output(part.filepath, part.content):
+            modified = True
+        total += 1
+
+    for filepath in remove_stale_parts(output_filepath, total, listed):
+        print(f'Removed stale part: {filepath}')
+        modified = True
+    return modified, documents
+
+
+def run(
+    output: str,
+    input_dir: str,
+    target: str = 'single-markdown',
+    debug: bool = False,
+    link_prefix: str = '',
+    template_dir: t.Optional[str] = None,
+    template_lang: t.Optional[str] = 'c',
+    *,
+    prefetch_workers: int = 0,
+    prefetch_budget: int = 64 * 1024 * 1024,
+    search_index: t.Optional[str] = None,
+    section_manifest: t.Optional[str] = None,
+    source_dir: t.Optional[str] = None,
+    split_size: t.Optional[int] = None,
+    source_jobs: t.Optional[int] = None,
+    compound_filter: t.Optional[CompoundFilter] = None,
+    lazy: bool = False,
+    low_memory: bool = False,
+    precompute_jobs: int = 0,
+    parse_threads: int = 0,
+) -> bool:
+    return run_many(
+        input_dir,
+        [
+            OutputSpec(
+                output,
+                target=target,
+                link_prefix=link_prefix,
+                template_dir=template_dir,
+                template_lang=template_lang,
+                search_index=search_index,
+                section_manifest=section_manifest,
+                source_dir=source_dir,
+                split_size=split_size,
+            )
+        ],
+        debug=debug,
+        prefetch_workers=prefetch_workers,
+        prefetch_budget=prefetch_budget,
+        compound_filter=compound_filter,
+        lazy=lazy,
+        low_memory=low_memory,
+        source_jobs=source_jobs,
+        precompute_jobs=precompute_jobs,
+        parse_threads=parse_threads,
+    )
+
+
+def run_many(
+    input_dir: str,
+    outputs: t.List[OutputSpec],
+    *,
+    debug: bool = False,
+    prefetch_workers: int = 0,
+    prefetch_budget: int = 64 * 1024 * 1024,
+    envs: t.Optional[t.Dict[t.Optional[str], Environment]] = None,
+    compound_filter: t.Optional[CompoundFilter] = None,
+    lazy: bool = False,
+    low_memory: bool = False,
+    source_jobs: t.Optional[int] = None,
+    precompute_jobs: int = 0,
+    parse_threads: int = 0,
+) -> bool:
+    """
+    Parse the XML files once, and render every output from the same model.
+
+    :param envs: jinja environments by template dir, reused and filled by this call if passed.
+    :param compound_filter: compounds of index.xml to load, all of them if not set.
+    :param lazy: parse the compound files only when the rendered sections need them, see ``Doxygen``.
+    :param low_memory: load the model lazily, and write the outputs one header section at a time, releasing the
+        parsed XML after each of them. Slower, compounds used by several sections are parsed again.
+    :param source_jobs: number of processes writing the source listing pages. (default: number of CPUs)
+    :param precompute_jobs: number of processes computing the views of the header sections before the templates
+        render them, see ``ViewModelPool``. 0 to render the nodes directly. Ignored in low memory mode.
+    :param parse_threads: number of threads parsing the compound files ahead of the model construction, see
+        ``PrefetchReader``. The model is still built by this thread, in the same order. 0 to parse them on this thread.
+    :return: True if any output file was created or modified.
+    """
+    if not outputs:
+        raise ValueError('At least one output is required')
+
+    if precompute_jobs and low_memory:
+        warning('The views of the header sections are not precomputed in low memory mode')
+        precompute_jobs = 0
+
+    options = {'target': outputs[0].target, 'link_prefix': outputs[0].link_prefix}
+
+    cache = Cache()
+    parser = XmlParser(cache=cache, target=outputs[0].target)
+    reader = create_reader(prefetch_workers, prefetch_budget, input_dir, parse_threads)
+    with span('model', 'model', input=input_dir):
+        doxygen = Doxygen(
+            input_dir,
+            parser,
+            cache,
+            options=options,
+            reader=reader,
+            compound_filter=compound_filter,
+            lazy=lazy or low_memory or precompute_jobs > 0,  # the sections are parsed by the workers
+        )
+
+    if debug:
+        doxygen.print()
+
+    if envs is None:
+        envs = {}
+    pool = ViewModelPool(input_dir, precompute_jobs, compound_filter) if precompute_jobs > 0 else None
+    try:
+        modified = _write_outputs(
+            doxygen, outputs, envs, low_memory=low_memory, source_jobs=source_jobs, pool=pool, debug=debug
+        )
+    finally:
+        if pool is not None:
+            pool.close()
+
+    if low_memory or debug:
+        report_peak_memory()
+    return modified
+
+
+def _write_outputs(
+    doxygen: Doxygen,
+    outputs: t.List[OutputSpec],
+    envs: t.Dict[t.Optional[str], Environment],
+    *,
+    low_memory: bool,
+    source_jobs: t.Optional[int],
+    pool: t.Optional[ViewModelPool],
+    debug: bool = False,
+) -> bool:
+    modified = False
+    for spec in outputs:
+        doxygen.set_target(spec.target, spec.link_prefix)
+        # reported after each output, the outputs with another target resolve other references
+        doxygen.parser.unresolved_refs.clear()
+        if spec.template_dir not in envs:
+            envs[spec.template_dir] = create_environment(spec.template_dir)
+
+        env = envs[spec.template_dir]
+        hashes = None
+        if spec.section_manifest:
+            hashes = SectionHashes(env.get_template(f'{spec.template_lang or "c"}/file.jinja'))
+
+        output_filepath = get_output_filepath(spec.output)
+        files = None
+        if pool is not None:
+            with span('header views', 'view'):
+                files = pool.header_files(doxygen, spec.target, spec.link_prefix)
+
+        documents = None
+        with span(os.path.basename(output_filepath), 'template', output=output_filepath):
+            if spec.split_size:
+                parts_modified, documents = write_parts(
+                    doxygen,
+                    env,
+                    output_filepath,
+                    spec.split_size,
+                    spec.template_lang,
+                    file_template=hashes,
+                    low_memory=low_memory,
+                    files=files,
+                )
+                if parts_modified:
+                    modified = True
+            elif low_memory:
+                chunks = render_chunks(doxygen, env, spec.template_lang, file_template=hashes, low_memory=True)
+                if write_output_chunks(output_filepath, chunks):
+                    modified = True
+            else:
+                content = render(doxygen, env, spec.template_lang, file_template=hashes, files=files)
+                if write_output(output_filepath, content):
+                    modified = True
+
+        if hashes is not None and write_section_manifest(hashes, spec.section_manifest, output_filepath):
+            modified = True
+
+        if spec.source_dir:
+            with span('source pages', 'output', output=spec.source_dir):
+                if write_source_pages(
+                    doxygen,
+                    spec.source_dir,
+                    output_filepath,
+                    template_dir=spec.template_dir,
+                    jobs=source_jobs,
+                    low_memory=low_memory,
+                    documents=documents,
+                    template_lang=spec.template_lang,
+                ):
+                    modified = True
+
+        if spec.search_index:
+            with span('search index', 'output', output=spec.search_index):
+                if write_search_index(
+                    doxygen,
+                    spec.search_index,
+                    output_filepath,
+                    low_memory=low_memory,
+                    documents=documents,
+                    template_lang=spec.template_lang,
+                ):
+                    modified = True
+
+        report_references(doxygen.parser, debug, output_filepath if len(outputs) > 1 else None)
+    return modified
@@ -0,0 +1,219 @@
+import json
+import os
+import re
+import typing as t
+
+from doxybook.constants import (
+    SECTION_KINDS,
+    Kind,
+)
+from doxybook.doxygen import (
+    Doxygen,
+)
+from doxybook.node import (
+    Node,
+)
+
+SEARCH_INDEX_VERSION = 1
+
+# [symbol ids, {edge label: child}]
+TrieNode = t.List[t.Any]
+
+# the targets of the links of the rendered markdown, [text](document#anchor)
+_LINK_TARGET_RE = re.compile(r'\]\([^)\s#]*#([^)\s]+)\)')
+
+
+def section_nodes(file, template_lang: t.Optional[str] = 'c') -> list:
+    """
+    The header file and its children queried by ``<template_lang>/file.jinja``, the nodes of its section rendered with
+    an anchor. The members of these children and the placeholders of the missing compounds have none. Works on nodes
+    and on views alike.
+    """
+    kinds = SECTION_KINDS[template_lang or 'c']
+    return [file] + [node for node in file.query(kinds=kinds) if node.kind != Kind.NONE]
+
+
+def content_anchors(content: str) -> t.Set[str]:
+    """
+    The anchors linked by the markdown ``content``.
+    """
+    return set(_LINK_TARGET_RE.findall(content))
+
+
+def linked_anchors(filepaths: t.Iterable[str]) -> t.Set[str]:
+    """
+    The anchors linked by the markdown files, from their tables and their list of header files.
+    """
+    anchors = set()
+    for filepath in filepaths:
+        with open(filepath, encoding='utf-8') as fr:
+            anchors.update(content_anchors(fr.read()))
+    return anchors
+
+
+def _rendered_sections(doxygen: Doxygen, template_lang: t.Optional[str] = 'c') -> t.Iterator[t.List[Node]]:
+    """
+    Yields the nodes of each header section that were not yielded by the previous ones, see ``section_nodes``.
+    """
+    seen = set()
+    for file in doxygen.header_files.children:
+        ret = []
+        for node in section_nodes(file, template_lang):
+            if node.refid not in seen:
+                seen.add(node.refid)
+                ret.append(node)
+        yield ret
+
+
+def _insert(root: t.Dict[str, t.Any], key: str, symbol_id: int) -> None:
+    node = root
+    for c in key:
+        node = node.setdefault(c, {})
+    ids = node.setdefault('', [])
+    if symbol_id not in ids:
+        ids.append(symbol_id)
+
+
+def _compress(node: t.Dict[str, t.Any]) -> TrieNode:
+    """
+    Turn a character trie into a radix trie, merging the chains of single-child nodes into one edge.
+    """
+    children = {}
+    for c, first in sorted((k, v) for k, v in node.items() if k):
+        label, child = c, first
+        while len(child) == 1 and '' not in child:
+            (next_c, next_child), *_ = child.items()
+            label += next_c
+            child = next_child
+        children[label] = _compress(child)
+    return [node.get('', []), children]
+
+
+def build_search_index(
+    doxygen: Doxygen,
+    document: str,
+    *,
+    low_memory: bool = False,
+    documents: t.Optional[t.Dict[str, str]] = None,
+    template_lang: t.Optional[str] = 'c',
+    anchors: t.Optional[t.Set[str]] = None,
+) -> dict:
+    """
+    Build the symbol search index of the rendered nodes.
+
+    ``symbols`` are sorted case-insensitively by full name. ``trie`` is a radix trie over the lower-cased full names
+    and short names, each node is ``[symbol ids ending here, {edge label: child node}]``.
+
+    :param document: path of the markdown document, relative to the index file. Prefixed to the anchors.
+    :param low_memory: release the parsed XML of the model after each header section, see ``Doxygen.release``.
+    :param documents: path of the part of the split document holding each anchor, relative to the index file.
+    :param template_lang: language of the file templates, selecting the rendered nodes.
+    :param anchors: the anchors of the rendered output, the symbols without one of them are skipped if set.
+    """
+    documents = documents or {}
+    symbols = []
+    for nodes in _rendered_sections(doxygen, template_lang):
+        for node in nodes:
+            name = node.location if node.is_file else node.name_full_unescaped
+            if not name or (anchors is not None and node.anchor not in anchors):
+                continue
+            symbols.append(
+                {
+                    'name': name,
+                    'short_name': node.name_tokens[-1] if not node.is_file else os.path.basename(name),
+                    'kind': node.kind.value,
+                    'link': documents.get(node.anchor, document) + node.relative_link,
+                    'brief': node.brief_plain,
+                }
+            )
+        if low_memory:
+            doxygen.release()
+    symbols.sort(key=lambda s: (s['name'].lower(), s['kind'], s['link']))
+
+    trie: t.Dict[str, t.Any] = {}
+    for i, symbol in enumerate(symbols):
+        _insert(trie, symbol['name'].lower(), i)
+        _insert(trie, symbol['short_name'].lower(), i)
+
+    return {
+        'version': SEARCH_INDEX_VERSION,
+        'document': document,
+        'symbols': symbols,
+        'trie': _compress(trie),
+    }
+
+
+def lookup(index: dict, prefix: str) -> t.List[dict]:
+    """
+    Symbols with a full name or a short name starting with ``prefix``, case-insensitive.
+    """
+    prefix = prefix.lower()
+    node = index['trie']
+    while prefix:
+        for label, child in node[1].items():
+            if label.startswith(prefix):
+                node, prefix = child, ''
+                break
+            if prefix.startswith(label):
+                node, prefix = child, prefix[len(label) :]
+                break
+        else:
+            return []
+
+    ids = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        ids.update(current[0])
+        stack.extend(current[1].values())
+    return [index['symbols'][i] for i in sorted(ids)]
+
+
+def write_search_index(
+    doxygen: Doxygen,
+    index_filepath: str,
+    output_filepath: str,
+    *,
+    low_memory: bool = False,
+    documents: t.Optional[t.Dict[str, str]] = None,
+    template_lang: t.Optional[str] = 'c',
+) -> bool:
+    """
+    Write the search index of ``output_filepath`` to ``index_filepath`` if it changed. Only the symbols with an anchor
+    linked by the written output are indexed.
+
+    :param documents: filepath of the part of each anchor when the output is split, see ``render_parts``.
+    :return: True if the index file was created or modified.
+    """
+    index_dir = os.path.dirname(os.path.abspath(index_filepath))
+
+    def relative(filepath: str) -> str:
+        return os.path.relpath(filepath, index_dir).replace(os.sep, '/')
+
+    anchors = linked_anchors([output_filepath, *sorted(set(documents.values()))] if documents else [output_filepath])
+    content = json.dumps(
+        build_search_index(
+            doxygen,
+            relative(output_filepath),
+            low_memory=low_memory,
+            documents={anchor: relative(filepath) for anchor, filepath in documents.items()} if documents else None,
+            template_lang=template_lang,
+            anchors=anchors,
+        ),
+        ensure_ascii=False,
+        separators=(',', ':'),
+        sort_keys=True,
+    )
+
+    if os.path.isfile(index_filepath):
+        with open(index_filepath, encoding='utf-8') as fr:
+            if fr.read() == content:
+                return False
+
+    dirname = os.path.dirname(index_filepath)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(index_filepath, 'w', encoding='utf-8') as fw:
+        fw.write(content)
+    print(f'Generated symbol search index: {index_filepath}')
+    return True
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import typing as t
+
+from jinja2 import (
+    Template,
+)
+
+from doxybook.node import (
+    Node,
+)
+
+SECTION_MANIFEST_VERSION = 1
+
+
+class SectionHashes:
+    """
+    Wraps the ``file_template`` passed into ``api.jinja``, recording the content hash of each rendered header section.
+    """
+
+    def __init__(self, template: Template):
+        self.template = template
+        # header file location -> section entry of the manifest
+        self.sections: t.Dict[str, dict] = {}
+
+    def render(self, file: Node, **kwargs) -> str:
+        section = self.template.render(file=file, **kwargs)
+        self.sections[file.location] = {
+            'refid': file.refid,
+            'link': file.relative_link,
+            'sha256': hashlib.sha256(section.encode('utf-8')).hexdigest(),
+        }
+        return section
+
+
+def diff_sections(old: t.Dict[str, dict], new: t.Dict[str, dict]) -> t.Tuple[t.List[str], t.List[str], t.List[str]]:
+    """
+    :return: the added, removed and changed header file locations, sorted.
+    """
+    added = sorted(set(new) - set(old))
+    removed = sorted(set(old) - set(new))
+    changed = sorted(key for key in set(old) & set(new) if old[key].get('sha256') != new[key]['sha256'])
+    return added, removed, changed
+
+
+def load_section_manifest(manifest_filepath: str) -> t.Optional[t.Dict[str, dict]]:
+    """
+    :return: the sections of the manifest, None if it does not exist or was written by another version.
+    """
+    if not os.path.isfile(manifest_filepath):
+        return None
+
+    try:
+        with open(manifest_filepath, encoding='utf-8') as fr:
+            data = json.load(fr)
+    except ValueError:
+        return None
+
+    if not isinstance(data, dict) or data.get('version') != SECTION_MANIFEST_VERSION:
+        return None
+    return data.get('sections', {})
+
+
+def write_section_manifest(hashes: SectionHashes, manifest_filepath: str, output_filepath: str) -> bool:
+    """
+    Report the sections of ``output_filepath`` that were added, removed or changed since the previous manifest, and
+    write the new manifest to ``manifest_filepath`` if it changed.
+
+    :return: True if the manifest file was created or modified.
+    """
+    previous = load_section_manifest(manifest_filepath)
+    if previous is None:
+        print(f'Sections of {output_filepath}: {len(hashes.sections)}, no previous manifest to compare with')
+    else:
+        added, removed, changed = diff_sections(previous, hashes.sections)
+        print(
+            f'Sections of {output_filepath}: {len(added)} added, {len(removed)} removed, {len(changed)} changed, '
+            f'{len(hashes.sections) - len(added) - len(changed)} unchanged'
+        )
+        for status, locations in (('added', added), ('removed', removed), ('changed', changed)):
+            for location in locations:
+                print(f'  {status}: {location}')
+
+    document = os.path.relpath(output_filepath, os.path.dirname(os.path.abspath(manifest_filepath)))
+    content = (
+        json.dumps(
+            {
+                'version': SECTION_MANIFEST_VERSION,
+                'document': document.replace(os.sep, '/'),
+                'sections': hashes.sections,
+            },
+            ensure_ascii=False,
+            indent=2,
+            sort_keys=True,
+        )
+        + '\n'
+    )
+
+    if os.path.isfile(manifest_filepath):
+        with open(manifest_filepath, encoding='utf-8') as fr:
+            if fr.read() == content:
+                return False
+
+    dirname = os.path.dirname(manifest_filepath)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    with open(manifest_filepath, 'w', encoding='utf-8') as fw:
+        fw.write(content)
+    print(f'Generated section manifest: {manifest_filepath}')
+    return True
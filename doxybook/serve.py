@@ -0,0 +1,190 @@
+import html
+import time
+import typing as t
+from http.server import (
+    BaseHTTPRequestHandler,
+    HTTPServer,
+)
+
+from doxybook.doxygen import (
+    CompoundFilter,
+)
+from doxybook.node import (
+    Node,
+)
+from doxybook.parts import (
+    rewrite_links,
+)
+from doxybook.runner import (
+    render,
+)
+from doxybook.search_index import (
+    section_nodes,
+)
+from doxybook.utils import (
+    error,
+    info,
+)
+from doxybook.watch import (
+    Watcher,
+)
+
+
+class Preview:
+    """
+    Renders the section of a header file on its first request, and serves it from the cache afterwards.
+
+    Before answering a request, the XML files and the templates are checked for changes, at most once per ``interval``
+    seconds. Changed sections are dropped from the cache and rendered again on their next request.
+
+    The links of a section to the anchors of another one are rewritten to ``/files/<refid>.md#anchor``, the page of the
+    first header file rendering the anchor, as the parts of a split output, see ``rewrite_links``.
+    """
+
+    def __init__(self, watcher: Watcher, interval: float = 1.0):
+        self.watcher = watcher
+        self.interval = interval
+        self._last_check = 0.0
+        self._files: t.Dict[str, Node] = {}
+        # refid of the header file -> anchors of its section, built on the first section request
+        self._anchors: t.Optional[t.Dict[str, t.Set[str]]] = None
+        # anchor -> page of the first header file rendering it
+        self._documents: t.Dict[str, str] = {}
+
+    def start(self) -> None:
+        self.watcher.start()
+        self._index_files()
+        self._last_check = time.monotonic()
+
+    def refresh(self) -> None:
+        now = time.monotonic()
+        if now - self._last_check < self.interval:
+            return
+        self._last_check = now
+
+        snapshots = self.watcher.poll()
+        if self.watcher.has_changes(snapshots):
+            self.watcher.reload(snapshots)
+            self._index_files()
+
+    def index(self) -> str:
+        items = [
+            f'<li><a href="/files/{html.escape(refid)}.md">{html.escape(file.location)}</a></li>'
+            for refid, file in self._files.items()
+        ]
+        return (
+            '<!DOCTYPE html>\n<html><head><meta charset="utf-8"><title>API Reference</title></head><body>\n'
+            '<h1>API Reference</h1>\n'
+            '<p><a href="/api.md">Full API reference</a></p>\n'
+            '<h2>Header files</h2>\n<ul>\n' + '\n'.join(items) + '\n</ul>\n</body></html>\n'
+        )
+
+    def section(self, refid: str) -> t.Optional[str]:
+        file = self._files.get(refid)
+        if file is None:
+            return None
+        section = self.watcher.render_section(file)
+        if self._anchors is None:
+            self._index_anchors()
+        return rewrite_links(section, self._anchors[refid], self._documents)
+
+    def full(self) -> str:
+        return render(self.watcher.doxygen, self.watcher.env, self.watcher.template_lang, self.watcher.sections)
+
+    def _index_files(self) -> None:
+        self._files = {file.refid: file for file in self.watcher.doxygen.header_files.children}
+        self._anchors = None
+
+    def _index_anchors(self) -> None:
+        self._anchors = {}
+        self._documents = {}
+        for refid, file in self._files.items():
+            anchors = {node.anchor for node in section_nodes(file, self.watcher.template_lang)}
+            self._anchors[refid] = anchors
+            for anchor in anchors:
+                self._documents.setdefault(anchor, f'/files/{refid}.md')
+
+
+class PreviewRequestHandler(BaseHTTPRequestHandler):
+    server: 'PreviewServer'
+
+    def do_GET(self):  # noqa: N802
+        path = self.path.split('?', 1)[0].split('#', 1)[0]
+        preview = self.server.preview
+        try:
+            preview.refresh()
+            if path in ('/', '/index.html'):
+                self._send(200, 'text/html', preview.index())
+            elif path == '/api.md':
+                self._send(200, 'text/markdown', preview.full())
+            elif path.startswith('/files/') and path.endswith('.md'):
+                section = preview.section(path[len('/files/') : -len('.md')])
+                if section is None:
+                    self._send(404, 'text/plain', f'No header file {path}\n')
+                else:
+                    self._send(200, 'text/markdown', section)
+            else:
+                self._send(404, 'text/plain', f'Not found: {path}\n')
+        except Exception as e:
+            error(f'Failed to render {path}: {e!r}')
+            self._send(500, 'text/plain', f'Failed to render {path}: {e!r}\n')
+
+    def _send(self, code: int, content_type: str, body: str) -> None:
+        data = body.encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class PreviewServer(HTTPServer):
+    """
+    Single-threaded, the doxygen model and the render caches are not thread-safe.
+    """
+
+    def __init__(self, address: t.Tuple[str, int], preview: Preview):
+        super().__init__(address, PreviewRequestHandler)
+        self.preview = preview
+
+
+def serve(
+    input_dir: str,
+    host: str = '127.0.0.1',
+    port: int = 8000,
+    *,
+    target: str = 'single-markdown',
+    link_prefix: str = '',
+    template_dir: t.Optional[str] = None,
+    template_lang: t.Optional[str] = 'c',
+    interval: float = 1.0,
+    prefetch_workers: int = 0,
+    prefetch_budget: int = 64 * 1024 * 1024,
+    compound_filter: t.Optional[CompoundFilter] = None,
+    parse_threads: int = 0,
+) -> None:
+    """
+    Serve the API reference from a lazy model, the compound files are parsed on the first request of the sections
+    using them.
+    """
+    watcher = Watcher(
+        input_dir,
+        target=target,
+        link_prefix=link_prefix,
+        template_dir=template_dir,
+        template_lang=template_lang,
+        prefetch_workers=prefetch_workers,
+        prefetch_budget=prefetch_budget,
+        compound_filter=compound_filter,
+        lazy=True,
+        parse_threads=parse_threads,
+    )
+    preview = Preview(watcher, interval=interval)
+    preview.start()
+
+    with PreviewServer((host, port), preview) as httpd:
+        info(f'Serving the API reference on http://{host}:{httpd.server_address[1]}/')
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
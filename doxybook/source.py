@@ -0,0 +1,223 @@
+import filecmp
+import itertools
+import os
+import tempfile
+import typing as t
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
+from xml.etree import (
+    ElementTree,
+)
+
+from jinja2 import (
+    Environment,
+)
+
+from doxybook.doxygen import (
+    Doxygen,
+)
+from doxybook.reader import (
+    ContainerReader,
+    XmlReader,
+    create_container_reader,
+)
+from doxybook.xml_parser import (
+    codeline_text,
+)
+
+# the names of the pages written to a source dir, the pages listed by a previous run and not written anymore are removed
+SOURCE_PAGES_LIST = '.doxybook_source_pages'
+
+
+class SourcePage(t.NamedTuple):
+    """
+    Everything needed to render the source listing page of a file, without the model.
+    """
+
+    xml_file: str
+    location: str
+    doc_link: str
+    output: str
+    container: t.Optional[str] = None  # file holding the compound file, see ContainerReader
+    lang: str = 'c'  # of the code block
+
+
+# jinja environments of the process by template dir
+_ENVS: t.Dict[t.Optional[str], Environment] = {}
+
+
+def _get_environment(template_dir: t.Optional[str]) -> Environment:
+    env = _ENVS.get(template_dir)
+    if env is None:
+        # imported here, the runner imports this module
+        from doxybook.runner import (  # noqa: PLC0415
+            create_environment,
+        )
+
+        env = create_environment(template_dir)
+        _ENVS[template_dir] = env
+    return env
+
+
+# readers of the process by container, the index of a container is built once
+_READERS: t.Dict[t.Optional[str], XmlReader] = {}
+
+
+def _get_reader(container: t.Optional[str]) -> XmlReader:
+    reader = _READERS.get(container)
+    if reader is None:
+        reader = (create_container_reader(container) if container else None) or XmlReader()
+        _READERS[container] = reader
+    return reader
+
+
+def iter_source_lines(xml_file: str, reader: t.Optional[XmlReader] = None) -> t.Iterator[str]:
+    """
+    Stream the code lines of the program listing of a compound file. The code blocks of the descriptions are skipped.
+    """
+    path = []
+    with (reader or XmlReader()).open(xml_file) as fr:
+        for event, elem in ElementTree.iterparse(fr, events=('start', 'end')):
+            if event == 'start':
+                path.append(elem.tag)
+                continue
+
+            path.pop()
+            if elem.tag == 'codeline' and path[-2:] == ['compounddef', 'programlisting']:
+                yield codeline_text(elem)
+                elem.clear()
+            elif path == ['doxygen', 'compounddef']:  # not needed anymore
+                elem.clear()
+
+
+def write_source_page(page: SourcePage, template_dir: t.Optional[str] = None) -> t.Optional[bool]:
+    """
+    Render the page to a temporary file, line by line, and move it to ``page.output`` if it changed.
+
+    :return: None if the compound file has no program listing, else True if the page was created or modified.
+    """
+    lines = iter_source_lines(page.xml_file, _get_reader(page.container))
+    first = next(lines, None)
+    if first is None:
+        return None
+
+    template = _get_environment(template_dir).get_template('source.jinja')
+    chunks = template.generate(
+        location=page.location,
+        doc_link=page.doc_link,
+        lang=page.lang,
+        lines=itertools.chain([first], lines),
+    )
+
+    dirname = os.path.dirname(page.output) or '.'
+    with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', dir=dirname, delete=False) as fw:
+        fw.writelines(chunks)
+
+    if os.path.isfile(page.output) and filecmp.cmp(page.output, fw.name, shallow=False):
+        os.remove(fw.name)
+        return False
+
+    os.replace(fw.name, page.output)
+    return True
+
+
+def _write_source_page(args: t.Tuple[SourcePage, t.Optional[str]]) -> t.Optional[bool]:
+    return write_source_page(*args)
+
+
+def write_source_pages(
+    doxygen: Doxygen,
+    source_dir: str,
+    output_filepath: str,
+    *,
+    template_dir: t.Optional[str] = None,
+    jobs: t.Optional[int] = None,
+    low_memory: bool = False,
+    documents: t.Optional[t.Dict[str, str]] = None,
+    template_lang: t.Optional[str] = 'c',
+) -> bool:
+    """
+    Write the ``<refid>_source.md`` source listing page of every header file to ``source_dir``, on ``jobs`` processes.
+    The pages link back to the documentation of their file in ``output_filepath``. The pages written by a previous run
+    for header files that are gone are removed, see ``SOURCE_PAGES_LIST``.
+
+    The workers stream the program listing from the compound files, the model is only used for the file locations and
+    anchors.
+
+    :param documents: filepath of the part of each anchor when the output is split, see ``render_parts``.
+    :param template_lang: language of the code blocks.
+    :return: True if any page was created, modified or removed.
+    """
+    os.makedirs(source_dir, exist_ok=True)
+    documents = documents or {}
+
+    def relative(filepath: str) -> str:
+        return os.path.relpath(filepath, source_dir).replace(os.sep, '/')
+
+    container = None
+    if isinstance(doxygen.reader, ContainerReader):
+        container = doxygen.reader.container
+        # reuse the index of the model, in this process and in the forked workers
+        _READERS.setdefault(container, doxygen.reader)
+
+    pages = []
+    for file in doxygen.header_files.children:
+        pages.append(
+            SourcePage(
+                xml_file=file.xml_file,
+                location=file.location,
+                doc_link=relative(documents.get(file.anchor, output_filepath)) + file.relative_link,
+                output=os.path.join(source_dir, file.refid + '_source.md'),
+                container=container,
+                lang=template_lang or 'c',
+            )
+        )
+        if low_memory:
+            doxygen.release()
+
+    jobs = jobs or os.cpu_count() or 1
+    tasks = [(page, template_dir) for page in pages]
+    if jobs > 1 and len(pages) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(pages))) as pool:
+            results = list(pool.map(_write_source_page, tasks, chunksize=max(1, len(pages) // (jobs * 4))))
+    else:
+        results = [_write_source_page(task) for task in tasks]
+
+    written = [page.output for page, result in zip(pages, results) if result]
+    skipped = results.count(None)
+    removed = _update_pages_list(
+        source_dir, [page.output for page, result in zip(pages, results) if result is not None]
+    )
+    print(
+        f'Source pages in {source_dir}: {len(written)} updated, {len(pages) - len(written) - skipped} unchanged, '
+        f'{skipped} without program listing, {len(removed)} removed'
+    )
+    return len(written) > 0 or len(removed) > 0
+
+
+def _update_pages_list(source_dir: str, outputs: t.List[str]) -> t.List[str]:
+    """
+    Remove the pages listed by the ``SOURCE_PAGES_LIST`` file of ``source_dir`` that are not in ``outputs`` anymore,
+    and list ``outputs`` instead. The files not written by doxybook are never removed.
+
+    :return: the removed filepaths.
+    """
+    list_filepath = os.path.join(source_dir, SOURCE_PAGES_LIST)
+    names = sorted(os.path.basename(output) for output in outputs)
+    previous = []
+    if os.path.isfile(list_filepath):
+        with open(list_filepath, encoding='utf-8') as fr:
+            previous = fr.read().split()
+
+    removed = []
+    for name in sorted(set(previous) - set(names)):
+        filepath = os.path.join(source_dir, name)
+        if os.path.isfile(filepath):
+            os.remove(filepath)
+            removed.append(filepath)
+
+    if previous != names:
+        with open(list_filepath, 'w', encoding='utf-8') as fw:
+            fw.writelines(name + '\n' for name in names)
+    return removed
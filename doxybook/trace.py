@@ -0,0 +1,114 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import typing as t
+
+
+class Trace:
+    """
+    Spans of the process in the Chrome trace event format, loadable by ``chrome://tracing`` and Perfetto.
+
+    The spans are "complete" events with the process and thread ids, the thread names are recorded as metadata events
+    on their first span. The timestamps are in microseconds of the wall clock, comparable between processes.
+    """
+
+    def __init__(self, process_name: str = 'doxybook'):
+        self.events: t.List[dict] = []
+        self._lock = threading.Lock()
+        self._threads: t.Set[int] = set()
+        self._add_metadata('process_name', threading.get_ident(), process_name)
+
+    def add(self, name: str, cat: str, start: float, end: float, args: t.Dict[str, t.Any]) -> None:
+        tid = threading.get_ident()
+        with self._lock:
+            if tid not in self._threads:
+                self._threads.add(tid)
+                self._add_metadata('thread_name', tid, threading.current_thread().name)
+            self.events.append(
+                {
+                    'name': name,
+                    'cat': cat,
+                    'ph': 'X',
+                    'ts': start,
+                    'dur': end - start,
+                    'pid': os.getpid(),
+                    'tid': tid,
+                    'args': args,
+                }
+            )
+
+    def extend(self, events: t.List[dict]) -> None:
+        """
+        Add the events recorded by another process, see ``collect``.
+        """
+        with self._lock:
+            self.events.extend(events)
+
+    def collect(self) -> t.List[dict]:
+        """
+        Take the events recorded so far.
+        """
+        with self._lock:
+            events = self.events
+            self.events = []
+            return events
+
+    def write(self, filepath: str) -> None:
+        with self._lock:
+            events = list(self.events)
+        with open(filepath, 'w', encoding='utf-8') as fw:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, fw, separators=(',', ':'))
+
+    def _add_metadata(self, name: str, tid: int, value: str) -> None:
+        self.events.append({'name': name, 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': value}})
+
+
+# trace of the process, spans are not recorded if not set
+_TRACE: t.Optional[Trace] = None
+
+
+def enable(process_name: str = 'doxybook') -> Trace:
+    """
+    Start recording the spans of this process.
+    """
+    global _TRACE  # noqa: PLW0603
+    _TRACE = Trace(process_name)
+    return _TRACE
+
+
+def disable() -> t.Optional[Trace]:
+    """
+    Stop recording the spans.
+
+    :return: the trace recorded so far, if any.
+    """
+    global _TRACE  # noqa: PLW0603
+    trace, _TRACE = _TRACE, None
+    return trace
+
+
+def current() -> t.Optional[Trace]:
+    return _TRACE
+
+
+def _now() -> float:
+    return time.time_ns() / 1000
+
+
+@contextlib.contextmanager
+def span(name: str, cat: str, **args) -> t.Iterator[None]:
+    """
+    Record the enclosed block as a span of the current trace, if tracing is enabled.
+    """
+    trace = _TRACE
+    if trace is None:
+        yield
+        return
+
+    start = _now()
+    try:
+        yield
+    finally:
+        trace.add(name, cat, start, _now(), args)
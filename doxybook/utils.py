@@ -1,6 +1,14 @@
 import enum
+import shlex
+import shutil
 import subprocess
 import sys
+import typing as t
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None
 
 
 # Credits: https://stackoverflow.com/a/1630350
@@ -62,6 +70,29 @@ def split_safe(s: str, delim: str) -> [str]:
     return tokens
 
 
+def get_doxygen_cmd(doxygen_bin: str = 'doxygen', extra_args: str = '') -> t.List[str]:
+    bin_path = shutil.which(doxygen_bin)
+    if not bin_path:
+        raise RuntimeError(f'{doxygen_bin} not found in your PATH')
+
+    cmd = [bin_path]
+    cmd.extend(shlex.split(extra_args))
+    return cmd
+
+
+def get_peak_rss() -> t.Optional[int]:
+    """
+    Peak resident set size of the current process in bytes, None if not available on this platform.
+    """
+    if resource is None:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':  # bytes on macos, kilobytes elsewhere
+        return peak
+    return peak * 1024
+
+
 def get_git_revision_hash() -> str:
     try:
         return subprocess.check_output(['git', 'rev-parse', 'HEAD']).decode('ascii').strip()
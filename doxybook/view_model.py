@@ -0,0 +1,218 @@
+import contextlib
+import io
+import os
+import typing as t
+from collections import (
+    Counter,
+)
+from concurrent.futures import (
+    ProcessPoolExecutor,
+)
+from itertools import (
+    repeat,
+)
+
+from doxybook.cache import (
+    Cache,
+)
+from doxybook.constants import (
+    Kind,
+    Visibility,
+)
+from doxybook.doxygen import (
+    CompoundFilter,
+    Doxygen,
+)
+from doxybook.node import (
+    Node,
+)
+from doxybook.reader import (
+    create_container_reader,
+)
+from doxybook.trace import (
+    current,
+    disable,
+    enable,
+    span,
+)
+from doxybook.xml_parser import (
+    XmlParser,
+)
+
+
+class ViewNode:
+    """
+    Picklable snapshot of the rendered data of a node, passed to the templates in place of the node.
+
+    Only the attributes below are available, along with the ``is_*`` kind checks and ``query``. The XML is not
+    reachable from a view, templates using other node attributes should be rendered without a view model.
+    """
+
+    FIELDS = (
+        'refid',
+        'name',
+        'name_short',
+        'name_long',
+        'name_full_unescaped',
+        'anchor',
+        'relative_link',
+        'location',
+        'brief',
+        'brief_plain',
+        'details',
+        'type',
+        'params',
+        'templateparams',
+        'values',
+        'initializer',
+        'definition',
+        'prefix',
+        'suffix',
+        'codeblock',
+    )
+
+    __slots__ = (*FIELDS, 'kind', 'visibility', 'static', 'children')
+
+    def __init__(self, node: Node):
+        for field in self.FIELDS:
+            try:
+                value = getattr(node, field)
+            except (AttributeError, TypeError):
+                # the placeholders of missing compounds lack the XML of some fields, left undefined for the templates
+                if node.kind != Kind.NONE:
+                    raise
+                continue
+            setattr(self, field, value)
+        self.kind: Kind = node.kind
+        self.visibility: t.Optional[Visibility] = getattr(node, '_visibility', None)
+        self.static: t.Optional[bool] = getattr(node, '_static', None)
+        self.children: t.List[ViewNode] = []
+
+    def query(
+        self, visibility: t.Optional[str] = None, kinds: t.Optional[t.List[str]] = None, static: t.Optional[bool] = None
+    ) -> t.List['ViewNode']:
+        """
+        Same as ``Node.query``.
+        """
+        if visibility is not None:
+            visibility = Visibility(visibility)
+        if kinds is not None:
+            kinds = set(map(Kind.from_str, kinds))
+
+        return [
+            child
+            for child in self.children
+            if (visibility is None or child.visibility == visibility)
+            and (static is None or child.static == static)
+            and (kinds is None or child.kind in kinds)
+        ]
+
+    def has(self, visibility: str, kinds: t.List[str], static: bool) -> bool:
+        return len(self.query(visibility, kinds, static)) > 0
+
+    @property
+    def has_children(self) -> bool:
+        return len(self.children) > 0
+
+    @property
+    def is_header_file(self) -> bool:
+        return os.path.splitext(self.name)[1] in ['.h', '.hh', '.hpp']
+
+    def __getattr__(self, name: str):
+        # is_function, is_struct, ... are answered by the kind, as for the nodes
+        if name.startswith('is_'):
+            check = getattr(Kind, name, None)
+            if check is not None:
+                return check(self.kind)
+        raise AttributeError(f'{type(self).__name__!r} object has no attribute {name!r}')
+
+
+def build_view(node: Node) -> ViewNode:
+    """
+    View of ``node`` and of all its descendants. A node reachable from several parents is built once.
+    """
+    views: t.Dict[int, ViewNode] = {}
+
+    def visit(current: Node) -> ViewNode:
+        view = views.get(id(current))
+        if view is None:
+            view = ViewNode(current)
+            views[id(current)] = view
+            view.children = [visit(child) for child in current.children]
+        return view
+
+    return visit(node)
+
+
+# lazily loaded model of the worker process, shared by all the header files it builds
+_MODEL: t.Optional[Doxygen] = None
+
+
+def _init_worker(input_dir: str, compound_filter: t.Optional[CompoundFilter], tracing: bool) -> None:
+    global _MODEL  # noqa: PLW0603
+    # a forked worker inherits the trace of the main process, its events are sent back with the views instead
+    if tracing:
+        enable('doxybook view worker')
+    else:
+        disable()
+    with contextlib.redirect_stdout(io.StringIO()):  # the loading logs are already printed by the main process
+        cache = Cache()
+        parser = XmlParser(cache=cache, target='single-markdown')
+        options = {'target': 'single-markdown', 'link_prefix': ''}
+        reader = create_container_reader(input_dir)
+        _MODEL = Doxygen(
+            input_dir, parser, cache, options=options, reader=reader, compound_filter=compound_filter, lazy=True
+        )
+
+
+def _build_file_view(refid: str, target: str, link_prefix: str) -> t.Tuple[ViewNode, t.Counter[str], t.List[dict]]:
+    _MODEL.set_target(target, link_prefix)
+    unresolved = _MODEL.parser.unresolved_refs.copy()
+    file = next(file for file in _MODEL.header_files.children if file.refid == refid)
+    with span(file.location, 'view'):
+        view = build_view(file)
+    trace = current()
+    return view, _MODEL.parser.unresolved_refs - unresolved, trace.collect() if trace is not None else []
+
+
+class ViewModelPool:
+    """
+    Process pool computing the views of the header files ahead of the template rendering, so the description
+    conversion of the header sections runs on several cores. Jinja only assembles the strings afterwards.
+
+    Each worker loads its own lazy model of the XML files once, and parses only the compounds of the header files it
+    is given.
+    """
+
+    def __init__(self, input_dir: str, jobs: int, compound_filter: t.Optional[CompoundFilter] = None):
+        self._executor = ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_worker, initargs=(input_dir, compound_filter, current() is not None)
+        )
+
+    def header_files(self, doxygen: Doxygen, target: str, link_prefix: str = '') -> t.List[ViewNode]:
+        """
+        Views of the header files of ``doxygen``, in the same order.
+
+        The references left unresolved by the workers are counted in the parser of ``doxygen``, and their trace events
+        are added to the trace of this process.
+        """
+        refids = [file.refid for file in doxygen.header_files.children]
+        views = []
+        unresolved = Counter()
+        trace = current()
+        for view, counts, events in self._executor.map(_build_file_view, refids, repeat(target), repeat(link_prefix)):
+            views.append(view)
+            unresolved.update(counts)
+            if trace is not None:
+                trace.extend(events)
+        doxygen.parser.unresolved_refs.update(unresolved)
+        return views
+
+    def close(self) -> None:
+        self._executor.shutdown()
+
+    def __enter__(self) -> 'ViewModelPool':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
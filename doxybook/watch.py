@@ -0,0 +1,272 @@
+import os
+import time
+import typing as t
+
+from doxybook.cache import (
+    Cache,
+)
+from doxybook.doxygen import (
+    CompoundFilter,
+    Doxygen,
+)
+from doxybook.node import (
+    Node,
+)
+from doxybook.reader import (
+    CachingReader,
+    ContainerReader,
+)
+from doxybook.runner import (
+    FileSections,
+    create_environment,
+    create_reader,
+    get_output_filepath,
+    render,
+    report_references,
+    write_output,
+)
+from doxybook.utils import (
+    error,
+    info,
+)
+from doxybook.xml_parser import (
+    XmlParser,
+)
+
+Snapshot = t.Dict[str, t.Tuple[int, int]]
+
+
+def snapshot(directory: t.Optional[str], extensions: t.Tuple[str, ...]) -> Snapshot:
+    """
+    Map the absolute path of every file under ``directory`` with one of ``extensions`` to its mtime and size.
+    """
+    ret = {}
+    if not directory:
+        return ret
+
+    for root, _, files in os.walk(directory):
+        for filename in files:
+            if not filename.endswith(extensions):
+                continue
+            path = os.path.abspath(os.path.join(root, filename))
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:  # removed while walking
+                continue
+            ret[path] = (st.st_mtime_ns, st.st_size)
+    return ret
+
+
+class Watcher:
+    """
+    Keeps the doxygen model and the jinja environment in memory, and updates them when the XML files or the templates
+    change.
+
+    Compound files are parsed again only when their content changed. A header section is rendered again when one of
+    the compound files it was built from changed, or when the link of any symbol changed.
+    """
+
+    def __init__(
+        self,
+        input_dir: str,
+        output: t.Optional[str] = None,
+        *,
+        target: str = 'single-markdown',
+        link_prefix: str = '',
+        template_dir: t.Optional[str] = None,
+        template_lang: t.Optional[str] = 'c',
+        prefetch_workers: int = 0,
+        prefetch_budget: int = 64 * 1024 * 1024,
+        compound_filter: t.Optional[CompoundFilter] = None,
+        lazy: bool = False,
+        parse_threads: int = 0,
+    ):
+        """
+        :param lazy: build a lazy model, the compound files are parsed when a section needs them, see ``Doxygen``.
+        :param parse_threads: number of threads parsing the compound files ahead, see ``create_reader``.
+        """
+        self.output_filepath = get_output_filepath(output) if output else None
+        self.input_dir = input_dir
+        self.template_dir = template_dir
+        self.template_lang = template_lang or 'c'
+        self.options = {'target': target, 'link_prefix': link_prefix}
+        self.compound_filter = compound_filter
+        self.lazy = lazy
+
+        self.reader = CachingReader(create_reader(prefetch_workers, prefetch_budget, input_dir, parse_threads))
+        self.parser = XmlParser(cache=Cache(), target=target)
+        self.doxygen: t.Optional[Doxygen] = None
+        self.env = None
+        self.sections: t.Optional[FileSections] = None
+
+        self._xml_snapshot: Snapshot = {}
+        self._template_snapshot: Snapshot = {}
+        # the link table built with the model, before the renders add the links of the nodes loaded on demand
+        self._links: t.Dict[str, t.Tuple[str, str]] = {}
+
+    def start(self) -> None:
+        self._xml_snapshot = self._current_xml_snapshot()
+        self._template_snapshot = self._current_template_snapshot()
+        self.load()
+        self.load_templates()
+
+    def load(self) -> t.Set[str]:
+        """
+        (Re)build the doxygen model.
+
+        :return: the absolute paths of the compound files parsed again, or changed since the last snapshot for a lazy
+            model, which parses them later.
+        """
+        self.reader.reset_changed()
+        current = self._current_xml_snapshot()
+        removed = set(self._xml_snapshot) - set(current)
+        self.reader.forget(removed)
+
+        cache = Cache()
+        self.parser.cache = cache
+        self.parser.unresolved_refs.clear()
+        self.doxygen = Doxygen(
+            self.input_dir,
+            self.parser,
+            cache,
+            options=self.options,
+            reader=self.reader,
+            compound_filter=self.compound_filter,
+            lazy=self.lazy,
+        )
+        self._links = dict(self.parser.links)
+        if self.lazy:
+            changed = {path for path, key in current.items() if self._xml_snapshot.get(path) != key}
+            return changed | removed
+        return self.reader.changed | removed
+
+    def load_templates(self) -> None:
+        self.env = create_environment(self.template_dir)
+        self.sections = FileSections(self.env.get_template(f'{self.template_lang}/file.jinja'))
+
+    def render_section(self, file: Node) -> str:
+        return self.sections.render(
+            file,
+            table_template=self.env.get_template('table.jinja'),
+            detail_template=self.env.get_template('detail.jinja'),
+        )
+
+    def render(self) -> bool:
+        start = time.perf_counter()
+        content = render(self.doxygen, self.env, self.template_lang, file_template=self.sections)
+        report_references(self.parser)
+        changed = write_output(self.output_filepath, content)
+        info(f'Rendered in {time.perf_counter() - start:.3f}s')
+        return changed
+
+    def poll(self) -> t.Tuple[Snapshot, Snapshot]:
+        return self._current_xml_snapshot(), self._current_template_snapshot()
+
+    def has_changes(self, snapshots: t.Tuple[Snapshot, Snapshot]) -> bool:
+        return snapshots != (self._xml_snapshot, self._template_snapshot)
+
+    def wait_until_settled(
+        self, snapshots: t.Tuple[Snapshot, Snapshot], interval: float
+    ) -> t.Tuple[Snapshot, Snapshot]:
+        """
+        doxygen writes the files one by one, wait until two consecutive snapshots are the same.
+        """
+        while True:
+            time.sleep(interval)
+            settled = self.poll()
+            if settled == snapshots:
+                return settled
+            snapshots = settled
+
+    def reload(self, snapshots: t.Tuple[Snapshot, Snapshot]) -> None:
+        """
+        Apply the changes between the last loaded snapshots and ``snapshots``.
+        """
+        xml_snapshot, template_snapshot = snapshots
+        try:
+            if template_snapshot != self._template_snapshot:
+                info('Templates changed, re-rendering all sections')
+                self.load_templates()
+
+            if xml_snapshot != self._xml_snapshot:
+                old_links = self._links
+                # the files the cached sections were rendered from, taken from the previous model
+                dependencies = {file.refid: file.xml_files for file in self.doxygen.header_files.children}
+                changed_files = self.load()
+                # the links of the added or removed symbols change the XML of the compounds referencing them
+                if any(self._links[refid] != link for refid, link in old_links.items() if refid in self._links):
+                    self.sections.invalidate()
+                else:
+                    self.sections.invalidate(
+                        refid
+                        for refid, xml_files in dependencies.items()
+                        if {os.path.abspath(f) for f in xml_files} & changed_files
+                    )
+                info(f'{len(changed_files)} compound files changed')
+        except Exception:
+            # the files parsed by the failed attempt won't be reported as changed again
+            self.sections.invalidate()
+            raise
+        finally:
+            self._xml_snapshot = xml_snapshot
+            self._template_snapshot = template_snapshot
+
+    def _current_xml_snapshot(self) -> Snapshot:
+        if isinstance(self.reader.reader, ContainerReader):
+            return self.reader.reader.snapshot()
+        return snapshot(self.input_dir, ('.xml',))
+
+    def _current_template_snapshot(self) -> Snapshot:
+        return snapshot(self.template_dir, ('.jinja',))
+
+    def watch(self, interval: float = 1.0) -> None:
+        self.start()
+        self.render()
+
+        info(f'Watching {self.input_dir}' + (f' and {self.template_dir}' if self.template_dir else '') + ' for changes')
+        while True:
+            time.sleep(interval)
+            snapshots = self.poll()
+            if not self.has_changes(snapshots):
+                continue
+
+            snapshots = self.wait_until_settled(snapshots, interval)
+            try:
+                self.reload(snapshots)
+                self.render()
+            except Exception as e:  # keep watching, the next doxygen run may fix it
+                error(f'Failed to update the output: {e!r}')
+
+
+def watch(
+    output: str,
+    input_dir: str,
+    *,
+    target: str = 'single-markdown',
+    link_prefix: str = '',
+    template_dir: t.Optional[str] = None,
+    template_lang: t.Optional[str] = 'c',
+    interval: float = 1.0,
+    prefetch_workers: int = 0,
+    prefetch_budget: int = 64 * 1024 * 1024,
+    compound_filter: t.Optional[CompoundFilter] = None,
+    lazy: bool = False,
+    parse_threads: int = 0,
+) -> None:
+    watcher = Watcher(
+        input_dir,
+        output,
+        target=target,
+        link_prefix=link_prefix,
+        template_dir=template_dir,
+        template_lang=template_lang,
+        prefetch_workers=prefetch_workers,
+        prefetch_budget=prefetch_budget,
+        compound_filter=compound_filter,
+        lazy=lazy,
+        parse_threads=parse_threads,
+    )
+    try:
+        watcher.watch(interval)
+    except KeyboardInterrupt:
+        pass
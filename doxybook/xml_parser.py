@@ -1,9 +1,14 @@
+import typing as t
+from collections import (
+    Counter,
+)
 from xml.etree.ElementTree import (
     Element,
 )
 
 from doxybook.cache import (
     Cache,
+    LruCache,
 )
 from doxybook.markdown import (
     Br,
@@ -23,6 +28,7 @@ from doxybook.markdown import (
     MdTableCell,
     MdTableRow,
     Text,
+    escape,
 )
 from doxybook.utils import (
     lookahead,
@@ -52,23 +58,159 @@ SIMPLE_SECTIONS = {
     'date': 'Date:',
 }
 
+SECTION_LEVELS = {
+    'sect1': 2,
+    'sect2': 3,
+    'sect3': 4,
+    'sect4': 5,
+    'sect5': 6,
+}
+
+# handler(item, italic) -> [Md]
+Handler = t.Callable[[Element, bool], t.List[Md]]
+# emitter(item, italic, renderer, indent), writes the markdown of the Md objects of the handler of the same tag
+Emitter = t.Callable[[Element, bool, MdRenderer, str], None]
+
+
+def highlight_parts(highlight: Element, parts: t.List[str]) -> None:
+    """
+    Append the text of a ``<highlight>`` element of a code line to ``parts``.
+    """
+    if highlight.text is not None:
+        parts.append(highlight.text)
+    for c in highlight:
+        if c.tag == 'sp':
+            parts.append(' ')
+        if c.text:
+            parts.append(c.text)
+        if c.tail:
+            parts.append(c.tail)
+
+
+def codeline_text(codeline: Element) -> str:
+    parts = []
+    for highlight in codeline.iterfind('highlight'):
+        highlight_parts(highlight, parts)
+    return ''.join(parts)
+
 
 class XmlParser:
-    def __init__(self, cache: Cache, target: str = 'gitbook'):
+    def __init__(self, cache: Cache, target: str = 'gitbook', fragment_cache_size: int = 4096):
         self.target = target
         self.cache = cache
 
+        # rendered description fragments, keyed by element identity
+        self.fragments = LruCache(fragment_cache_size)
+
+        # refid -> (relative link, full name), filled by `build_link_table` once the tree is final
+        self.links: t.Dict[str, t.Tuple[str, str]] = {}
+        # refid -> number of rendered references that could not be resolved
+        self.unresolved_refs: t.Counter[str] = Counter()
+        # refids of the unresolved references of the fragment being rendered, counted again on its cache hits
+        self._fragment_refs: t.Optional[t.List[str]] = None
+
+        self.handlers: t.Dict[str, Handler] = {
+            'para': self._para,
+            'image': self._image,
+            'computeroutput': self._computeroutput,
+            'programlisting': self._programlisting,
+            'table': self._table,
+            'blockquote': self._blockquote,
+            'heading': self._heading,
+            'orderedlist': self._list,
+            'itemizedlist': self._list,
+            'ref': self._ref,
+            'variablelist': self._variablelist,
+            'parameterlist': self._parameterlist,
+            'simplesect': self._simplesect,
+            'xrefsect': self._xrefsect,
+            'ulink': self._ulink,
+            'bold': self._bold,
+            'emphasis': self._emphasis,
+        }
+        for tag in SECTION_LEVELS:
+            self.handlers[tag] = self._sect
+
+        # the tags written directly by emit_paras while their handler is the built-in one, the other handlers are
+        # rendered from their Md objects
+        self._builtin_handlers: t.Dict[str, Handler] = dict(self.handlers)
+        self.emitters: t.Dict[str, Emitter] = {
+            'para': self._emit_para,
+            'image': self._emit_image,
+            'computeroutput': self._emit_computeroutput,
+            'programlisting': self._emit_programlisting,
+            'heading': self._emit_heading,
+            'orderedlist': self._emit_list,
+            'itemizedlist': self._emit_list,
+            'ref': self._emit_ref,
+            'variablelist': self._emit_variablelist,
+            'parameterlist': self._emit_parameterlist,
+            'simplesect': self._emit_simplesect,
+            'xrefsect': self._emit_xrefsect,
+            'ulink': self._emit_ulink,
+            'bold': self._emit_bold,
+            'emphasis': self._emit_emphasis,
+        }
+        for tag in SECTION_LEVELS:
+            self.emitters[tag] = self._emit_sect
+
+    def register_handler(self, tag: str, handler: Handler) -> None:
+        """
+        Render the XML elements named ``tag`` with ``handler`` instead of the built-in one.
+
+        The handler is called with the element and the ``italic`` flag, and returns a list of ``Md`` objects.
+        Elements without a handler are skipped, only their tail text is rendered.
+        """
+        self.handlers[tag] = handler
+        self.fragments.clear()
+
+    def build_link_table(self) -> None:
+        """
+        Resolve the link and the full name of every cached node.
+
+        Links depend on the parents and the sibling order of the nodes, call this after the tree is sorted.
+        """
+        links = {}
+        for refid, node in self.cache.items():
+            if not node.is_loaded:  # resolved on the first reference, see _resolve
+                continue
+            try:
+                links[refid] = (node.relative_link, node.name_full_unescaped)
+            except Exception:  # incomplete nodes, e.g. missing compound files
+                continue
+
+        # rendered fragments stay valid for the elements that are still alive as long as no link changed
+        if links != self.links:
+            self.fragments.clear()
+        self.links = links
+
     def anchor(self, name: str) -> str:
         return '<a name="' + name + '"></a>'
 
     def paras_as_str(self, p: Element, italic: bool = False, plain: bool = False) -> str:
-        if plain:
-            return self.plain_as_str(p)
-        else:
-            renderer = MdRenderer()
-            for m in self.paras(p, italic=italic):
-                m.render(renderer, '')
-            return renderer.output.strip()
+        # the element is stored next to the result, so a recycled id() never returns a stale fragment
+        key = (id(p), italic, plain)
+        cached = self.fragments.get(key)
+        if cached is not None and cached[0] is p:
+            for refid in cached[2]:
+                self._unresolved(refid)
+            return cached[1]
+
+        outer, self._fragment_refs = self._fragment_refs, []
+        try:
+            if plain:
+                res = self.plain_as_str(p)
+            else:
+                renderer = MdRenderer()
+                self.emit_paras(p, renderer, italic=italic)
+                res = renderer.output.strip()
+        finally:
+            refs, self._fragment_refs = self._fragment_refs, outer
+        if outer is not None:
+            outer.extend(refs)
+
+        self.fragments.add(key, (p, res, refs))
+        return res
 
     def reference_as_str(self, p: Element) -> str:
         renderer = MdRenderer()
@@ -82,8 +224,8 @@ class XmlParser:
 
     def programlisting_as_str(self, p: Element) -> str:
         renderer = MdRenderer()
-        for m in self.programlisting(p):
-            m.render(renderer, '')
+        if p.tag == 'programlisting':
+            self._emit_programlisting(p, False, renderer, '')
         return renderer.output
 
     def plain_as_str(self, p: Element) -> str:
@@ -105,37 +247,30 @@ class XmlParser:
         ret = []
         # programlisting
         if p.tag == 'programlisting':
-            got_lang = False
-            code = MdCodeBlock([])
-            for codeline in p.findall('codeline'):
-                line = ''
-                for highlight in codeline.findall('highlight'):
-                    if (
-                        not got_lang
-                        and len(highlight) == 0
-                        and highlight.text is not None
-                        and highlight.text.startswith('{')
-                        and highlight.text.endswith('}')
-                    ):
-                        lang = highlight.text[1:-1]
-                        code.set_lang(lang)
-                        got_lang = True
-                        continue
-                    else:
-                        if highlight.text is not None:
-                            line += highlight.text
-                        for c in highlight:
-                            if c.tag == 'sp':
-                                line += ' '
-                            if c.text:
-                                line += c.text
-                            if c.tail:
-                                line += c.tail
-                code.append(line)
+            lang, lines = self._code_lines(p)
             ret.append(Text('\n'))
-            ret.append(code)
+            ret.append(MdCodeBlock(lines, lang))
         return ret
 
+    def _code_lines(self, p: Element) -> t.Tuple[str, t.List[str]]:
+        """
+        :return: the language of a ``<programlisting>``, from its first ``{lang}`` highlight, and its code lines.
+        """
+        lang = 'cpp'
+        got_lang = False
+        lines = []
+        for codeline in p.iterfind('codeline'):
+            parts = []
+            for highlight in codeline.iterfind('highlight'):
+                text = highlight.text
+                if not got_lang and text is not None and len(highlight) == 0 and text[:1] == '{' and text[-1:] == '}':
+                    lang = text[1:-1]
+                    got_lang = True
+                    continue
+                highlight_parts(highlight, parts)
+            lines.append(''.join(parts))
+        return lang, lines
+
     def paras(self, p: Element, italic: bool = False) -> [Md]:
         ret = []
         if p is None:
@@ -147,186 +282,334 @@ class XmlParser:
             else:
                 ret.append(Text(p.text))
         for item in p:
-            # para
-            if item.tag == 'para':
-                ret.append(MdParagraph(self.paras(item)))
-                ret.append(Text('\n'))
-
-            # image
-            elif item.tag == 'image':
-                url = item.get('name')
-                ret.append(MdImage(url))
-
-            # computeroutput
-            elif item.tag == 'computeroutput':
-                text = []
-                if item.text:
-                    text.append(item.text)
-                for i in item:
-                    text.extend(self.plain(i))
-                ret.append(Code(' '.join(text)))
-
-            # programlisting
-            elif item.tag == 'programlisting':
-                ret.extend(self.programlisting(item))
-
-            # table
-            elif item.tag == 'table':
-                t = MdTable()
-                for row in item.findall('row'):
-                    r = MdTableRow([])
-                    for cell in row.findall('entry'):
-                        for para in cell.findall('para'):
-                            r.append(MdTableCell(self.paras(para)))
-                    t.append(r)
-                ret.append(t)
-
-            # blockquote
-            elif item.tag == 'blockquote':
-                b = MdBlockQuote([])
-                for para in item.findall('para'):
-                    b.extend(self.paras(para))
-                ret.append(b)
-
-            # heading
-            elif item.tag == 'heading':
-                ret.append(MdHeader(int(item.get('level')), self.paras(item)))
-
-            # orderedlist
-            elif item.tag in ('orderedlist', 'itemizedlist'):
-                lst = MdList([])
-                for listitem in item.findall('listitem'):
-                    i = MdParagraph([])
-                    for para in listitem.findall('para'):
-                        i.extend(self.paras(para))
-                    lst.append(i)
-                ret.append(Text('\n'))  # in case there's no extra blank line before the list
-                ret.append(lst)
-
-            # Reference
-            elif item.tag == 'ref':
-                refid = item.get('refid')
-                try:
-                    ref = self.cache.get(refid)
-                    if italic:
-                        if item.text:
-                            ret.append(MdLink([MdItalic([MdBold([Text(item.text)])])], ref.relative_link))
-                        else:
-                            ret.append(MdLink([MdItalic([MdBold([Text(ref.get_full_name())])])], ref.relative_link))
-                    elif item.text:
-                        ret.append(MdLink([MdBold([Text(item.text)])], ref.relative_link))
-                    else:
-                        ret.append(MdLink([MdBold([Text(ref.get_full_name())])], ref.relative_link))
-                except Exception:
-                    if item.text:
-                        ret.append(Text(item.text))
-
-            # sect1:
-            elif item.tag == 'sect1':
-                title = item.find('title').text
-                ret.append(MdHeader(2, [Text(title)]))
-                ret.extend(self.paras(item))
-
-            # sect2:
-            elif item.tag == 'sect2':
-                title = item.find('title').text
-                ret.append(MdHeader(3, [Text(title)]))
-                ret.extend(self.paras(item))
-
-            # sect3:
-            elif item.tag == 'sect3':
-                title = item.find('title').text
-                ret.append(MdHeader(4, [Text(title)]))
-                ret.extend(self.paras(item))
-
-            # sect4:
-            elif item.tag == 'sect4':
-                title = item.find('title').text
-                ret.append(MdHeader(5, [Text(title)]))
-                ret.extend(self.paras(item))
-
-            # sect5:
-            elif item.tag == 'sect5':
-                title = item.find('title').text
-                ret.append(MdHeader(6, [Text(title)]))
-                ret.extend(self.paras(item))
-
-            # variablelist
-            elif item.tag == 'variablelist':
-                varlistentry = item.find('varlistentry')
-
-                ret.append(MdHeader(4, self.paras(varlistentry.find('term'))))
-
-                for listitem in item.findall('listitem'):
-                    for para in listitem.findall('para'):
-                        ret.append(MdParagraph(self.paras(para)))
-
-            # parameterlist
-            elif item.tag == 'parameterlist':
-                parameteritems = item.findall('parameteritem')
-                lst = MdList([])
-                for parameteritem in parameteritems:
-                    name = parameteritem.find('parameternamelist').find('parametername')
-                    description = parameteritem.find('parameterdescription').findall('para')
-                    par = MdParagraph([])
-                    if len(name) > 0:
-                        par.extend(self.paras(name))
-                    else:
-                        par.append(Code(name.text))
-                    par.append(Text(' '))
-                    for ip in description:
-                        par.extend(self.paras(ip))
-                    lst.append(par)
-                ret.append(Br())
-                ret.append(MdBold([Text(SIMPLE_SECTIONS[item.get('kind')])]))
-                ret.append(Br())
-                ret.append(lst)
+            handler = self.handlers.get(item.tag)
+            if handler is not None:
+                ret.extend(handler(item, italic))
 
-            # simplesect
-            elif item.tag == 'simplesect':
-                kind = item.get('kind')
-                ret.append(Br())
-                ret.append(MdBold([Text(SIMPLE_SECTIONS[kind])]))
-                if kind != 'see':
-                    ret.append(Br())
+            # End of the item text
+            if item.tail and item.tail.strip():
+                if italic:
+                    ret.append(MdItalic([Text(item.tail.rstrip())]))
                 else:
-                    ret.append(Text(' '))
-
-                for sp, has_more in lookahead(item.findall('para')):
-                    ret.extend(self.paras(sp))
-                    if kind == 'see':
-                        if has_more:
-                            ret.append(Text(', '))
-                    else:
-                        ret.append(Br())
-
-            # xrefsect
-            elif item.tag == 'xrefsect':
-                xreftitle = item.find('xreftitle')
-                xrefdescription = item.find('xrefdescription')
-                ret.append(Br())
-                ret.append(MdBold(self.paras(xreftitle)))
+                    ret.append(Text(item.tail.rstrip()))
+        return ret
+
+    def _para(self, item: Element, italic: bool) -> [Md]:
+        return [MdParagraph(self.paras(item)), Text('\n')]
+
+    def _image(self, item: Element, italic: bool) -> [Md]:
+        return [MdImage(item.get('name'))]
+
+    def _computeroutput(self, item: Element, italic: bool) -> [Md]:
+        text = []
+        if item.text:
+            text.append(item.text)
+        for i in item:
+            text.extend(self.plain(i))
+        return [Code(' '.join(text))]
+
+    def _programlisting(self, item: Element, italic: bool) -> [Md]:
+        return self.programlisting(item)
+
+    def _table(self, item: Element, italic: bool) -> [Md]:
+        t = MdTable()
+        for row in item.findall('row'):
+            r = MdTableRow([])
+            for cell in row.findall('entry'):
+                for para in cell.findall('para'):
+                    r.append(MdTableCell(self.paras(para)))
+            t.append(r)
+        return [t]
+
+    def _blockquote(self, item: Element, italic: bool) -> [Md]:
+        b = MdBlockQuote([])
+        for para in item.findall('para'):
+            b.extend(self.paras(para))
+        return [b]
+
+    def _heading(self, item: Element, italic: bool) -> [Md]:
+        return [MdHeader(int(item.get('level')), self.paras(item))]
+
+    def _list(self, item: Element, italic: bool) -> [Md]:
+        lst = MdList([])
+        for listitem in item.findall('listitem'):
+            i = MdParagraph([])
+            for para in listitem.findall('para'):
+                i.extend(self.paras(para))
+            lst.append(i)
+        # in case there's no extra blank line before the list
+        return [Text('\n'), lst]
+
+    def _resolve(self, refid: str) -> t.Optional[t.Tuple[str, str]]:
+        link = self.links.get(refid)
+        if link is not None:
+            return link
+
+        # nodes that were not loaded when the link table was built, e.g. the compounds of a lazily loaded model
+        node = self.cache.find(refid)
+        if node is None:
+            return None
+        try:
+            link = (node.relative_link, node.name_full_unescaped)
+        except Exception:
+            return None
+        self.links[refid] = link
+        return link
+
+    def _unresolved(self, refid: str) -> None:
+        self.unresolved_refs[refid] += 1
+        if self._fragment_refs is not None:
+            self._fragment_refs.append(refid)
+
+    def _ref(self, item: Element, italic: bool) -> [Md]:
+        refid = item.get('refid')
+        link = self._resolve(refid)
+        if link is None:
+            self._unresolved(refid)
+            if item.text:
+                return [Text(item.text)]
+            return []
+
+        url, full_name = link
+        text = [MdBold([Text(item.text or full_name)])]
+        if italic:
+            text = [MdItalic(text)]
+        return [MdLink(text, url)]
+
+    def _sect(self, item: Element, italic: bool) -> [Md]:
+        title = item.find('title').text
+        return [MdHeader(SECTION_LEVELS[item.tag], [Text(title)])] + self.paras(item)
+
+    def _variablelist(self, item: Element, italic: bool) -> [Md]:
+        varlistentry = item.find('varlistentry')
+
+        ret = [MdHeader(4, self.paras(varlistentry.find('term')))]
+        for listitem in item.findall('listitem'):
+            for para in listitem.findall('para'):
+                ret.append(MdParagraph(self.paras(para)))
+        return ret
+
+    def _parameterlist(self, item: Element, italic: bool) -> [Md]:
+        parameteritems = item.findall('parameteritem')
+        lst = MdList([])
+        for parameteritem in parameteritems:
+            name = parameteritem.find('parameternamelist').find('parametername')
+            description = parameteritem.find('parameterdescription').findall('para')
+            par = MdParagraph([])
+            if len(name) > 0:
+                par.extend(self.paras(name))
+            else:
+                par.append(Code(name.text))
+            par.append(Text(' '))
+            for ip in description:
+                par.extend(self.paras(ip))
+            lst.append(par)
+        return [Br(), MdBold([Text(SIMPLE_SECTIONS[item.get('kind')])]), Br(), lst]
+
+    def _simplesect(self, item: Element, italic: bool) -> [Md]:
+        kind = item.get('kind')
+        ret = [Br(), MdBold([Text(SIMPLE_SECTIONS[kind])])]
+        if kind != 'see':
+            ret.append(Br())
+        else:
+            ret.append(Text(' '))
+
+        for sp, has_more in lookahead(item.findall('para')):
+            ret.extend(self.paras(sp))
+            if kind == 'see':
+                if has_more:
+                    ret.append(Text(', '))
+            else:
                 ret.append(Br())
-                for sp in xrefdescription.findall('para'):
-                    ret.extend(self.paras(sp))
-                    ret.append(Br())
+        return ret
+
+    def _xrefsect(self, item: Element, italic: bool) -> [Md]:
+        xreftitle = item.find('xreftitle')
+        xrefdescription = item.find('xrefdescription')
+        ret = [Br(), MdBold(self.paras(xreftitle)), Br()]
+        for sp in xrefdescription.findall('para'):
+            ret.extend(self.paras(sp))
+            ret.append(Br())
+        return ret
 
-            # Hard link
-            elif item.tag == 'ulink':
-                ret.append(MdLink(self.paras(item), item.get('url')))
+    def _ulink(self, item: Element, italic: bool) -> [Md]:
+        return [MdLink(self.paras(item), item.get('url'))]
 
-            # Bold
-            elif item.tag == 'bold':
-                ret.append(MdBold(self.paras(item)))
+    def _bold(self, item: Element, italic: bool) -> [Md]:
+        return [MdBold(self.paras(item))]
 
-            # Emphasis
-            elif item.tag == 'emphasis':
-                ret.append(MdItalic(self.paras(item)))
+    def _emphasis(self, item: Element, italic: bool) -> [Md]:
+        return [MdItalic(self.paras(item))]
+
+    def emit_paras(self, p: Element, f: MdRenderer, italic: bool = False, indent: str = '') -> None:
+        """
+        Write the markdown of ``paras(p, italic)`` rendered with ``indent`` to ``f``, without building the ``Md``
+        objects. The output is the same.
+
+        The tags without an emitter, e.g. tables, and the tags whose handler is not the built-in one anymore, registered
+        by ``register_handler`` or set in ``handlers``, are rendered from the ``Md`` objects of their handler.
+        """
+        if p is None:
+            return
+        if p.text:
+            if italic:
+                text = p.text.strip()
+                f.write('_')
+                if text:
+                    f.write(escape(text))
+                f.write('_')
+                f.write(' ')
+            else:
+                f.write(escape(p.text))
+        for item in p:
+            handler = self.handlers.get(item.tag)
+            emitter = self.emitters.get(item.tag)
+            if emitter is not None and handler is self._builtin_handlers.get(item.tag):
+                emitter(item, italic, f, indent)
+            elif handler is not None:
+                for m in handler(item, italic):
+                    m.render(f, indent)
 
             # End of the item text
             if item.tail and item.tail.strip():
                 if italic:
-                    ret.append(MdItalic([Text(item.tail.rstrip())]))
+                    f.write('_')
+                    f.write(escape(item.tail.rstrip()))
+                    f.write('_')
                 else:
-                    ret.append(Text(item.tail.rstrip()))
-        return ret
+                    f.write(escape(item.tail.rstrip()))
+
+    def _emit_para(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        self.emit_paras(item, f, indent=indent)
+        f.eol()
+        f.write('\n')
+
+    def _emit_image(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        f.write('![Image](' + item.get('name') + ')')
+
+    def _emit_computeroutput(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        text = []
+        if item.text:
+            text.append(item.text)
+        for i in item:
+            text.extend(self.plain(i))
+        f.write('`' + ' '.join(text) + '`')
+
+    def _emit_programlisting(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        lang, lines = self._code_lines(item)
+        f.write('\n')
+        f.write('````' + lang + '\n' + ''.join(line + '\n' for line in lines) + '````\n\n')
+
+    def _emit_heading(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        f.write('#' * int(item.get('level')) + ' ')
+        self.emit_paras(item, f, indent=indent)
+        f.write('\n')
+        f.eol()
+
+    def _emit_list(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        # in case there's no extra blank line before the list
+        f.write('\n')
+        f.eol()
+        for listitem in item.findall('listitem'):
+            f.write(indent + '* ')
+            for para in listitem.findall('para'):
+                self.emit_paras(para, f, indent=indent + '  ')
+            f.eol()
+
+    def _emit_ref(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        refid = item.get('refid')
+        link = self._resolve(refid)
+        if link is None:
+            self._unresolved(refid)
+            if item.text:
+                f.write(escape(item.text))
+            return
+
+        url, full_name = link
+        text = item.text or full_name
+        f.write('[')
+        if italic:
+            f.write('_')
+        f.write('**')
+        if text:
+            f.write(escape(text))
+        f.write('**')
+        if italic:
+            f.write('_')
+        f.write('](' + url + ')')
+
+    def _emit_sect(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        title = item.find('title').text
+        f.write('#' * SECTION_LEVELS[item.tag] + ' ')
+        if title:
+            f.write(escape(title))
+        f.write('\n')
+        f.eol()
+        self.emit_paras(item, f, indent=indent)
+
+    def _emit_variablelist(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        varlistentry = item.find('varlistentry')
+
+        f.write('#### ')
+        self.emit_paras(varlistentry.find('term'), f, indent=indent)
+        f.write('\n')
+        f.eol()
+        for listitem in item.findall('listitem'):
+            for para in listitem.findall('para'):
+                self.emit_paras(para, f, indent=indent)
+                f.eol()
+
+    def _emit_parameterlist(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        parameteritems = item.findall('parameteritem')
+        title = SIMPLE_SECTIONS[item.get('kind')]
+        f.write('\n\n**' + escape(title) + '**\n\n')
+        f.eol()
+        for parameteritem in parameteritems:
+            name = parameteritem.find('parameternamelist').find('parametername')
+            description = parameteritem.find('parameterdescription').findall('para')
+            f.write(indent + '* ')
+            if len(name) > 0:
+                self.emit_paras(name, f, indent=indent + '  ')
+            else:
+                f.write('`' + name.text + '`')
+            f.write(' ')
+            for ip in description:
+                self.emit_paras(ip, f, indent=indent + '  ')
+            f.eol()
+
+    def _emit_simplesect(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        kind = item.get('kind')
+        f.write('\n\n**' + escape(SIMPLE_SECTIONS[kind]) + '**' + ('\n\n' if kind != 'see' else ' '))
+
+        for sp, has_more in lookahead(item.findall('para')):
+            self.emit_paras(sp, f, indent=indent)
+            if kind == 'see':
+                if has_more:
+                    f.write(', ')
+            else:
+                f.write('\n\n')
+
+    def _emit_xrefsect(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        xreftitle = item.find('xreftitle')
+        xrefdescription = item.find('xrefdescription')
+        f.write('\n\n**')
+        self.emit_paras(xreftitle, f)
+        f.write('**\n\n')
+        for sp in xrefdescription.findall('para'):
+            self.emit_paras(sp, f, indent=indent)
+            f.write('\n\n')
+
+    def _emit_ulink(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        f.write('[')
+        self.emit_paras(item, f)
+        f.write('](' + item.get('url') + ')')
+
+    def _emit_bold(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        f.write('**')
+        self.emit_paras(item, f)
+        f.write('**')
+
+    def _emit_emphasis(self, item: Element, italic: bool, f: MdRenderer, indent: str) -> None:
+        f.write('_')
+        self.emit_paras(item, f)
+        f.write('_')
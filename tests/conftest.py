@@ -0,0 +1,49 @@
+import os
+import typing as t
+
+import pytest
+
+from doxybook.cache import (
+    Cache,
+)
+from doxybook.doxygen import (
+    Doxygen,
+)
+from doxybook.runner import (
+    create_environment,
+    create_reader,
+    render,
+)
+from doxybook.xml_parser import (
+    XmlParser,
+)
+
+# doxygen XML of a C component and a few C++ classes, shaped after the examples
+XML_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'xml')
+
+
+@pytest.fixture
+def xml_dir() -> str:
+    return XML_DIR
+
+
+@pytest.fixture
+def load_model() -> t.Callable[..., Doxygen]:
+    def load(xml_dir: str = XML_DIR, **kwargs) -> Doxygen:
+        cache = Cache()
+        parser = XmlParser(cache=cache)
+        reader = create_reader(0, input_dir=xml_dir, parse_threads=kwargs.pop('parse_threads', 0))
+        options = {'target': 'single-markdown', 'link_prefix': ''}
+        return Doxygen(xml_dir, parser, cache, options=options, reader=reader, **kwargs)
+
+    return load
+
+
+@pytest.fixture
+def render_model() -> t.Callable[..., str]:
+    env = create_environment()
+
+    def render_(doxygen: Doxygen, template_lang: str = 'c') -> str:
+        return render(doxygen, env, template_lang)
+
+    return render_
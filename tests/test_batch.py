@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from doxybook.batch import (
+    load_manifest,
+    run_batch,
+)
+
+
+def write_manifest(tmp_path, xml_dir, **kwargs):
+    manifest = tmp_path / 'manifest.json'
+    component = {'name': 'comp', 'input': xml_dir, 'output': 'api.md', **kwargs}
+    manifest.write_text(json.dumps({'components': [component]}))
+    return str(manifest)
+
+
+def test_invalid_kinds_are_rejected_on_load(xml_dir, tmp_path):
+    manifest = write_manifest(tmp_path, xml_dir, kinds=['file', 'klass'])
+    with pytest.raises(ValueError, match='Invalid kinds in component comp .*: klass'):
+        load_manifest(manifest)
+
+
+def test_kinds_filter_the_rendered_compounds(xml_dir, tmp_path):
+    manifest = write_manifest(tmp_path, xml_dir, kinds=['file', 'struct'], exclude=['animal.h'], template_lang='cpp')
+    assert run_batch(manifest, jobs=1, skip_doxygen=True) == (True, True)
+
+    markdown = (tmp_path / 'api.md').read_text()
+    assert 'comp_cfg_t' in markdown
+    assert 'class `Animal`' not in markdown
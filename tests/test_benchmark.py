@@ -0,0 +1,29 @@
+import pytest
+
+from doxybook.benchmark import (
+    compare_results,
+    create_benchmarks,
+    load_fixtures,
+    run_benchmarks,
+)
+
+
+def test_benchmarks_run_on_the_fixture(xml_dir):
+    fixtures = load_fixtures([xml_dir])
+    benchmarks = create_benchmarks(fixtures)
+    assert benchmarks
+    for benchmark in benchmarks:
+        assert benchmark.ops, benchmark.name
+        benchmark.func()
+
+
+def test_results_compare_with_themselves(xml_dir, tmp_path):
+    results = str(tmp_path / 'benchmark.json')
+    data = run_benchmarks([xml_dir], results, repeat=1, select=['utils.*'])
+    assert list(data['benchmarks']) == ['utils.split_safe']
+    assert compare_results(results, results) == []
+
+
+def test_missing_xml_is_reported(tmp_path):
+    with pytest.raises(ValueError, match='has no index.xml'):
+        load_fixtures([str(tmp_path)])
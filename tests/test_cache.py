@@ -0,0 +1,70 @@
+from xml.etree import (
+    ElementTree,
+)
+
+import pytest
+
+from doxybook.cache import (
+    Cache,
+)
+from doxybook.markdown import (
+    MdRenderer,
+)
+
+
+def render_description(parser, xml):
+    f = MdRenderer()
+    for md in parser.paras(ElementTree.fromstring(xml)):
+        md.render(f, '')
+    return f.output
+
+
+def test_find_does_not_raise():
+    cache = Cache()
+    node = object()
+    cache.add('comp1_8h', node)
+
+    assert cache.find('comp1_8h') is node
+    assert cache.find('missing') is None
+    assert cache.find('missing', node) is node
+    assert cache.get('comp1_8h') is node
+    with pytest.raises(IndexError):
+        cache.get('missing')
+
+
+def test_find_loads_the_owner_of_a_member(load_model):
+    doxygen = load_model(lazy=True)
+    assert doxygen.cache.owners['classAnimal_1f1'] == 'classAnimal'
+
+    member = doxygen.cache.find('classAnimal_1f1')
+    assert member.name_full_unescaped == 'Animal::speak'
+    assert 'classAnimal_1f1' not in doxygen.cache.owners
+    assert doxygen.cache.find('classAnimal_1f1') is member
+
+
+def test_link_table_of_an_eager_model(load_model):
+    doxygen = load_model()
+    links = doxygen.parser.links
+    assert {refid for refid, _ in doxygen.cache.items()} == set(links)
+    assert links['structcomp__cfg__t_1a1'] == ('#variable-timeout', 'comp_cfg_t::timeout')
+    assert links['classBird_1f1'] == ('#function-speak', 'Bird::speak')
+
+
+def test_link_table_resolves_the_compounds_loaded_later(load_model):
+    doxygen = load_model(lazy=True)
+    parser = doxygen.parser
+    assert 'classBird_1f1' not in parser.links
+
+    markdown = render_description(parser, '<para><ref refid="classBird_1f1" kindref="member" /></para>')
+    assert '[**Bird::speak**](#function-speak)' in markdown
+    assert parser.links['classBird_1f1'] == ('#function-speak', 'Bird::speak')
+    assert not parser.unresolved_refs
+
+
+def test_unresolved_refs_are_counted(load_model):
+    parser = load_model().parser
+    ref = '<ref refid="missing_1x" kindref="member">missing</ref>'
+    xml = f'<para>{ref} <ref refid="missing_1x" kindref="member" /></para>'
+
+    assert render_description(parser, xml).strip() == 'missing'
+    assert parser.unresolved_refs == {'missing_1x': 2}
@@ -0,0 +1,51 @@
+import pytest
+
+from doxybook.constants import (
+    Kind,
+)
+from doxybook.doxygen import (
+    CompoundFilter,
+)
+
+
+@pytest.mark.parametrize(
+    'compound_filter, kind, name, expected',
+    [
+        (CompoundFilter(), Kind.DIR, 'include', True),
+        (CompoundFilter(), Kind.FILE, 'comp1.h', True),
+        (CompoundFilter(include=['comp*.h']), Kind.FILE, 'comp1.h', True),
+        (CompoundFilter(include=['comp*.h']), Kind.FILE, 'animal.h', False),
+        # the include globs only select the files
+        (CompoundFilter(include=['comp*.h']), Kind.CLASS, 'zoo::Animal', True),
+        (CompoundFilter(exclude=['animal.h']), Kind.FILE, 'animal.h', False),
+        (CompoundFilter(exclude=['zoo::*']), Kind.CLASS, 'zoo::Animal', False),
+        (CompoundFilter(include=['*.h'], exclude=['animal.h']), Kind.FILE, 'animal.h', False),
+        (CompoundFilter(include=['*.h'], exclude=['animal.h']), Kind.FILE, 'comp1.h', True),
+        # the globs are case-sensitive
+        (CompoundFilter(include=['Comp1.h']), Kind.FILE, 'comp1.h', False),
+        # a directory would load all its files
+        (CompoundFilter(include=['*.h']), Kind.DIR, 'include', False),
+        (CompoundFilter(exclude=['*.c']), Kind.DIR, 'include', False),
+        (CompoundFilter(kinds=[Kind.DIR, Kind.FILE]), Kind.DIR, 'include', True),
+        (CompoundFilter(kinds=[Kind.FILE]), Kind.DIR, 'include', False),
+        (CompoundFilter(kinds=[Kind.FILE]), Kind.GROUP, 'grp', False),
+        (CompoundFilter(include=['comp1.h'], kinds=[Kind.GROUP]), Kind.FILE, 'comp1.h', False),
+    ],
+)
+def test_match(compound_filter, kind, name, expected):
+    assert compound_filter.match(kind, name) == expected
+
+
+def test_filtered_model(load_model):
+    doxygen = load_model(compound_filter=CompoundFilter(include=['comp1.h']))
+    assert [file.name for file in doxygen.header_files.children] == ['comp1.h']
+    assert doxygen.cache.find('comp1_8h_1f1') is not None
+    assert doxygen.cache.find('dir_inc') is None
+    assert doxygen.cache.find('test__comp_8c') is None
+
+
+def test_declared_compounds_are_loaded_anyway(load_model):
+    doxygen = load_model(compound_filter=CompoundFilter(include=['animal.h'], kinds=[Kind.FILE]))
+    assert [file.name for file in doxygen.header_files.children] == ['animal.h']
+    assert doxygen.cache.find('classBird') is not None
+    assert doxygen.cache.find('group__grp') is None
@@ -0,0 +1,39 @@
+import pytest
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_class_hierarchy(load_model, lazy):
+    hierarchy = load_model(lazy=lazy).cache.hierarchy
+    assert hierarchy.bases('classBird') == [('classAnimal', 'Animal'), (None, 'std::Flyer')]
+    assert hierarchy.derived('classAnimal') == [('classBird', 'Bird')]
+    assert hierarchy.all_bases('classBird') == ['classAnimal']
+    assert hierarchy.all_derived('classAnimal') == ['classBird']
+    assert hierarchy.all_derived('classBird') == []
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_reimplementations(load_model, lazy):
+    hierarchy = load_model(lazy=lazy).cache.hierarchy
+    assert hierarchy.reimplements('classBird_1f1') == 'classAnimal_1f1'
+    assert hierarchy.reimplemented_by('classAnimal_1f1') == ['classBird_1f1']
+    assert hierarchy.reimplements('classAnimal_1f1') is None
+    assert hierarchy.reimplemented_by('classBird_1f1') == []
+
+
+def test_missing_entries_are_looked_up_once(load_model, monkeypatch):
+    doxygen = load_model(lazy=True)
+    hierarchy = doxygen.cache.hierarchy
+    lookups = []
+    find = doxygen.cache.find
+    monkeypatch.setattr(doxygen.cache, 'find', lambda refid, *args: lookups.append(refid) or find(refid, *args))
+
+    def lookup():
+        assert hierarchy.reimplements('classAnimal_1f4') is None
+        assert hierarchy.reimplemented_by('classAnimal_1f4') == []
+        assert hierarchy.bases('comp1_8h') == []
+
+    lookup()
+    assert 'classAnimal_1f4' in lookups
+    lookups.clear()
+    lookup()
+    assert lookups == []
@@ -0,0 +1,37 @@
+import subprocess
+import sys
+
+import pytest
+
+import doxybook
+
+
+def test_import_is_lazy():
+    code = (
+        'import sys, doxybook\n'
+        'assert "doxybook.model" not in sys.modules\n'
+        'assert doxybook.Model.__name__ == "Model"\n'
+        'assert "doxybook.model" in sys.modules\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_unknown_attribute():
+    with pytest.raises(AttributeError):
+        doxybook.Unknown
+
+
+def test_mkdocs_plugin_config(tmp_path):
+    # requires mkdocs
+    DoxybookPlugin = pytest.importorskip('doxybook.mkdocs_plugin').DoxybookPlugin
+
+    plugin = DoxybookPlugin()
+    errors, warnings = plugin.load_config({'xml_dir': 'xml', 'template_lang': 'cpp'}, str(tmp_path / 'mkdocs.yml'))
+    assert errors == []
+    assert warnings == []
+    assert plugin.config['output'] == 'api.md'
+    assert plugin.config['template_lang'] == 'cpp'
+    assert plugin.model is None
+
+    errors, _ = DoxybookPlugin().load_config({}, str(tmp_path / 'mkdocs.yml'))
+    assert [name for name, _ in errors] == ['xml_dir']
@@ -0,0 +1,39 @@
+import os
+import shutil
+
+import pytest
+
+import doxybook
+
+
+@pytest.fixture
+def model_dir(xml_dir, tmp_path):
+    xml = str(tmp_path / 'xml')
+    shutil.copytree(xml_dir, xml)
+    return xml
+
+
+@pytest.mark.parametrize('lazy', [False, True], ids=['eager', 'lazy'])
+def test_load_render_refresh(model_dir, lazy):
+    model = doxybook.load(model_dir, lazy=lazy)
+    markdown = model.render(template_lang='cpp')
+    assert '_Timeout in_ _ms__' in markdown
+
+    # the parsed XML is released after the render, and parsed again by the next one
+    assert not model.doxygen.cache.loaded
+    assert all(root is None for _, _, root in model._reader._parsed.values())
+    assert model.render(template_lang='cpp') == markdown
+    assert not model.refresh()
+
+    filepath = os.path.join(model_dir, 'structcomp__cfg__t.xml')
+    with open(filepath, encoding='utf-8') as fr:
+        content = fr.read()
+    with open(filepath, 'w', encoding='utf-8') as fw:
+        fw.write(content.replace('Timeout in <emphasis>ms</emphasis>', 'Timeout in seconds'))
+    st = os.stat(filepath)
+    os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert model.refresh()
+    changed = model.render(template_lang='cpp')
+    assert '_Timeout in seconds' in changed
+    assert '_Timeout in_ _ms__' not in changed
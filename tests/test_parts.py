@@ -0,0 +1,104 @@
+import os
+import re
+
+import pytest
+
+from doxybook.parts import (
+    Section,
+    listed_parts,
+    remove_stale_parts,
+    rewrite_links,
+    split_sections,
+)
+from doxybook.runner import (
+    run,
+)
+from doxybook.search_index import (
+    content_anchors,
+)
+
+# [text](document#anchor), the document is empty for the links into the same one
+LINK_RE = re.compile(r'\]\(([^)\s#]*)#([^)\s]+)\)')
+
+
+def read_dir(path):
+    ret = {}
+    for name in sorted(os.listdir(path)):
+        with open(os.path.join(path, name), encoding='utf-8') as fr:
+            ret[name] = fr.read()
+    return ret
+
+
+@pytest.mark.parametrize('split_size', [1, 1500, 1024 * 1024])
+def test_low_memory_split_is_identical(xml_dir, tmp_path, split_size):
+    for name, low_memory in (('default', False), ('low', True)):
+        run(
+            str(tmp_path / name / 'api.md'),
+            xml_dir,
+            template_lang='cpp',
+            prefetch_workers=0,
+            split_size=split_size,
+            low_memory=low_memory,
+        )
+    assert read_dir(tmp_path / 'default') == read_dir(tmp_path / 'low')
+
+
+def section(content, anchors=()):
+    return Section('a.h', '#file-ah', content, list(anchors))
+
+
+def test_rewrite_links():
+    content = '[a](#local) [b](#remote) [c](#unknown) [d](other.md#remote) [e](https://example.com)'
+    documents = {'local': 'api-1.md', 'remote': 'api-2.md'}
+    assert rewrite_links(content, {'local'}, documents) == (
+        '[a](#local) [b](api-2.md#remote) [c](#unknown) [d](other.md#remote) [e](https://example.com)'
+    )
+    # an anchor rendered in several parts is local to each of them
+    assert rewrite_links('[b](#remote)', {'remote'}, documents) == '[b](#remote)'
+
+
+def test_split_sections():
+    sections = [section('a' * 4), section('b' * 4), section('c' * 10), section('d' * 2), section('\u00e9' * 2)]
+    parts = [[s.content for s in part] for part in split_sections(sections, 8)]
+    # the sizes are counted in bytes, a larger section is a part on its own
+    assert parts == [['aaaa', 'bbbb'], ['cccccccccc'], ['dd', '\u00e9\u00e9']]
+    assert list(split_sections([], 8)) == []
+
+
+@pytest.mark.parametrize('split_size', [1, 1500])
+def test_split_links_point_into_the_parts(xml_dir, tmp_path, split_size):
+    run(str(tmp_path / 'single' / 'api.md'), xml_dir, template_lang='cpp', prefetch_workers=0)
+    run(str(tmp_path / 'split' / 'api.md'), xml_dir, template_lang='cpp', prefetch_workers=0, split_size=split_size)
+    single = read_dir(tmp_path / 'single')
+    split = read_dir(tmp_path / 'split')
+    assert len(split) > len(single)
+
+    owners = {}
+    for name, content in split.items():
+        for document, anchor in LINK_RE.findall(content):
+            if name == 'api.md':
+                assert document in split, anchor
+            owners.setdefault(anchor, set()).add(document or name)
+    # every anchor is linked in a single part, and none of the links of the single document were lost
+    assert {anchor: documents for anchor, documents in owners.items() if len(documents) > 1} == {}
+    assert set(owners) >= content_anchors(single['api.md'])
+
+
+def test_listed_parts(tmp_path):
+    output = tmp_path / 'api.md'
+    assert listed_parts(str(output)) == set()
+    output.write_text('- [a.h](api-1.md#file-ah)\n- [b.h](api-12.md#file-bh)\n- [Part 3](api-3.md)\n- [x](apix-4.md)\n')
+    assert listed_parts(str(output)) == {str(tmp_path / f'api-{number}.md') for number in (1, 3, 12)}
+
+
+def test_stale_parts_are_removed(xml_dir, tmp_path):
+    output = str(tmp_path / 'api.md')
+    run(output, xml_dir, template_lang='cpp', prefetch_workers=0, split_size=1)
+    parts = sorted(name for name in os.listdir(tmp_path) if name != 'api.md')
+    assert len(parts) > 1
+    # not listed by the index page
+    (tmp_path / 'api-99.md').write_text('kept')
+
+    run(output, xml_dir, template_lang='cpp', prefetch_workers=0, split_size=1024 * 1024)
+    assert sorted(os.listdir(tmp_path)) == ['api-1.md', 'api-99.md', 'api.md']
+    assert remove_stale_parts(output, 1, listed_parts(output)) == []
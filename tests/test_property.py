@@ -0,0 +1,75 @@
+import re
+from xml.etree import (
+    ElementTree,
+)
+
+import pytest
+
+from doxybook.constants import (
+    Kind,
+)
+from doxybook.property import (
+    Fields,
+    Property,
+)
+
+ARGSSTRINGS = [
+    '()',
+    '() const',
+    '()=delete',
+    '() = default',
+    '(const Animal &other) = delete',
+    '() noexcept',
+    '() const noexcept override',
+    '(int a) override',
+    '(int noexcept_flag)',
+    '(void (*cb)(int)) noexcept(true)',
+    '() = deleted_ok',
+    '(int a)\nnoexcept',
+    '(int a) const\n  override',
+    'noexcept override',
+    '',
+]
+
+
+def legacy_specifiers(argsstring):
+    # the specifiers found by the separate searches replaced by SPECIFIERS_RE
+    ret = []
+    for pattern, specifier in (
+        (r'\)\s*=\s*delete', '= delete'),
+        (r'\)\s*=\s*default', '= default'),
+        (r'\).*noexcept', 'noexcept'),
+        (r'\).*override', 'override'),
+    ):
+        if re.search(pattern, argsstring):
+            ret.append(specifier)
+    return ret
+
+
+def specifiers(argsstring, **attrib):
+    memberdef = ElementTree.Element('memberdef', attrib)
+    ElementTree.SubElement(memberdef, 'argsstring').text = argsstring or None
+    return Property.Specifiers(memberdef, None, Kind.FUNCTION)
+
+
+@pytest.mark.parametrize('argsstring', ARGSSTRINGS)
+def test_specifiers_match_the_separate_searches(argsstring):
+    assert specifiers(argsstring).plain() == ' '.join(legacy_specifiers(argsstring))
+
+
+def test_specifiers_of_the_attributes():
+    assert specifiers('() override', const='yes', virt='pure-virtual').plain() == 'override const = 0'
+    assert specifiers(None, const='yes').plain() == ''
+    assert not Property.Specifiers(ElementTree.Element('memberdef'), None, Kind.FUNCTION).has()
+
+
+def test_fields_mirror_the_direct_children():
+    memberdef = ElementTree.fromstring(
+        '<memberdef><param><type>int</type></param><name>f</name><param><type>char</type></param>'
+        '<detaileddescription><para><param>nested</param></para></detaileddescription></memberdef>'
+    )
+    fields = Fields(memberdef)
+    for tag in ('param', 'name', 'type', 'detaileddescription', 'missing'):
+        assert fields.find(tag) is memberdef.find(tag)
+        assert fields.findall(tag) == memberdef.findall(tag)
+    assert Fields(None).findall('param') == []
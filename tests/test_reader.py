@@ -0,0 +1,229 @@
+import glob
+import io
+import os
+import tarfile
+import zipfile
+from xml.etree import (
+    ElementTree,
+)
+
+import pytest
+
+from doxybook import reader as reader_module
+from doxybook.reader import (
+    ArchiveReader,
+    CombinedReader,
+    PrefetchReader,
+)
+
+
+def fixture_files(xml_dir):
+    ret = {}
+    for filepath in sorted(glob.glob(os.path.join(xml_dir, '*.xml'))):
+        with open(filepath, 'rb') as fr:
+            ret[os.path.basename(filepath)] = fr.read()
+    return ret
+
+
+def write_archive(archive, files):
+    """
+    The files under ``docs/xml`` of the archive, next to a deeper index.xml that must not be taken for theirs.
+    """
+    members = {f'docs/xml/{name}': data for name, data in files.items()}
+    members['docs/xml/html/search/index.xml'] = b'<doxygenindex />'
+    if archive.endswith('.zip'):
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for name, data in members.items():
+                zf.writestr(name, data)
+        return
+
+    with tarfile.open(archive, 'w:' + archive.rsplit('.tar', 1)[1].lstrip('.')) as tar:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = 1
+            tar.addfile(info, io.BytesIO(data))
+
+
+def write_combined(combined, files):
+    """
+    The compounds of ``files`` in one document, in the order of their index as written by the ``combine.xslt`` of
+    doxygen.
+    """
+    refids = [compound.get('refid') for compound in ElementTree.fromstring(files['index.xml']).iterfind('compound')]
+    with open(combined, 'wb') as fw:
+        fw.write(b'<?xml version="1.0" encoding="UTF-8"?>\n<doxygen version="1.9.1" xml:lang="en-US">\n')
+        for refid in refids:
+            data = files[refid + '.xml']
+            fw.write(data[data.index(b'<compounddef') : data.rindex(b'</doxygen>')])
+        fw.write(b'</doxygen>\n')
+
+
+def compounddef(data):
+    element = ElementTree.fromstring(data).find('compounddef')
+    element.tail = None
+    return ElementTree.tostring(element)
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(10):
+        path = str(tmp_path / f'{i}.xml')
+        with open(path, 'wb') as fw:
+            fw.write(f'<doxygen id="{i}">'.encode() + b' ' * 80 + b'</doxygen>')
+        paths.append(path)
+    return paths
+
+
+def test_prefetch_budget_counts_the_reads_in_flight(files):
+    size = os.path.getsize(files[0])
+    queued = 2
+    reader = PrefetchReader(workers=4, max_bytes=size * queued + 1)
+    try:
+        reader.prefetch(files)
+        assert len(reader._futures) == queued
+        assert reader._buffered == size * queued
+
+        for path in files:
+            with open(path, 'rb') as fr:
+                assert reader.read(path) == fr.read()
+            assert reader._buffered <= size * queued
+        assert reader._buffered == 0
+    finally:
+        reader.close()
+
+
+def test_prefetch_queues_a_file_larger_than_the_budget(files):
+    reader = PrefetchReader(workers=4, max_bytes=1)
+    try:
+        reader.prefetch(files)
+        assert list(reader._futures) == files[:1]
+    finally:
+        reader.close()
+
+
+def test_prefetch_parse(files):
+    reader = PrefetchReader(workers=2, parse=True)
+    try:
+        reader.prefetch(files)
+        assert [reader.parse(path).get('id') for path in files] == [str(i) for i in range(10)]
+    finally:
+        reader.close()
+
+
+def test_compressed_tarball_is_spooled(xml_dir, tmp_path, monkeypatch, load_model, render_model):
+    monkeypatch.setattr(reader_module, 'TAR_SPOOL_MEMORY', 1024)
+    archive = str(tmp_path / 'xml.tar.gz')
+    with tarfile.open(archive, 'w:gz') as tar:
+        tar.add(xml_dir, arcname='xml')
+
+    reader = ArchiveReader(archive)
+    with open(os.path.join(xml_dir, 'comp1_8h.xml'), 'rb') as fr:
+        assert reader.read(os.path.join(archive, 'comp1_8h.xml')) == fr.read()
+    assert reader._spool._rolled  # the members are in the temporary file, not in memory
+    assert render_model(load_model(archive)) == render_model(load_model())
+
+
+@pytest.mark.parametrize('suffix', ['.zip', '.tar', '.tar.gz', '.tar.bz2'])
+def test_archive_members(xml_dir, tmp_path, suffix):
+    files = fixture_files(xml_dir)
+    archive = str(tmp_path / f'xml{suffix}')
+    write_archive(archive, files)
+
+    reader = ArchiveReader(archive)
+    try:
+        assert sorted(reader.snapshot()) == sorted(
+            os.path.join(archive, name) for name in [*files, 'html/search/index.xml']
+        )
+        for name, data in files.items():
+            assert reader.read(os.path.join(archive, name)) == data
+            with reader.open(os.path.join(archive, name)) as fr:
+                assert fr.read() == data
+        with pytest.raises(FileNotFoundError):
+            reader.read(os.path.join(archive, 'missing.xml'))
+    finally:
+        reader.close()
+
+
+@pytest.mark.parametrize('suffix', ['.zip', '.tar', '.tar.gz'])
+def test_archive_is_indexed_again_when_it_changes(xml_dir, tmp_path, suffix):
+    files = fixture_files(xml_dir)
+    archive = str(tmp_path / f'xml{suffix}')
+    write_archive(archive, files)
+    path = os.path.join(archive, 'comp1_8h.xml')
+
+    reader = ArchiveReader(archive)
+    try:
+        key = reader.stat_key(path)
+        assert reader.read(path) == files['comp1_8h.xml']
+
+        files['comp1_8h.xml'] += b'\n'
+        write_archive(archive, files)
+        st = os.stat(archive)
+        os.utime(archive, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+        assert reader.stat_key(path) != key
+        assert reader.read(path) == files['comp1_8h.xml']
+    finally:
+        reader.close()
+
+
+@pytest.mark.parametrize('suffix', ['.zip', '.tar'])
+def test_archive_render_is_identical(xml_dir, tmp_path, load_model, render_model, suffix):
+    archive = str(tmp_path / f'xml{suffix}')
+    write_archive(archive, fixture_files(xml_dir))
+    assert render_model(load_model(archive), 'cpp') == render_model(load_model(), 'cpp')
+
+
+def test_combined_compounds(xml_dir, tmp_path):
+    files = fixture_files(xml_dir)
+    # multi-byte characters before and inside the compounds shift the byte ranges away from the character offsets
+    files['animal_8h.xml'] = files['animal_8h.xml'].replace(
+        b'</compounddef>', '<!-- \u00e9t\u00e9 --></compounddef>'.encode()
+    )
+    files['classBird.xml'] = files['classBird.xml'].replace(b'A bird.', 'A \u00e9 bird.'.encode())
+    combined = str(tmp_path / 'all.xml')
+    write_combined(combined, files)
+
+    reader = CombinedReader(combined)
+    assert sorted(reader.snapshot()) == sorted(os.path.join(combined, name) for name in files)
+    for name, data in files.items():
+        if name != 'index.xml':
+            assert compounddef(reader.read(os.path.join(combined, name))) == compounddef(data), name
+    bird = reader.parse(os.path.join(combined, 'classBird.xml'))
+    assert bird.findtext('compounddef/briefdescription/para').strip() == 'A \u00e9 bird.'
+
+    with pytest.raises(FileNotFoundError):
+        reader.read(os.path.join(combined, 'missing.xml'))
+    with pytest.raises(FileNotFoundError):
+        reader.stat_key(os.path.join(combined, 'missing.xml'))
+
+
+def test_combined_index(xml_dir, tmp_path):
+    files = fixture_files(xml_dir)
+    combined = str(tmp_path / 'all.xml')
+    write_combined(combined, files)
+
+    def compounds(index):
+        return {
+            compound.get('refid'): (
+                compound.get('kind'),
+                compound.findtext('name'),
+                sorted(member.get('refid') for member in compound.iterfind('member')),
+            )
+            for compound in ElementTree.fromstring(index).iterfind('compound')
+        }
+
+    index = compounds(CombinedReader(combined).read(os.path.join(combined, 'index.xml')))
+    expected = compounds(files['index.xml'])
+    assert index.keys() == expected.keys()
+    for refid, (kind, name, members) in expected.items():
+        # the index of the fixture lists no enum values
+        assert index[refid][:2] == (kind, name)
+        assert set(members) <= set(index[refid][2])
+
+
+def test_combined_render_is_identical(xml_dir, tmp_path, load_model, render_model):
+    combined = str(tmp_path / 'all.xml')
+    write_combined(combined, fixture_files(xml_dir))
+    assert render_model(load_model(combined), 'cpp') == render_model(load_model(), 'cpp')
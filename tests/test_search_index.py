@@ -0,0 +1,58 @@
+import pytest
+
+from doxybook.search_index import (
+    build_search_index,
+    lookup,
+)
+
+
+def scan(index, prefix):
+    prefix = prefix.lower()
+    return [
+        symbol
+        for symbol in index['symbols']
+        if symbol['name'].lower().startswith(prefix) or symbol['short_name'].lower().startswith(prefix)
+    ]
+
+
+def prefixes(index):
+    ret = {''}
+    for symbol in index['symbols']:
+        for name in (symbol['name'], symbol['short_name']):
+            ret.update(name[:i] for i in range(1, len(name) + 1))
+    return sorted(ret)
+
+
+@pytest.fixture(params=['c', 'cpp'])
+def index(load_model, request):
+    return build_search_index(load_model(), 'api.md', template_lang=request.param)
+
+
+def test_lookup_matches_a_scan_of_the_symbols(index):
+    assert len(index['symbols']) > 1
+    for prefix in prefixes(index):
+        assert lookup(index, prefix) == scan(index, prefix), prefix
+
+
+def test_lookup_is_case_insensitive(index):
+    assert lookup(index, 'COMP_') == lookup(index, 'comp_') == scan(index, 'comp_')
+    assert lookup(index, 'comp_cfg_t::timeout') == [
+        symbol for symbol in index['symbols'] if symbol['name'] == 'comp_cfg_t::timeout'
+    ]
+
+
+def test_lookup_of_unknown_prefixes(index):
+    for prefix in ('x', 'comp_z', 'comp_cfg_t::timeouts'):
+        assert lookup(index, prefix) == []
+
+
+def test_trie_is_compressed(index):
+    stack = [index['trie']]
+    while stack:
+        _, children = stack.pop()
+        # the edges of a node start with distinct characters
+        assert len({label[0] for label in children}) == len(children)
+        for label, child in children.items():
+            # a chain of single-child nodes without symbols is merged into one edge
+            assert child[0] or len(child[1]) != 1, label
+            stack.append(child)
@@ -0,0 +1,69 @@
+import json
+import os
+import shutil
+
+from doxybook.runner import (
+    run,
+)
+from doxybook.section_manifest import (
+    SECTION_MANIFEST_VERSION,
+    diff_sections,
+    load_section_manifest,
+)
+
+
+def section(sha256):
+    return {'refid': 'comp1_8h', 'link': '#file-comp1h', 'sha256': sha256}
+
+
+def test_diff_sections():
+    old = {'a.h': section('1'), 'b.h': section('2'), 'c.h': section('3')}
+    new = {'d.h': section('4'), 'c.h': section('3'), 'b.h': section('5')}
+    assert diff_sections(old, new) == (['d.h'], ['a.h'], ['b.h'])
+    assert diff_sections(new, new) == ([], [], [])
+    assert diff_sections({}, new) == (['b.h', 'c.h', 'd.h'], [], [])
+
+
+def test_unusable_manifests_are_ignored(tmp_path):
+    manifest = tmp_path / 'sections.json'
+    assert load_section_manifest(str(manifest)) is None
+
+    manifest.write_text('{')
+    assert load_section_manifest(str(manifest)) is None
+
+    manifest.write_text(json.dumps({'version': SECTION_MANIFEST_VERSION + 1, 'sections': {'a.h': section('1')}}))
+    assert load_section_manifest(str(manifest)) is None
+
+    manifest.write_text(json.dumps({'version': SECTION_MANIFEST_VERSION, 'sections': {'a.h': section('1')}}))
+    assert load_section_manifest(str(manifest)) == {'a.h': section('1')}
+
+
+def test_manifest_reports_the_changed_sections(xml_dir, tmp_path, capsys):
+    xml = str(tmp_path / 'xml')
+    shutil.copytree(xml_dir, xml)
+    manifest = str(tmp_path / 'sections.json')
+
+    def render():
+        capsys.readouterr()
+        run(str(tmp_path / 'api.md'), xml, prefetch_workers=0, section_manifest=manifest)
+        return load_section_manifest(manifest), capsys.readouterr().out
+
+    sections, out = render()
+    assert sorted(sections) == ['test_comp/include/animal.h', 'test_comp/include/comp1.h']
+    assert 'no previous manifest to compare with' in out
+
+    unchanged, out = render()
+    assert unchanged == sections
+    assert '0 added, 0 removed, 0 changed, 2 unchanged' in out
+    assert 'Generated section manifest' not in out
+
+    filepath = os.path.join(xml, 'structcomp__cfg__t.xml')
+    with open(filepath, encoding='utf-8') as fr:
+        content = fr.read()
+    with open(filepath, 'w', encoding='utf-8') as fw:
+        fw.write(content.replace('Timeout in <emphasis>ms</emphasis>', 'Timeout in seconds'))
+
+    changed, out = render()
+    assert '0 added, 0 removed, 1 changed, 1 unchanged' in out
+    assert '  changed: test_comp/include/comp1.h' in out
+    assert diff_sections(sections, changed) == ([], [], ['test_comp/include/comp1.h'])
@@ -0,0 +1,77 @@
+import sys
+import threading
+
+import pytest
+
+from doxybook.doxygen import (
+    Doxygen,
+)
+from doxybook.node import (
+    Node,
+)
+
+ROUNDS = 5
+
+
+@pytest.fixture(autouse=True)
+def fast_switches():
+    # interleave the threads as much as the interpreter allows
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def materialize_concurrently(doxygen: Doxygen, threads: int) -> None:
+    """
+    Materialize the nodes of a lazy model on ``threads`` threads at once, each walking the tree from another root.
+    """
+    roots = doxygen.header_files.children + doxygen.root.children + doxygen.groups.children
+    errors = []
+
+    def walk(start: int) -> None:
+        try:
+            visited = set()
+            stack = roots[start:] + roots[:start]
+            while stack:
+                node: Node = stack.pop()
+                if id(node) in visited:
+                    continue
+                visited.add(id(node))
+                node.materialize()
+                stack.extend(node.children)
+        except Exception as e:  # re-raised by the test thread
+            errors.append(e)
+
+    workers = [threading.Thread(target=walk, args=(i * len(roots) // threads,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    if errors:
+        raise errors[0]
+
+
+@pytest.mark.parametrize('template_lang', ['c', 'cpp'])
+def test_parse_threads_render_is_identical(load_model, render_model, template_lang):
+    expected = render_model(load_model(), template_lang).encode('utf-8')
+    for _ in range(ROUNDS):
+        assert render_model(load_model(parse_threads=4), template_lang).encode('utf-8') == expected
+
+
+@pytest.mark.parametrize('template_lang', ['c', 'cpp'])
+def test_concurrent_lazy_loads_render_is_identical(load_model, render_model, template_lang):
+    expected = render_model(load_model(), template_lang).encode('utf-8')
+    for _ in range(ROUNDS):
+        doxygen = load_model(lazy=True)
+        materialize_concurrently(doxygen, 8)
+        assert render_model(doxygen, template_lang).encode('utf-8') == expected
+
+
+def test_concurrent_lazy_loads_register_the_nodes_once(load_model):
+    doxygen = load_model(lazy=True)
+    materialize_concurrently(doxygen, 8)
+
+    refids = [refid for refid, _ in doxygen.cache.items()]
+    assert len(refids) == len(set(refids))
+    assert sorted(refids) == sorted(refid for refid, _ in load_model().cache.items())
@@ -0,0 +1,79 @@
+import os
+import shutil
+
+import pytest
+
+from doxybook.watch import (
+    Watcher,
+)
+
+
+@pytest.fixture
+def watcher(xml_dir, tmp_path, request):
+    xml = str(tmp_path / 'xml')
+    shutil.copytree(xml_dir, xml)
+    watcher = Watcher(xml, str(tmp_path / 'api.md'), prefetch_workers=0, lazy=request.param)
+    watcher.start()
+    watcher.render()
+    return watcher
+
+
+def count_renders(watcher):
+    rendered = []
+    render = watcher.sections.template.render
+
+    def wrapper(file, **kwargs):
+        rendered.append(file.refid)
+        return render(file=file, **kwargs)
+
+    watcher.sections.template.render = wrapper
+    return rendered
+
+
+def edit(filepath, old, new):
+    with open(filepath, encoding='utf-8') as fr:
+        content = fr.read()
+    assert old in content
+    with open(filepath, 'w', encoding='utf-8') as fw:
+        fw.write(content.replace(old, new))
+    st = os.stat(filepath)
+    os.utime(filepath, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.mark.parametrize('watcher', [False, True], indirect=True, ids=['eager', 'lazy'])
+def test_reload_renders_the_dependent_section(watcher):
+    rendered = count_renders(watcher)
+    edit(
+        os.path.join(watcher.input_dir, 'structcomp__cfg__t.xml'),
+        'Timeout in <emphasis>ms</emphasis>',
+        'Timeout in seconds',
+    )
+
+    watcher.reload(watcher.poll())
+    assert watcher.render()
+    assert rendered == ['comp1_8h']
+    with open(watcher.output_filepath, encoding='utf-8') as fr:
+        assert 'Timeout in seconds' in fr.read()
+
+
+@pytest.mark.parametrize('watcher', [False, True], indirect=True, ids=['eager', 'lazy'])
+def test_reload_without_changes_renders_nothing(watcher):
+    rendered = count_renders(watcher)
+    watcher.reload(watcher.poll())
+    assert not watcher.render()
+    assert rendered == []
+
+
+@pytest.mark.parametrize('watcher', [False], indirect=True, ids=['eager'])
+def test_changed_link_renders_all_sections(watcher):
+    rendered = count_renders(watcher)
+    # moves the anchors of the members of the class
+    edit(
+        os.path.join(watcher.input_dir, 'classBird.xml'),
+        '<compoundname>Bird</compoundname>',
+        '<compoundname>Robin</compoundname>',
+    )
+
+    watcher.reload(watcher.poll())
+    watcher.render()
+    assert sorted(rendered) == ['animal_8h', 'comp1_8h']
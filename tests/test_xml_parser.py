@@ -0,0 +1,94 @@
+import glob
+import os
+from xml.etree import (
+    ElementTree,
+)
+
+import pytest
+
+from doxybook.markdown import (
+    MdRenderer,
+    Text,
+)
+
+# the descriptions of the fixture must go through these handlers
+FIXTURE_TAGS = ['itemizedlist', 'table', 'ref', 'programlisting', 'simplesect', 'xrefsect', 'parameterlist']
+
+SNIPPETS = [
+    '<para>Plain <bold>bold</bold> and <emphasis>emphasis</emphasis> with <computeroutput>code <bold>x</bold>'
+    '</computeroutput>.</para>',
+    '<para><orderedlist><listitem><para>one<itemizedlist><listitem><para>nested</para></listitem></itemizedlist>'
+    '</para></listitem><listitem><para>two</para></listitem></orderedlist></para>',
+    '<para><variablelist><varlistentry><term>term <ref refid="comp1_8h_1d1" kindref="member">COMP_MAX</ref></term>'
+    '</varlistentry><listitem><para>definition</para></listitem></variablelist></para>',
+    '<para><parameterlist kind="retval"><parameteritem><parameternamelist><parametername>ESP_OK</parametername>'
+    '</parameternamelist><parameterdescription><para>Success</para></parameterdescription></parameteritem>'
+    '</parameterlist></para>',
+    '<sect2><title>Level two</title><para>text</para><sect3><title>Level three</title><para>deeper</para></sect3>'
+    '</sect2>',
+    '<para><heading level="1">One</heading><heading level="5">Five</heading></para>',
+    '<para>See <ref refid="missing_1x" kindref="member">missing</ref> and <ulink url="https://example.com">'
+    '<bold>site</bold></ulink>.</para>',
+    '<para>Before <unknowntag>skipped</unknowntag> after</para><para></para>',
+    '<para><simplesect kind="see"><para><ref refid="classAnimal" kindref="compound">Animal</ref></para>'
+    '</simplesect><simplesect kind="return"><para>nothing</para></simplesect></para>',
+]
+
+
+def fixture_descriptions(xml_dir):
+    for filepath in sorted(glob.glob(os.path.join(xml_dir, '*.xml'))):
+        root = ElementTree.parse(filepath).getroot()
+        for tag in ('briefdescription', 'detaileddescription'):
+            for description in root.iter(tag):
+                if len(description):
+                    yield description
+
+
+def rendered(parser, description, italic, indent):
+    """
+    The markdown and the unresolved references of the ``paras`` and ``emit_paras`` paths.
+    """
+    parser.unresolved_refs.clear()
+    f = MdRenderer()
+    for md in parser.paras(description, italic):
+        md.render(f, indent)
+    expected = (f.output, dict(parser.unresolved_refs))
+
+    parser.unresolved_refs.clear()
+    f = MdRenderer()
+    parser.emit_paras(description, f, italic, indent)
+    return expected, (f.output, dict(parser.unresolved_refs))
+
+
+@pytest.fixture
+def parser(load_model):
+    return load_model().parser
+
+
+def test_fixture_covers_the_handlers(xml_dir):
+    tags = {element.tag for description in fixture_descriptions(xml_dir) for element in description.iter()}
+    assert set(FIXTURE_TAGS) <= tags
+
+
+@pytest.mark.parametrize('italic', [False, True])
+@pytest.mark.parametrize('indent', ['', '    '])
+def test_emit_paras_of_the_fixture(parser, xml_dir, italic, indent):
+    for description in fixture_descriptions(xml_dir):
+        expected, actual = rendered(parser, description, italic, indent)
+        assert actual == expected, ElementTree.tostring(description, encoding='unicode')
+
+
+@pytest.mark.parametrize('snippet', SNIPPETS)
+@pytest.mark.parametrize('italic', [False, True])
+def test_emit_paras_of_the_snippets(parser, snippet, italic):
+    description = ElementTree.fromstring(f'<detaileddescription>{snippet}</detaileddescription>')
+    expected, actual = rendered(parser, description, italic, '  ')
+    assert actual == expected
+
+
+def test_emit_paras_uses_the_registered_handlers(parser):
+    parser.register_handler('bold', lambda item, italic: [Text('B[')] + parser.paras(item) + [Text(']')])
+    description = ElementTree.fromstring(f'<detaileddescription>{SNIPPETS[0]}</detaileddescription>')
+    expected, actual = rendered(parser, description, False, '')
+    assert actual == expected
+    assert 'B[bold]' in actual[0]